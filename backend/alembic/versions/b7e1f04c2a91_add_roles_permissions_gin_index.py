@@ -0,0 +1,25 @@
+"""add roles permissions gin index
+
+Revision ID: b7e1f04c2a91
+Revises: 492eec39b72d
+Create Date: 2026-10-18 14:40:12.318504
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b7e1f04c2a91"
+down_revision = "492eec39b72d"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # serves the array overlap (&&) used to search roles by functionality
+    op.create_index("ix_roles_permissions", "roles", ["permissions"], postgresql_using="gin")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_roles_permissions", table_name="roles")
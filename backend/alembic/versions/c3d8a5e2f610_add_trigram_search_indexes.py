@@ -0,0 +1,45 @@
+"""add trigram search indexes
+
+Revision ID: c3d8a5e2f610
+Revises: b7e1f04c2a91
+Create Date: 2026-10-18 15:02:47.905131
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c3d8a5e2f610"
+down_revision = "b7e1f04c2a91"
+branch_labels = None
+depends_on = None
+
+TRIGRAM_INDEXES = (
+    ("ix_users_fullname_trgm", "users", "fullname"),
+    ("ix_users_username_trgm", "users", "username"),
+    ("ix_users_email_trgm", "users", "email"),
+    ("ix_roles_role_trgm", "roles", "role"),
+)
+
+
+def upgrade() -> None:
+    # serves the ILIKE '%term%' searches of the users and roles lists
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, table, column in TRIGRAM_INDEXES:
+        op.create_index(
+            name,
+            table,
+            [column],
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        )
+
+    # users searched by the name of their role are reached through role_id
+    op.create_index("ix_users_role_id", "users", ["role_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_role_id", table_name="users")
+    for name, table, _ in reversed(TRIGRAM_INDEXES):
+        op.drop_index(name, table_name=table)
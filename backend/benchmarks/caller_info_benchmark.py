@@ -0,0 +1,97 @@
+"""
+Cost of logging a failed ServiceResult in handle_result.
+
+Every 401/404/409 goes through handle_result, which logs the exception with
+the route that got it. This times, from as deep a stack as a route has under
+uvicorn, starlette and FastAPI:
+
+- inspect.stack(): the caller lookup handle_result used to do, which builds
+  the frame info and reads the source lines of the whole stack
+- sys._getframe: the caller lookup it does now
+- handle_result: the whole error path, logging to a sink that drops the
+  records, before and after
+
+No database is needed.
+
+    cd backend && python -m benchmarks.caller_info_benchmark --depth 60
+"""
+import argparse
+import inspect
+import statistics
+import time
+from typing import Callable
+
+from loguru import logger
+
+from modules.users.auths.auth_exceptions import AuthExceptions
+from shared.utils.service_result import ServiceResult, caller_info, handle_result
+
+
+def inspect_caller_info() -> str:
+    info = inspect.getframeinfo(inspect.stack()[2][0])
+    return f"{info.filename}:{info.function}:{info.lineno}"
+
+
+def inspect_handle_result(result: ServiceResult):
+    if not result.success:
+        with result as exception:
+            logger.error(f"{exception} | caller={inspect_caller_info()}")
+            raise exception
+    with result as result:
+        return result
+
+
+def at_depth(depth: int, call: Callable[[], None]) -> None:
+    if depth > 0:
+        return at_depth(depth - 1, call)
+    call()
+
+
+def failed_login(handle: Callable[[ServiceResult], None]) -> Callable[[], None]:
+    def route() -> None:
+        try:
+            handle(ServiceResult(AuthExceptions.AuthNoValidCredencialsException()))
+        except AuthExceptions.AuthNoValidCredencialsException:
+            pass
+
+    return route
+
+
+def time_call(call: Callable[[], None], depth: int, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        at_depth(depth, call)
+        timings.append(time.perf_counter() - started)
+
+    return statistics.median(timings) * 1_000_000
+
+
+def main(depth: int, runs: int) -> None:
+    logger.remove()
+    logger.add(lambda message: None, level="ERROR")
+
+    cases = (
+        ("caller lookup", lambda: inspect_caller_info(), lambda: caller_info()),
+        (
+            "handle_result",
+            failed_login(inspect_handle_result),
+            failed_login(handle_result),
+        ),
+    )
+
+    print(f"stack depth {depth}, median of {runs} runs (µs)")
+    print(f"{'case':<16}{'inspect.stack':>16}{'sys._getframe':>16}{'speedup':>10}")
+    for name, before, after in cases:
+        old = time_call(before, depth, runs)
+        new = time_call(after, depth, runs)
+        print(f"{name:<16}{old:>16.1f}{new:>16.1f}{old / new:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--depth", type=int, default=60)
+    parser.add_argument("--runs", type=int, default=500)
+    args = parser.parse_args()
+
+    main(args.depth, args.runs)
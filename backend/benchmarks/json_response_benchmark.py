@@ -0,0 +1,135 @@
+"""
+Cost of rendering the users and roles responses with each response class.
+
+Builds the payloads the users and roles endpoints return (a page of the
+users list, the roles list, a single user and an error body) and times, for
+JSONResponse (stdlib json) and FastJSONResponse (orjson when installed):
+
+- render: the response class serializing content that jsonable_encoder
+  already converted, which is what every route goes through
+- encode + render: jsonable_encoder plus the response class, the whole
+  serialization done by FastAPI for a route
+- render models: the response class given the models themselves, as the
+  exception handlers and any route returning the response class do
+
+No database is needed.
+
+    cd backend && python -m benchmarks.json_response_benchmark --rows 100
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable
+from uuid import uuid4
+
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import JSONResponse
+
+from modules.users.roles.role_schemas import RoleOut
+from modules.users.users.user_schemas import UserOut, UserPublic
+from shared.utils.json_response import FastJSONResponse, orjson
+from shared.utils.short_pagination import short_pagination, short_pagination_aps
+
+
+class StdlibModelsResponse(JSONResponse):
+    # JSONResponse can not render models, they are encoded first as FastAPI does
+    def render(self, content: Any) -> bytes:
+        return super().render(jsonable_encoder(content))
+
+
+def users_page(rows: int) -> dict:
+    users = [
+        UserOut.construct(
+            id=uuid4(),
+            fullname=f"Bench User {n}",
+            username=f"bench_user_{n}",
+            email=f"bench_user_{n}@bench.com",
+            role="bench role",
+            role_id=uuid4(),
+            is_active=True,
+            created_by="Bench Admin",
+            updated_by=None,
+        )
+        for n in range(rows)
+    ]
+    return short_pagination_aps(1, rows, users, rows * 10, "/api/v1/users/")
+
+
+def roles_page(rows: int) -> dict:
+    now = datetime.now(timezone.utc)
+    roles = [
+        RoleOut.construct(
+            id=uuid4(),
+            role=f"bench role {n}",
+            permissions=["users:users_list", "roles:roles_list", "roles:create-role"],
+            is_active=True,
+            created_at=now,
+            updated_at=now,
+            created_by="Bench Admin",
+            updated_by="Bench Admin",
+        )
+        for n in range(rows)
+    ]
+    return short_pagination(1, rows, roles, "/api/v1/users/roles/")
+
+
+def single_user() -> UserPublic:
+    now = datetime.now(timezone.utc)
+    return UserPublic.construct(
+        id=uuid4(),
+        fullname="Bench User",
+        username="bench_user",
+        email="bench_user@bench.com",
+        role_id=uuid4(),
+        is_active=True,
+        is_superadmin=False,
+        created_at=now,
+        updated_at=now,
+    )
+
+
+def time_call(call: Callable[[], Any], runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - started)
+
+    return statistics.median(timings) * 1_000_000
+
+
+def main(rows: int, runs: int) -> None:
+    payloads = (
+        ("users list", users_page(rows)),
+        ("roles list", roles_page(rows)),
+        ("user by id", single_user()),
+        ("error", {"app_exception": "UserNotFoundException", "msg": "Usuario no encontrado"}),
+    )
+
+    print(f"{rows} rows per list, median of {runs} runs (µs), orjson={orjson is not None}")
+    print(f"{'payload':<14}{'stage':<18}{'JSONResponse':>14}{'FastJSON':>12}{'speedup':>10}")
+    for name, payload in payloads:
+        encoded = jsonable_encoder(payload)
+        stages = (
+            ("render", lambda response_class: response_class(encoded)),
+            (
+                "encode + render",
+                lambda response_class: response_class(jsonable_encoder(payload)),
+            ),
+            ("render models", lambda response_class: response_class(payload)),
+        )
+        for stage, render in stages:
+            stdlib_class = JSONResponse if stage != "render models" else StdlibModelsResponse
+            stdlib = time_call(lambda: render(stdlib_class), runs)
+            fast = time_call(lambda: render(FastJSONResponse), runs)
+            print(f"{name:<14}{stage:<18}{stdlib:>14.1f}{fast:>12.1f}{stdlib / fast:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    main(args.rows, args.runs)
@@ -0,0 +1,131 @@
+"""
+Per-request cost of the request and query metrics.
+
+Calls a FastAPI app straight through ASGI, without a server or client in
+between, with and without the MetricsMiddleware, so the difference is what
+the middleware adds to every request. Then times what InstrumentedDatabase
+adds to every query (naming the statement and observing its latency) on
+the real users list statements, and a render of /metrics.
+
+No database is needed.
+
+    cd backend && python -m benchmarks.metrics_overhead_benchmark --requests 20000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable
+
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Message
+
+from modules.users.auths import auth_sqlstaments
+from modules.users.roles import role_sqlsentences
+from modules.users.users import user_sqlstaments
+from shared.core.db.db_metrics import StatementNames
+from shared.core.metrics import MetricsRegistry
+from shared.core.middlewares.metrics import MetricsMiddleware
+
+
+def build_app(registry: MetricsRegistry | None) -> FastAPI:
+    app = FastAPI()
+    if registry is not None:
+        app.add_middleware(MetricsMiddleware, registry=registry)
+
+    @app.get("/users/{id}", name="users:get-user-by-id")
+    async def get_user(id: str):
+        return {"id": id}
+
+    return app
+
+
+def asgi_request(app: ASGIApp) -> Callable[[], Awaitable[None]]:
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/users/1",
+        "raw_path": b"/users/1",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "server": ("bench", 80),
+        "client": ("bench", 1234),
+    }
+
+    async def receive() -> Message:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Message) -> None:
+        pass
+
+    async def request() -> None:
+        await app(dict(scope), receive, send)
+
+    return request
+
+
+async def time_requests(request: Callable[[], Awaitable[None]], requests: int) -> float:
+    for _ in range(100):
+        await request()
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        await request()
+    return (time.perf_counter() - started) / requests * 1_000_000
+
+
+def time_call(call: Callable[[], None], runs: int) -> float:
+    started = time.perf_counter()
+    for _ in range(runs):
+        call()
+    return (time.perf_counter() - started) / runs * 1_000_000
+
+
+def main(requests: int, rounds: int) -> None:
+    registry = MetricsRegistry()
+    plain = asgi_request(build_app(None))
+    measured = asgi_request(build_app(registry))
+
+    without, with_metrics = [], []
+    for _ in range(rounds):
+        without.append(asyncio.run(time_requests(plain, requests)))
+        with_metrics.append(asyncio.run(time_requests(measured, requests)))
+    without, with_metrics = statistics.median(without), statistics.median(with_metrics)
+
+    print(f"{requests} requests per round, median of {rounds} rounds (µs per request)")
+    print(f"{'without metrics':<28}{without:>10.2f}")
+    print(f"{'with MetricsMiddleware':<28}{with_metrics:>10.2f}")
+    print(f"{'overhead':<28}{with_metrics - without:>10.2f}")
+
+    names = StatementNames()
+    names.register(user_sqlstaments, role_sqlsentences, auth_sqlstaments)
+    latency = registry.histogram("db_query_duration_seconds", "Queries", ("statement",))
+    queries = [
+        user_sqlstaments.GET_USERS_LIST
+        + user_sqlstaments.user_list_search()
+        + user_sqlstaments.user_list_complements(None, None)
+        + user_sqlstaments.user_list_pagination(),
+        user_sqlstaments.GET_USER_BY_ID,
+        user_sqlstaments.user_update_by_id({"fullname": None}),
+    ]
+
+    def observe_queries() -> None:
+        for query in queries:
+            latency.observe(0.002, names.name(query))
+
+    per_query = time_call(observe_queries, requests) / len(queries)
+    print(f"{'per query (name + observe)':<28}{per_query:>10.2f}")
+    render = time_call(registry.render, 100)
+    print(f"{'render /metrics':<28}{render:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    main(args.requests, args.rounds)
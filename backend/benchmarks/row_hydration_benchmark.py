@@ -0,0 +1,104 @@
+"""
+Cost of turning database rows into response models, validated or trusted.
+
+Builds --rows rows shaped like the users list and the authentication query
+and times, for each output schema:
+
+- validated: Schema(**dict(record)), full Pydantic validation
+- trusted: BaseRepository._from_record, Schema.construct without validation
+
+No database is needed, the rows are plain mappings with the types asyncpg
+returns.
+
+    cd backend && python -m benchmarks.row_hydration_benchmark --rows 1000
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime, timezone
+from typing import Callable, List, Mapping, Tuple, Type
+from uuid import uuid4
+
+from pydantic import BaseModel
+
+from modules.users.users.user_repositories import UserRepository
+from modules.users.users.user_schemas import UserInDB, UserOut, UserPublic
+
+
+def list_row(n: int) -> Mapping:
+    return {
+        "id": uuid4(),
+        "fullname": f"Bench User {n}",
+        "username": f"bench_user_{n}",
+        "email": f"bench_user_{n}@bench.com",
+        "is_active": True,
+        "role_id": uuid4(),
+        "role": "bench role",
+        "created_by": "Bench Admin",
+        "updated_by": "Bench Admin",
+        "total_count": 1000,
+    }
+
+
+def public_row(n: int) -> Mapping:
+    now = datetime.now(timezone.utc)
+    return {
+        "id": uuid4(),
+        "fullname": f"Bench User {n}",
+        "username": f"bench_user_{n}",
+        "email": f"bench_user_{n}@bench.com",
+        "is_active": True,
+        "is_superadmin": False,
+        "role_id": uuid4(),
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def auth_row(n: int) -> Mapping:
+    return {
+        **public_row(n),
+        "password": "$2b$12$" + "x" * 53,
+        "salt": "x" * 29,
+        "role": "bench role",
+        "permissions": ["users:users_list", "users:read-user-by-id", "roles:roles_list"],
+        "created_by": uuid4(),
+        "updated_by": uuid4(),
+    }
+
+
+def time_path(hydrate: Callable[[Mapping], object], rows: List[Mapping], runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        for row in rows:
+            hydrate(row)
+        timings.append(time.perf_counter() - started)
+
+    return statistics.median(timings) / len(rows) * 1_000_000
+
+
+def main(rows: int, runs: int) -> None:
+    repository = UserRepository(db=None)
+    cases: Tuple[Tuple[str, Type[BaseModel], Callable[[int], Mapping]], ...] = (
+        ("UserOut", UserOut, list_row),
+        ("UserPublic", UserPublic, public_row),
+        ("UserInDB", UserInDB, auth_row),
+    )
+
+    print(f"{rows} rows, median of {runs} runs (µs per row)")
+    print(f"{'schema':<14}{'validated':>12}{'trusted':>12}{'speedup':>10}")
+    for name, schema, make_row in cases:
+        sample = [make_row(n) for n in range(rows)]
+        validated = time_path(lambda row: schema(**dict(row)), sample, runs)
+        trusted = time_path(lambda row: repository._from_record(row, schema), sample, runs)
+        print(f"{name:<14}{validated:>12.2f}{trusted:>12.2f}{validated / trusted:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    main(args.rows, args.runs)
@@ -0,0 +1,109 @@
+"""
+Latency of the users list search before and after the trigram indexes.
+
+Seeds the users table of the database (the test database by default, it must
+be migrated to head) with --users rows, then times the filtered list query:
+
+- before: the old LIKE / ILIKE predicate over users JOIN roles, run inside a
+  transaction that drops the trigram indexes and is rolled back
+- after: the current user_list_search predicate with the indexes in place
+
+The seeded rows are deleted at the end.
+
+    cd backend && TESTING=1 python -m benchmarks.users_search_benchmark --users 100000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from databases import Database
+
+from modules.users.users.user_sqlstaments import (
+    GET_USERS_LIST,
+    user_list_complements,
+    user_list_pagination,
+    user_list_search,
+)
+from shared.core.db.db_tasks import get_database_url
+
+OLD_USER_LIST_SEARCH = """ WHERE (us.fullname LIKE :search
+        or us.username ILIKE :search
+        or ro.role ILIKE :search
+        or us.email ILIKE :search) """
+
+TRIGRAM_INDEXES = (
+    "ix_users_fullname_trgm",
+    "ix_users_username_trgm",
+    "ix_users_email_trgm",
+    "ix_roles_role_trgm",
+)
+
+BENCH_ROLE = "bench search role"
+
+SEED_ROLE = """
+    INSERT INTO roles (id, role, permissions, is_active)
+    VALUES (gen_random_uuid(), :role, ARRAY['users:users_list'], true)
+    ON CONFLICT (role) DO UPDATE SET role = EXCLUDED.role
+    RETURNING id;
+"""
+
+SEED_USERS = """
+    INSERT INTO users (id, fullname, username, salt, password, email, is_superadmin,
+        role_id, is_active)
+    SELECT gen_random_uuid(), 'Bench User ' || n, 'bench_user_' || n, 'salt', 'password',
+        'bench_user_' || n || '@bench.com', false, :role_id, true
+    FROM generate_series(1, :users) AS n;
+"""
+
+DELETE_USERS = "DELETE FROM users WHERE role_id = :role_id;"
+DELETE_ROLE = "DELETE FROM roles WHERE id = :role_id;"
+
+SEARCH_TERMS = ("bench_user_4242", "User 999", "nobody-matches-this", "bench search")
+
+
+async def time_query(db: Database, query: str, search: str, runs: int) -> float:
+    values = {"search": f"%{search}%", "limit": 10, "offset": 0}
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        await db.fetch_all(query=query, values=values)
+        timings.append(time.perf_counter() - started)
+
+    return statistics.median(timings) * 1000
+
+
+async def main(users: int, runs: int) -> None:
+    sort = user_list_complements(None, None) + user_list_pagination()
+    old_query = GET_USERS_LIST + OLD_USER_LIST_SEARCH + sort
+    new_query = GET_USERS_LIST + user_list_search() + sort
+
+    async with Database(get_database_url()) as db:
+        role_id = await db.fetch_val(query=SEED_ROLE, values={"role": BENCH_ROLE})
+        await db.execute(query=SEED_USERS, values={"role_id": role_id, "users": users})
+        await db.execute(query="ANALYZE users;")
+        await db.execute(query="ANALYZE roles;")
+
+        try:
+            print(f"{users} users, median of {runs} runs (ms)")
+            print(f"{'search':<24}{'before':>10}{'after':>10}")
+            for search in SEARCH_TERMS:
+                async with db.transaction(force_rollback=True):
+                    for index in TRIGRAM_INDEXES:
+                        await db.execute(query=f"DROP INDEX IF EXISTS {index};")
+                    before = await time_query(db, old_query, search, runs)
+
+                after = await time_query(db, new_query, search, runs)
+                print(f"{search:<24}{before:>10.2f}{after:>10.2f}")
+        finally:
+            await db.execute(query=DELETE_USERS, values={"role_id": role_id})
+            await db.execute(query=DELETE_ROLE, values={"role_id": role_id})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.users, args.runs))
@@ -0,0 +1,62 @@
+from uuid import UUID
+
+from modules.users.users.user_schemas import UserInDB
+from shared.core.config import PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL
+from shared.core.db.db_notifications import subscribe
+from shared.core.metrics import metrics
+from shared.utils.ttl_cache import TTLCache
+
+
+class PrincipalCache:
+    """
+    Users resolved by `get_user_from_token`, keyed by username.
+
+    Every invalidation bumps `generation`; a lookup that started before an
+    invalidation must not store its (possibly stale) result. Cached users are
+    shared between requests and must be treated as read-only.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self._users = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.generation = 0
+
+    def get(self, username: str) -> UserInDB | None:
+        return self._users.get(username)
+
+    def set(self, user: UserInDB, generation: int) -> None:
+        if generation == self.generation:
+            self._users.set(user.username, user)
+
+    def invalidate_user(self, id: UUID) -> None:
+        self.generation += 1
+        self._users.evict_where(lambda user: str(user.id) == str(id))
+
+    def invalidate_role(self, role_id: UUID) -> None:
+        self.generation += 1
+        self._users.evict_where(lambda user: str(user.role_id) == str(role_id))
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._users.clear()
+
+    def stats(self) -> dict:
+        return self._users.stats()
+
+    def collect(self) -> None:
+        stats = self.stats()
+        metrics.counter("cache_hits_total", "Lookups found in a cache", ("cache",)).set(
+            stats["hits"], "principal"
+        )
+        metrics.counter("cache_misses_total", "Lookups missing from a cache", ("cache",)).set(
+            stats["misses"], "principal"
+        )
+        metrics.gauge("cache_entries", "Entries held by a cache", ("cache",)).set(
+            stats["size"], "principal"
+        )
+
+
+principal_cache = PrincipalCache(maxsize=PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL)
+subscribe("user", principal_cache.invalidate_user)
+subscribe("role", principal_cache.invalidate_role)
+subscribe("all", principal_cache.clear)
+metrics.collector("principal_cache", principal_cache.collect)
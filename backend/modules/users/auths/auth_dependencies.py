@@ -1,13 +1,15 @@
 from databases import Database
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 
+from modules.users.auths.auth_cache import principal_cache
 from modules.users.auths.auth_services import AuthService
 from modules.users.auths.auth_exceptions import AuthExceptions
 from modules.users.users.user_repositories import UserRepository
 from modules.users.users.user_schemas import UserInDB
 from shared.core.config import SECRET_KEY, API_PREFIX
 from shared.core.db.db_dependencies import get_database
+from shared.utils.verify_auth import is_authorized
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{API_PREFIX}/users/login/")
@@ -22,7 +24,12 @@ async def get_user_from_token(
         username = AuthService().get_username_from_token(
             token=token, secret_key=str(SECRET_KEY)
         )
-        user = await user_repo.get_user_by_username(username=username)
+        user = principal_cache.get(username)
+        if user is None:
+            generation = principal_cache.generation
+            user = await user_repo.get_user_by_username(username=username)
+            if user:
+                principal_cache.set(user, generation)
     except Exception as e:
         raise e
 
@@ -37,3 +44,15 @@ def get_current_active_user(
     if not current_user.is_active:
         raise AuthExceptions.AuthUnauthorizedException()
     return current_user
+
+
+def get_authorized_user(
+    request: Request,
+    current_user: UserInDB = Depends(get_current_active_user),
+) -> UserInDB:
+    """_
+        the name of the route is the permission required to access it
+    """
+    if not is_authorized(current_user, request.scope["route"].name):
+        raise AuthExceptions.AuthUnauthorizedException()
+    return current_user
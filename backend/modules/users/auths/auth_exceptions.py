@@ -88,3 +88,13 @@ class AuthExceptions:
             # context = {"message": "No se pudo validar el token"}
             msg = "El token ya no es válido"
             AppExceptionCase.__init__(self, status_code, msg)
+
+    class AuthPasswordHasherBusyException(AppExceptionCase):
+        """_
+        Password hashing pool is saturated or took too long
+        """
+
+        def __init__(self, msg: str = ""):
+            status_code = 503
+            msg = "El servicio de autenticación está ocupado, intente nuevamente"
+            AppExceptionCase.__init__(self, status_code, msg)
@@ -0,0 +1,178 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+from loguru import logger
+from modules.users.auths.auth_exceptions import AuthExceptions
+from passlib.context import CryptContext
+from shared.core.config import (
+    PASSWORD_HASH_QUEUE_DEPTH,
+    PASSWORD_HASH_TIMEOUT,
+    PASSWORD_HASH_WORKERS,
+)
+from shared.core.metrics import metrics
+from shared.core.middlewares.server_timing import record_timing
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# bcrypt takes hundreds of milliseconds by design
+HASH_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+
+
+# these run inside the worker processes, submitted_at lets them report how
+# long the job waited in the pool queue
+def _hash(secret: str, submitted_at: float) -> Tuple[str, float, float]:
+    started_at = time.time()
+    hashed = pwd_context.hash(secret)
+    return hashed, started_at - submitted_at, time.time() - started_at
+
+
+def _verify(secret: str, hashed: str, submitted_at: float) -> Tuple[bool, float, float]:
+    started_at = time.time()
+    valid = pwd_context.verify(secret, hashed)
+    return valid, started_at - submitted_at, time.time() - started_at
+
+
+class PasswordHasher:
+    """
+    Async facade over bcrypt backed by a bounded process pool.
+
+    At most `queue_depth` operations may be pending at once, further calls
+    are rejected right away instead of piling up behind a login burst. With
+    `workers=0` the work runs in the loop's default thread pool.
+
+    Bulk jobs (`hash_many`) share `workers - 1` slots, so logins always find
+    a free worker while imports run. With a single worker they share one
+    slot: a login waits behind one bulk hash at most, not a whole import.
+    """
+
+    def __init__(self, workers: int, queue_depth: int, timeout: float) -> None:
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.timeout = timeout
+        self._executor: ProcessPoolExecutor | None = None
+        self._pending = 0
+        # shared by every hash_many call, two imports at once still leave a worker free
+        self._bulk_slots = asyncio.Semaphore(max(workers - 1, 1))
+        self._metrics = {
+            operation: {"count": 0, "queue_wait": 0.0, "hash_time": 0.0, "max_hash_time": 0.0}
+            for operation in ("hash", "hash_many", "verify")
+        }
+        self._rejected = 0
+        self._timeouts = 0
+        self.hash_time = metrics.histogram(
+            "password_hash_duration_seconds",
+            "Time bcrypt took in a worker by operation",
+            ("operation",),
+            buckets=HASH_BUCKETS,
+        )
+        self.queue_wait = metrics.histogram(
+            "password_hash_queue_wait_seconds",
+            "Time the operations waited for a free worker",
+            ("operation",),
+        )
+
+    def start(self) -> None:
+        if self._executor is None and self.workers > 0:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def hash(self, secret: str) -> str:
+        return await self._run("hash", _hash, secret)
+
+    async def hash_many(self, secrets: List[str]) -> List[str]:
+        """
+        Hashes `secrets` one job each, with the timeout of a single hash, in
+        the bulk slots of the hasher
+        """
+
+        async def hash_one(secret: str) -> str:
+            async with self._bulk_slots:
+                return await self._run("hash_many", _hash, secret)
+
+        return await asyncio.gather(*(hash_one(secret) for secret in secrets))
+
+    async def verify(self, secret: str, hashed: str) -> bool:
+        return await self._run("verify", _verify, secret, hashed)
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def stats(self) -> Dict:
+        return {
+            "workers": self.workers,
+            "pending": self._pending,
+            "rejected": self._rejected,
+            "timeouts": self._timeouts,
+            **{operation: dict(values) for operation, values in self._metrics.items()},
+        }
+
+    def collect(self) -> None:
+        metrics.gauge("password_hash_pending", "Password operations pending").set(self._pending)
+        metrics.counter(
+            "password_hash_rejected_total", "Password operations rejected by a full queue"
+        ).set(self._rejected)
+        metrics.counter("password_hash_timeouts_total", "Password operations that timed out").set(
+            self._timeouts
+        )
+
+    def _release(self, future: asyncio.Future) -> None:
+        self._pending -= 1
+        if not future.cancelled():
+            # a job that timed out may still fail, nobody else reads its exception
+            future.exception()
+
+    async def _run(self, operation: str, func, *args, timeout: float | None = None):
+        if self._pending >= self.queue_depth:
+            self._rejected += 1
+            logger.warning("Password {} rejected, {} operations pending", operation, self._pending)
+            raise AuthExceptions.AuthPasswordHasherBusyException()
+
+        self.start()
+        self._pending += 1
+        started = time.perf_counter()
+        try:
+            future = asyncio.get_running_loop().run_in_executor(
+                self._executor, func, *args, time.time()
+            )
+        except Exception:
+            self._pending -= 1
+            raise
+        # the slot is freed when the worker is, a timed out job keeps running
+        future.add_done_callback(self._release)
+        timeout = timeout or self.timeout
+        try:
+            result, queue_wait, hash_time = await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            self._timeouts += 1
+            logger.warning("Password {} timed out after {}s", operation, timeout)
+            raise AuthExceptions.AuthPasswordHasherBusyException()
+        finally:
+            record_timing("hash", time.perf_counter() - started)
+
+        totals = self._metrics[operation]
+        totals["count"] += 1
+        totals["queue_wait"] += queue_wait
+        totals["hash_time"] += hash_time
+        totals["max_hash_time"] = max(totals["max_hash_time"], hash_time)
+        self.hash_time.observe(hash_time, operation)
+        self.queue_wait.observe(queue_wait, operation)
+
+        return result
+
+
+password_hasher = PasswordHasher(
+    workers=PASSWORD_HASH_WORKERS,
+    queue_depth=PASSWORD_HASH_QUEUE_DEPTH,
+    timeout=PASSWORD_HASH_TIMEOUT,
+)
+metrics.collector("password_hasher", password_hasher.collect)
@@ -21,12 +21,7 @@ class AuthRepository(BaseRepository):
     async def authenticate_user(self, username: str, password: str) -> UserInDB | None:
 
         user_repo = UserRepository(self.db)
-        user = await user_repo.get_user_by_username(username=username)
-
-        if not user:
-            return None
-
-        return UserInDB(**user.dict())
+        return await user_repo.get_user_by_username(username=username)
 
     async def save_token_used(self, token: str) -> dict:
         from modules.users.auths.auth_sqlstaments import SAVE_TOKEN
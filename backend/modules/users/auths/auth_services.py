@@ -1,5 +1,6 @@
 import uuid
 from datetime import datetime, timedelta, timezone
+from typing import List
 from xml.dom import ValidationErr
 
 import bcrypt
@@ -8,6 +9,7 @@ from databases import Database
 from icecream import ic
 from loguru import logger
 from modules.users.auths.auth_exceptions import AuthExceptions
+from modules.users.auths.auth_hasher import password_hasher
 from modules.users.auths.auth_repositories import AuthRepository
 from modules.users.auths.auth_schemas import (
     AccessToken,
@@ -19,7 +21,6 @@ from modules.users.auths.auth_schemas import (
     JWTPayload,
 )
 from modules.users.users.user_schemas import UserInDB, UserPasswordUpdate
-from passlib.context import CryptContext
 from pydantic import ValidationError
 from shared.core.config import (
     ACCESS_TOKEN_EXPIRE_MINUTES,
@@ -29,24 +30,34 @@ from shared.core.config import (
 )
 from shared.utils.service_result import ServiceResult
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-
 class AuthService:
-    def create_salt_and_hashedpassword(self, plaintext_password: str) -> str:
+    async def create_salt_and_hashedpassword(self, plaintext_password: str) -> str:
         salt = self._generate_salt()
-        hashed_password = self._hash_password(password=plaintext_password, salt=salt)
+        hashed_password = await self._hash_password(password=plaintext_password, salt=salt)
 
         return UserPasswordUpdate(salt=salt, password=hashed_password)
 
+    async def create_salts_and_hashedpasswords(
+        self, plaintext_passwords: List[str]
+    ) -> List[UserPasswordUpdate]:
+        salts = [self._generate_salt() for _ in plaintext_passwords]
+        hashed_passwords = await password_hasher.hash_many(
+            [password + salt for password, salt in zip(plaintext_passwords, salts)]
+        )
+
+        return [
+            UserPasswordUpdate(salt=salt, password=hashed_password)
+            for salt, hashed_password in zip(salts, hashed_passwords)
+        ]
+
     def _generate_salt(self) -> str:
         return bcrypt.gensalt().decode()
 
-    def _hash_password(self, *, password: str, salt: str) -> str:
-        return pwd_context.hash(password + salt)
+    async def _hash_password(self, *, password: str, salt: str) -> str:
+        return await password_hasher.hash(password + salt)
 
-    def verify_password(self, password: str, salt: str, hashed_pw: str) -> bool:
-        return pwd_context.verify(password + salt, hashed_pw)
+    async def verify_password(self, password: str, salt: str, hashed_pw: str) -> bool:
+        return await password_hasher.verify(password + salt, hashed_pw)
 
     def create_access_token_for_user(
         self,
@@ -91,11 +102,15 @@ class AuthService:
         user = await AuthRepository(db).authenticate_user(username=username, password=password)
 
         if not user:
-            logger.error(f"Trying to login with invalid credentials, username: {username}")
+            logger.bind(sample="invalid_login").error(
+                "Trying to login with invalid credentials, username: {}", username
+            )
             return ServiceResult(AuthExceptions.AuthNoValidCredencialsException())
 
-        if not self.verify_password(password=password, salt=user.salt, hashed_pw=user.password):
-            logger.error(f"Trying to login with invalid credentials, username: {username}")
+        if not await self.verify_password(password=password, salt=user.salt, hashed_pw=user.password):
+            logger.bind(sample="invalid_login").error(
+                "Trying to login with invalid credentials, username: {}", username
+            )
             return ServiceResult(AuthExceptions.AuthNoValidCredencialsException())
 
         user_autenticated = AuthResponse(
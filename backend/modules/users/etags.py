@@ -0,0 +1,86 @@
+import json
+from urllib.parse import urlencode
+from uuid import UUID
+
+from fastapi import Depends, Path, Request
+from fastapi.encoders import jsonable_encoder
+
+from modules.users.auths.auth_dependencies import get_authorized_user
+from modules.users.permissions import get_permissions
+from modules.users.users.user_schemas import UserInDB
+from shared.core.config import ETAG_STORE_SIZE
+from shared.core.db.db_notifications import subscribe
+from shared.core.middlewares.conditional_get import NotModified
+from shared.utils.etag_store import ETagStore, content_etag, etag_matches
+
+etag_store = ETagStore(maxsize=ETAG_STORE_SIZE)
+
+# the catalog only changes with a deploy
+PERMISSIONS_ETAG = content_etag(
+    json.dumps(jsonable_encoder(get_permissions()), sort_keys=True).encode()
+)
+
+
+def invalidate_user(id: UUID) -> None:
+    # the lists show the names of the users who created and updated each row
+    etag_store.invalidate(f"user:{id}", "users", "roles")
+
+
+def invalidate_role(id: UUID) -> None:
+    # the users list shows the role of each user
+    etag_store.invalidate(f"role:{id}", "roles", "users")
+
+
+subscribe("user", invalidate_user)
+subscribe("role", invalidate_role)
+subscribe("users", lambda _: etag_store.invalidate("users"))
+subscribe("roles", lambda _: etag_store.invalidate("roles"))
+subscribe("all", etag_store.clear)
+
+
+def conditional_get(request: Request, etag: str) -> str:
+    """
+    Leaves `etag` for the ETagMiddleware and answers 304 when the client
+    already has it
+    """
+    request.state.etag = etag
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise NotModified(etag)
+    return etag
+
+
+def list_variant(request: Request) -> str:
+    return urlencode(sorted(request.query_params.multi_items()))
+
+
+# every dependency authorizes first, a client without access never gets a 304
+
+
+async def permissions_etag(
+    request: Request, current_user: UserInDB = Depends(get_authorized_user)
+) -> str:
+    return conditional_get(request, PERMISSIONS_ETAG)
+
+
+async def users_list_etag(
+    request: Request, current_user: UserInDB = Depends(get_authorized_user)
+) -> str:
+    return conditional_get(request, etag_store.tag("users", list_variant(request)))
+
+
+async def user_etag(
+    request: Request, id: UUID = Path(...), current_user: UserInDB = Depends(get_authorized_user)
+) -> str:
+    return conditional_get(request, etag_store.tag(f"user:{id}"))
+
+
+async def roles_list_etag(
+    request: Request, current_user: UserInDB = Depends(get_authorized_user)
+) -> str:
+    return conditional_get(request, etag_store.tag("roles", list_variant(request)))
+
+
+async def role_etag(
+    request: Request, id: UUID = Path(...), current_user: UserInDB = Depends(get_authorized_user)
+) -> str:
+    return conditional_get(request, etag_store.tag(f"role:{id}"))
@@ -1,31 +1,37 @@
-from typing import List
+from bisect import bisect_left
+from types import MappingProxyType
+from typing import Any, FrozenSet, Mapping, Tuple
 
 from loguru import logger
 
 
-async def get_permissions() -> List:
-    """_
-        function that configurates and returns permissions to access
-        all routes defined in the system
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
 
-    Returns:
-        a List[Dict[key: "funtionality_name" : route[List[Dict]]]]
-        List: _description_
-    """
 
-    permissions = [
+# permissions needed to access every route defined in the system, grouped by
+# functionality; the catalog is shared, so it is read-only all the way down
+PERMISSIONS = _freeze(
+    [
         {
             "functionality": "USUARIOS",
             "routes": [
                 {"permissions:list-permissions": "Listar permisos"},
                 {"roles:create-role": "Crear rol"},
                 {"roles:roles_list": "Listar roles"},
+                {"roles:export-roles": "Exportar roles en formato NDJSON o CSV"},
                 {"roles:get-role-by-id": "Obtener un rol por su id"},
                 {"roles:update-role-by-id": "Actualizar un rol por su id"},
                 {"roles:update-activate-role-by-id": "Activar / Desactivar un rol por su id"},
                 {"roles:delete-role-by-id": "Eliminar un rol por su id"},
                 {"users:create-user": "Crear usuario"},
+                {"users:import-users": "Importar usuarios desde un archivo CSV o NDJSON"},
                 {"users:users_list": "Listar usuarios"},
+                {"users:export-users": "Exportar usuarios en formato NDJSON o CSV"},
                 {"users:get-user-by-id": "Obtener un usuario por su id"},
                 {"users:activate-user-by-id": "Activar / Desactivar un usuario por su id"},
                 {"users:update-user-by-id": "Actualizar un usuario por su id"},
@@ -34,19 +40,59 @@ async def get_permissions() -> List:
             ],
         },
     ]
+)
+
+PERMISSION_FUNCTIONALITY: Mapping[str, str] = MappingProxyType(
+    {
+        permission: dic["functionality"]
+        for dic in PERMISSIONS
+        for route in dic["routes"]
+        for permission in route
+    }
+)
+
+FUNCTIONALITY_PERMISSIONS: Mapping[str, FrozenSet[str]] = MappingProxyType(
+    {
+        dic["functionality"]: frozenset(
+            permission for route in dic["routes"] for permission in route
+        )
+        for dic in PERMISSIONS
+    }
+)
+
+_SORTED_FUNCTIONALITIES = tuple(sorted(FUNCTIONALITY_PERMISSIONS))
+
+
+def get_permissions() -> Tuple:
+    """_
+        returns the permissions to access all routes defined in the system
 
-    return permissions
+    Returns:
+        a Tuple[Dict[key: "funtionality_name" : route[List[Dict]]]]
+    """
+
+    return PERMISSIONS
+
+
+def verify_permissions(permission: str) -> bool:
+    return permission in PERMISSION_FUNCTIONALITY
 
 
-async def verify_permissions(permission: str) -> bool:
-    permissions = await get_permissions()
+def get_functionality_permissions(functionality: str) -> FrozenSet[str]:
+    return FUNCTIONALITY_PERMISSIONS.get(functionality, frozenset())
+
+
+def find_functionality(search: str) -> str:
+    """_
+    returns the functionality starting with `search`, or else the first
+    one containing it, or an empty string when none matches
+    """
+    index = bisect_left(_SORTED_FUNCTIONALITIES, search)
+    if index < len(_SORTED_FUNCTIONALITIES) and _SORTED_FUNCTIONALITIES[index].startswith(search):
+        return _SORTED_FUNCTIONALITIES[index]
 
-    found = False
-    for dic in permissions:
-        routes = dic.get("routes")
-        for route in routes:
-            if permission in route:
-                found = True
-                return found
+    for functionality in _SORTED_FUNCTIONALITIES:
+        if search in functionality:
+            return functionality
 
-    return found
+    return ""
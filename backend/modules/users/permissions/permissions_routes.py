@@ -4,13 +4,12 @@ from uuid import UUID
 
 from fastapi import APIRouter, Depends, status
 from icecream import ic
-from modules.users.auths.auth_dependencies import get_current_active_user
-from modules.users.auths.auth_exceptions import AuthExceptions
+from modules.users.auths.auth_dependencies import get_authorized_user
+from modules.users.etags import permissions_etag
 from modules.users.permissions.permissions_schemas import PermissionsOut
 from modules.users.permissions.permissions_services import PermissionsService
 from modules.users.users.user_schemas import UserInDB
 from shared.utils.service_result import ServiceResult, handle_result
-from shared.utils.verify_auth import is_authorized
 
 router = APIRouter(
     prefix="/permissions",
@@ -19,10 +18,7 @@ router = APIRouter(
 )
 
 
-@router.get("/list", name="permissions:list-permissions")
-async def list_permissions(current_user: UserInDB = Depends(get_current_active_user)):
-    if not is_authorized(current_user, "permissions:list-permissions"):
-        return handle_result(ServiceResult(AuthExceptions.AuthUnauthorizedException()))
-
+@router.get("/list", name="permissions:list-permissions", dependencies=[Depends(permissions_etag)])
+async def list_permissions(current_user: UserInDB = Depends(get_authorized_user)):
     result = await PermissionsService().list_permissions()
     return handle_result(result)
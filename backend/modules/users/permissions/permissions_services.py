@@ -9,7 +9,7 @@ from shared.utils.service_result import ServiceResult
 
 class PermissionsService:
     async def list_permissions(self) -> ServiceResult:
-        permissions = await get_permissions()
+        permissions = get_permissions()
 
         if not permissions:
             return ServiceResult(PermissionsExceptions.PermissionsListException)
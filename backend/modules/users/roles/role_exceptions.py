@@ -102,3 +102,13 @@ class RoleExceptions:
             status_code = 409
             msg = "No se puede desactivar / eliminar este rol. Hay usuarios que lo usan"
             AppExceptionCase.__init__(self, status_code, msg)
+
+    class RoleInvalidCursorException(AppExceptionCase):
+        """_
+        Roles list cursor invalid
+        """
+
+        def __init__(self, msg: str = ""):
+            status_code = 422
+            msg = "Cursor de paginación inválido"
+            AppExceptionCase.__init__(self, status_code, msg)
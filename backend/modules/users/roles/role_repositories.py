@@ -1,12 +1,12 @@
 from datetime import datetime
-from typing import Any, List, Type
+from typing import Any, AsyncIterator, List, Mapping, Type
 from uuid import UUID
 
 from databases import Database
 from icecream import ic
 from loguru import logger
 
-from modules.users.permissions import get_permissions
+from modules.users.permissions import find_functionality, get_functionality_permissions
 from modules.users.roles.role_exceptions import RoleExceptions
 from modules.users.roles.role_schemas import (
     RoleIn,
@@ -15,6 +15,8 @@ from modules.users.roles.role_schemas import (
     RoleUpdateActive,
 )
 from modules.users.users.user_schemas import UserInDB
+from shared.core.db.db_notifications import publish
+from shared.utils.json_pagination import paginated_json_query
 from shared.utils.record_to_dict import record_to_dict
 from shared.utils.repositories_base import BaseRepository
 
@@ -33,9 +35,8 @@ class RoleRepository(BaseRepository):
 
         values = self.preprocess_create(role.dict())
         role_record = await self.db.fetch_one(query=CREATE_ROLE_ITEM, values=values)
-        role_in_db = record_to_dict(role_record)
-
-        return self._schema_out(**role_in_db)
+        await publish(self.db, "roles", role_record["id"])
+        return self._from_record(record_to_dict(role_record))
 
     async def get_role_by_name(self, role: str) -> RoleOut:
         from modules.users.roles.role_sqlsentences import GET_ROLE_BY_NAME
@@ -46,7 +47,7 @@ class RoleRepository(BaseRepository):
         if not record:
             return None
 
-        return self._schema_out(**dict(record))
+        return self._from_record(record)
 
     async def get_role_by_id(self, id: UUID) -> RoleOut | dict:
         from modules.users.roles.role_sqlsentences import GET_ROLE_BY_ID
@@ -56,8 +57,7 @@ class RoleRepository(BaseRepository):
         if not record:
             return {}
 
-        role_in_db = record_to_dict(record)
-        return self._schema_out(**role_in_db)
+        return self._from_record(record_to_dict(record))
 
     async def get_roles_list(
         self,
@@ -79,26 +79,15 @@ class RoleRepository(BaseRepository):
         sql_sort = role_list_sort(order, direction)
         sql_search = role_list_search()
 
-        results = []
         if not search:
             sql_sentence = GET_ROLES_LIST + sql_sort
             records = await self.db.fetch_all(query=sql_sentence, values=values)
         else:
-            found = await self.__check_functionality(search.upper())
+            found = find_functionality(search.upper())
             if len(found) > 0:
-                permit_list = await self.__get_permits(found)
-                for permit in permit_list:
-                    values["permit"] = permit
-                    sql_sentence = GET_ROLES_LIST_FUNCTIONALITY + sql_sort
-
-                    records_in_db = await self.db.fetch_all(
-                        query=sql_sentence, values=values
-                    )
-                    results.extend(records_in_db)
-
-                temp = [dict(record) for record in results]
-                records = []
-                [records.append(role) for role in temp if role not in records]
+                values["permits"] = list(get_functionality_permissions(found))
+                sql_sentence = GET_ROLES_LIST_FUNCTIONALITY + sql_sort
+                records = await self.db.fetch_all(query=sql_sentence, values=values)
             else:
                 sql_sentence = GET_ROLES_LIST + sql_search + sql_sort
                 values["search"] = "%" + search.lower() + "%"
@@ -110,7 +99,131 @@ class RoleRepository(BaseRepository):
         if not records:
             return []
 
-        return [self._schema_out(**dict(record)) for record in records]
+        return self._from_records(records)
+
+    async def get_roles_list_json(
+        self,
+        search: str | None,
+        order: str | None,
+        direction: str | None,
+        page_num: int,
+        page_size: int,
+        next_page: str,
+        previous_page: str | None,
+    ) -> str:
+        """
+        The requested page of get_roles_list, sliced and rendered by Postgres
+        as the JSON of the paginated response
+        """
+        from modules.users.roles.role_sqlsentences import (
+            role_list_search,
+            role_list_sort,
+            COUNT_ROLES_LIST,
+            GET_ROLES_LIST_PAGE,
+            ROLE_LIST_FUNCTIONALITY_SEARCH,
+        )
+
+        order = order.lower() if order != None else None
+        direction = direction.upper() if order != None else None
+        values = {
+            "limit": page_size,
+            "offset": (page_num - 1) * page_size,
+            "page_size": page_size,
+            "page_end": page_num * page_size,
+            "next": next_page,
+            "previous": previous_page,
+        }
+
+        sql_search = ""
+        found = find_functionality(search.upper()) if search else ""
+        if len(found) > 0:
+            sql_search = ROLE_LIST_FUNCTIONALITY_SEARCH
+            values["permits"] = list(get_functionality_permissions(found))
+        elif search:
+            sql_search = role_list_search()
+            values["search"] = "%" + search.lower() + "%"
+
+        sql_sort = role_list_sort(order, direction).rstrip(";")
+        page = GET_ROLES_LIST_PAGE + sql_search + sql_sort
+        sql_sentence = paginated_json_query(
+            page + " LIMIT :limit OFFSET :offset", COUNT_ROLES_LIST + sql_search, RoleOut, sql_sort
+        )
+        return await self.db.fetch_val(query=sql_sentence, values=values)
+
+    async def get_roles_list_by_cursor(
+        self,
+        search: str | None,
+        order: str | None,
+        direction: str | None,
+        cursor: dict,
+        limit: int,
+    ) -> List[RoleOut]:
+        from modules.users.roles.role_sqlsentences import (
+            role_list_keyset,
+            role_list_search,
+            GET_ROLES_LIST,
+            GET_ROLES_LIST_FUNCTIONALITY,
+        )
+
+        before = cursor.get("before", False)
+        predicate, sql_sort = role_list_keyset(order, direction, before)
+        values = {"limit": limit}
+        if cursor:
+            values["cursor_key"] = cursor["key"]
+            values["cursor_id"] = cursor["id"]
+
+        found = find_functionality(search.upper()) if search else ""
+        if len(found) > 0:
+            sql_sentence = GET_ROLES_LIST_FUNCTIONALITY
+            values["permits"] = list(get_functionality_permissions(found))
+        else:
+            sql_sentence = GET_ROLES_LIST
+            if search:
+                sql_sentence += role_list_search()
+                values["search"] = "%" + search.lower() + "%"
+
+        if cursor:
+            sql_sentence += (" AND" if search else " WHERE") + predicate
+
+        records = await self.db.fetch_all(query=sql_sentence + sql_sort, values=values)
+
+        roles = self._from_records(records)
+        if before:
+            roles.reverse()
+
+        return roles
+
+    def export_roles(self, search: str | None) -> AsyncIterator[Mapping]:
+        """
+        Iterates the roles over a server-side cursor, filtered like the roles
+        list
+        """
+        from modules.users.roles.role_sqlsentences import (
+            role_list_search,
+            role_list_sort,
+            GET_ROLES_LIST,
+            GET_ROLES_LIST_FUNCTIONALITY,
+        )
+
+        values = {}
+        found = find_functionality(search.upper()) if search else ""
+        if len(found) > 0:
+            sql_sentence = GET_ROLES_LIST_FUNCTIONALITY
+            values["permits"] = list(get_functionality_permissions(found))
+        else:
+            sql_sentence = GET_ROLES_LIST
+            if search:
+                sql_sentence += role_list_search()
+                values["search"] = "%" + search.lower() + "%"
+
+        sql_sentence += role_list_sort(None, None)
+        return self.db.iterate(query=sql_sentence, values=values)
+
+    @staticmethod
+    def get_sort_key(order: str | None, role: RoleOut):
+        from modules.users.roles.role_sqlsentences import role_list_sort_column
+
+        return getattr(role, role_list_sort_column(order).split(".")[-1])
 
     async def update_role(
         self, id: UUID, role_update: RoleUpdate, updated_by_id: UUID
@@ -129,10 +242,10 @@ class RoleRepository(BaseRepository):
             record = await self.db.fetch_one(
                 query=UPDATE_ROLE_BY_ID, values=role_update_params.dict()
             )
-            role_in_db = record_to_dict(record)
-            return self._schema_out(**role_in_db)
+            await publish(self.db, "role", id)
+            return self._from_record(record_to_dict(record))
         except Exception as e:
-            logger.error(f"Datos inválidos para actualizar un rol: {e}")
+            logger.error("Datos inválidos para actualizar un rol: {}", e)
             raise RoleExceptions.RoleInvalidUpdateParamsException()
 
     async def update_active_role(
@@ -153,10 +266,10 @@ class RoleRepository(BaseRepository):
             record = await self.db.fetch_one(
                 query=UPDATE_ROLE_BY_ID, values=role_update_params.dict()
             )
-            role_in_db = record_to_dict(record)
-            return self._schema_out(**role_in_db)
+            await publish(self.db, "role", id)
+            return self._from_record(record_to_dict(record))
         except Exception as e:
-            logger.error(f"Datos inválidos para actualizar un rol: {e}")
+            logger.error("Datos inválidos para actualizar un rol: {}", e)
             raise RoleExceptions.RoleInvalidUpdateParamsException()
 
     async def delete_role(
@@ -170,35 +283,5 @@ class RoleRepository(BaseRepository):
             return {}
 
         deleted_id = await self.db.execute(query=DELETE_ROLE_BY_ID, values={"id": id})
+        await publish(self.db, "role", id)
         return str(deleted_id)
-
-    # utility methods to search by funcionality
-    async def __get_functionalities(self):
-        permissions = await get_permissions()
-        funct_list = []
-        for dic in permissions:
-            funct_list.append(dic.get("functionality"))
-
-        return funct_list
-
-    async def __get_permits(self, search: str):
-        permissions = await get_permissions()
-        funct_routes = []
-        for dic in permissions:
-            if dic["functionality"] == search:
-                funct_routes = dic["routes"]
-                break
-
-        permits = []
-        if len(funct_routes) > 0:
-            for dic in funct_routes:
-                permits.append(next(iter(dic)))
-        return permits
-
-    async def __check_functionality(self, search: str) -> str:
-        functionalities = await self.__get_functionalities()
-        for funct in functionalities:
-            if funct.find(search) >= 0:
-                return funct
-
-        return ""
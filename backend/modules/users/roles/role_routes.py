@@ -3,10 +3,10 @@ from urllib import response
 from uuid import UUID
 
 from databases import Database
-from fastapi import APIRouter, Body, Depends, Path, status
+from fastapi import APIRouter, Body, Depends, Path, Query, status
 from loguru import logger
-from modules.users.auths.auth_dependencies import get_current_active_user
-from modules.users.auths.auth_exceptions import AuthExceptions
+from modules.users.auths.auth_dependencies import get_authorized_user
+from modules.users.etags import role_etag, roles_list_etag
 from modules.users.roles.role_schemas import (
     RoleCreate,
     RoleIn,
@@ -19,7 +19,6 @@ from modules.users.users.user_schemas import UserInDB
 from pydantic.error_wrappers import ValidationError
 from shared.core.db.db_dependencies import get_database
 from shared.utils.service_result import ServiceResult, handle_result
-from shared.utils.verify_auth import is_authorized
 
 router = APIRouter(
     prefix="/roles",
@@ -36,11 +35,8 @@ router = APIRouter(
 async def create_role(
     role: RoleCreate = Body(..., embed=True),
     db: Database = Depends(get_database),
-    current_user: UserInDB = Depends(get_current_active_user),
+    current_user: UserInDB = Depends(get_authorized_user),
 ) -> ServiceResult:
-    if not is_authorized(current_user, "roles:create-role"):
-        return handle_result(ServiceResult(AuthExceptions.AuthUnauthorizedException()))
-
     new_role = RoleIn(**role.dict())
     new_role.created_by = current_user.id
     new_role.updated_by = current_user.id
@@ -48,18 +44,33 @@ async def create_role(
     return handle_result(result)
 
 
-@router.get("/", response_model=Dict, name="roles:roles_list", status_code=status.HTTP_200_OK)
+@router.get(
+    "/",
+    response_model=Dict,
+    name="roles:roles_list",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(roles_list_etag)],
+)
 async def get_roles_list(
     search: str | None = None,
     page_number: int = 1,
     page_size: int = 10,
     order: str = "",
     direction: str = "",
+    cursor: str | None = None,
     db: Database = Depends(get_database),
-    current_user: UserInDB = Depends(get_current_active_user),
+    current_user: UserInDB = Depends(get_authorized_user),
 ) -> ServiceResult:
-    if not is_authorized(current_user, "roles:roles_list"):
-        return ServiceResult(AuthExceptions.AuthUnauthorizedException())
+    if cursor is not None:
+        result = await RoleService().get_roles_list_by_cursor(
+            db=db,
+            search=search,
+            cursor=cursor,
+            page_size=page_size,
+            order=order,
+            direction=direction,
+        )
+        return handle_result(result)
 
     result = await RoleService().get_roles_list(
         db=db,
@@ -72,15 +83,33 @@ async def get_roles_list(
     return handle_result(result)
 
 
-@router.get("/{id}/", response_model=RoleOut, name="roles:get-role-by-id")
+@router.get("/export", name="roles:export-roles")
+async def export_roles(
+    search: str | None = None,
+    format: str = Query("ndjson", regex="^(ndjson|csv)$"),
+    db: Database = Depends(get_database),
+    current_user: UserInDB = Depends(get_authorized_user),
+) -> ServiceResult:
+    """
+    Descarga todos los roles en formato NDJSON (por defecto) o CSV, filtrados por
+    **search** igual que en la lista. Las filas se envían a medida que se
+    leen de la base de datos
+    """
+    result = await RoleService().export_roles(db=db, search=search, format=format)
+    return handle_result(result)
+
+
+@router.get(
+    "/{id}/",
+    response_model=RoleOut,
+    name="roles:get-role-by-id",
+    dependencies=[Depends(role_etag)],
+)
 async def get_role_by_id(
     id: UUID,
     db: Database = Depends(get_database),
-    current_user: UserInDB = Depends(get_current_active_user),
+    current_user: UserInDB = Depends(get_authorized_user),
 ) -> ServiceResult:
-    if not is_authorized(current_user, "roles:get-role-by-id"):
-        return handle_result(ServiceResult(AuthExceptions.AuthUnauthorizedException()))
-
     result = await RoleService().get_role_by_id(db=db, id=id)
     return handle_result(result)
 
@@ -90,11 +119,8 @@ async def update_role_by_id(
     id: UUID = Path(..., title="The id of the role to update"),
     role_update: RoleUpdate = Body(..., embed=True),
     db: Database = Depends(get_database),
-    current_user: UserInDB = Depends(get_current_active_user),
+    current_user: UserInDB = Depends(get_authorized_user),
 ) -> ServiceResult:
-    if not is_authorized(current_user, "roles:update-role-by-id"):
-        return handle_result(ServiceResult(AuthExceptions.AuthUnauthorizedException()))
-
     result = await RoleService().update_role(
         db=db, id=id, role_update=role_update, current_user=current_user
     )
@@ -106,11 +132,8 @@ async def update_activate_role_by_id(
     id: UUID = Path(..., title="The id of the role to update is_active"),
     role_update: RoleUpdateActive = Body(..., embed=True),
     db: Database = Depends(get_database),
-    current_user: UserInDB = Depends(get_current_active_user),
+    current_user: UserInDB = Depends(get_authorized_user),
 ) -> ServiceResult:
-    if not is_authorized(current_user, "roles:update-activate-role-by-id"):
-        return handle_result(ServiceResult(AuthExceptions.AuthUnauthorizedException()))
-
     result = await RoleService().update_activate_role(
         db=db, id=id, role_update=role_update, current_user=current_user
     )
@@ -121,10 +144,7 @@ async def update_activate_role_by_id(
 async def delete_role_by_id(
     id: UUID = Path(..., title="The id of the role to update is_active"),
     db: Database = Depends(get_database),
-    current_user: UserInDB = Depends(get_current_active_user),
+    current_user: UserInDB = Depends(get_authorized_user),
 ) -> ServiceResult:
-    if not is_authorized(current_user, endpoint="roles:delete-role-by-id"):
-        return handle_result(ServiceResult(AuthExceptions.AuthUnauthorizedException()))
-
     result = await RoleService().delete_role(db=db, id=id)
     return handle_result(result)
@@ -2,6 +2,7 @@ from typing import List
 from uuid import UUID
 
 from databases import Database
+from fastapi.responses import Response
 from loguru import logger
 
 from modules.users.permissions import verify_permissions
@@ -13,9 +14,12 @@ from modules.users.roles.role_schemas import (
     RoleUpdate,
     RoleUpdateActive,
 )
+from modules.users.roles.role_sqlsentences import role_list_sort_type
 from modules.users.users.user_repositories import UserRepository
 from modules.users.users.user_schemas import UserInDB
-from shared.core.config import API_PREFIX
+from shared.core.config import API_PREFIX, LIST_JSON_FAST_PATH
+from shared.utils.export_stream import export_response
+from shared.utils.keyset_pagination import decode_cursor, encode_cursor, keyset_pagination
 from shared.utils.service_result import ServiceResult
 from shared.utils.short_pagination import short_pagination
 from shared.utils.verify_uuid import is_valid_uuid
@@ -32,13 +36,13 @@ class RoleService:
             return ServiceResult(RoleExceptions.RolePermissionsException())
 
         for permission in role.permissions:
-            if not await verify_permissions(permission):
+            if not verify_permissions(permission):
                 logger.error("Invalid permission name in permissions")
                 return ServiceResult(RoleExceptions.PermissionNameException())
 
         role_in_db = await RoleRepository(db).get_role_by_name(role.role)
         if role_in_db:
-            logger.error("El nombre de rol ({role.role}) ya ha sido usado")
+            logger.error("El nombre de rol ({}) ya ha sido usado", role.role)
             return ServiceResult(RoleExceptions.RoleAlreadyExistsExcepton())
 
         role_item = await RoleRepository(db).create_role(role)
@@ -49,6 +53,12 @@ class RoleService:
 
         return ServiceResult(role_item)
 
+    async def export_roles(self, db: Database, search: str | None, format: str) -> ServiceResult:
+        from modules.users.roles.role_sqlsentences import EXPORT_ROLES_COLUMNS
+
+        records = RoleRepository(db).export_roles(search)
+        return ServiceResult(export_response(records, EXPORT_ROLES_COLUMNS, format, "roles"))
+
     async def get_roles_list(
         self,
         db: Database,
@@ -58,6 +68,25 @@ class RoleService:
         order: str = None,
         direction: str = None,
     ) -> ServiceResult:
+        if LIST_JSON_FAST_PATH:
+            page_num = max(page_num, 1)
+            page_size = max(page_size, 1)
+            # the same links short_pagination builds
+            route = f"{API_PREFIX}/users/roles/"
+            previous_page = None
+            if page_num > 1:
+                previous_page = f"{route}?page_number={page_num-1}&page_size{page_size}"
+            content = await RoleRepository(db).get_roles_list_json(
+                search,
+                order,
+                direction,
+                page_num=page_num,
+                page_size=page_size,
+                next_page=f"{route}?page_number={page_num+1}&page_size{page_size}",
+                previous_page=previous_page,
+            )
+            return ServiceResult(Response(content=content, media_type="application/json"))
+
         roles = await RoleRepository(db).get_roles_list(search, order, direction)
 
         service_result = None
@@ -78,6 +107,69 @@ class RoleService:
 
         return service_result
 
+    async def get_roles_list_by_cursor(
+        self,
+        db: Database,
+        search: str | None,
+        cursor: str = "",
+        page_size: int = 10,
+        order: str = None,
+        direction: str = None,
+    ) -> ServiceResult:
+        try:
+            state = decode_cursor(cursor, role_list_sort_type)
+        except ValueError as e:
+            logger.error("Invalid roles list cursor: {}", e)
+            return ServiceResult(RoleExceptions.RoleInvalidCursorException())
+
+        if state:
+            search = state["search"]
+            order = state["order"]
+            direction = state["direction"]
+        else:
+            order = order.lower() if order else None
+            direction = direction.upper() if direction else None
+
+        page_size = max(page_size, 1)
+        role_repo = RoleRepository(db)
+        roles = await role_repo.get_roles_list_by_cursor(
+            search, order, direction, cursor=state, limit=page_size + 1
+        )
+
+        has_more = len(roles) > page_size
+        if state.get("before"):
+            roles = roles[-page_size:]
+            has_next, has_previous = True, has_more
+        else:
+            roles = roles[:page_size]
+            has_next, has_previous = has_more, bool(state)
+
+        next_cursor = previous_cursor = None
+        if roles and has_next:
+            last = roles[-1]
+            next_cursor = encode_cursor(
+                order, direction, search, role_repo.get_sort_key(order, last), last.id
+            )
+        if roles and has_previous:
+            first = roles[0]
+            previous_cursor = encode_cursor(
+                order,
+                direction,
+                search,
+                role_repo.get_sort_key(order, first),
+                first.id,
+                before=True,
+            )
+
+        response = keyset_pagination(
+            data_list=roles,
+            page_size=page_size,
+            next_cursor=next_cursor,
+            previous_cursor=previous_cursor,
+            route=f"{API_PREFIX}/users/roles/",
+        )
+        return ServiceResult(response)
+
     async def get_role_by_id(
         self,
         db: Database,
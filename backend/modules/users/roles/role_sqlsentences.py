@@ -1,21 +1,55 @@
 def role_list_sort(order: str | None, direction: str | None):
-    sql_sentence = ""
+    # ro.id breaks ties so LIMIT / OFFSET pages are stable, an unknown order sorts by it alone
+    sql_sentence = " ORDER BY ro.id ASC;"
     if not order and not direction:
-        sql_sentence = " ORDER BY ro.role ASC;"
+        sql_sentence = " ORDER BY ro.role ASC, ro.id ASC;"
     elif order == "role" and direction == "DESC":
-        sql_sentence = " ORDER BY ro.role DESC;"
+        sql_sentence = " ORDER BY ro.role DESC, ro.id DESC;"
     elif order == "role" and (direction == "ASC" or direction == None):
-        sql_sentence = " ORDER BY ro.role ASC;"
+        sql_sentence = " ORDER BY ro.role ASC, ro.id ASC;"
     elif order == "estatus" and direction == "DESC":
-        sql_sentence = " ORDER BY ro.is_active DESC;"
+        sql_sentence = " ORDER BY ro.is_active DESC, ro.id DESC;"
     elif order == "estatus" and (direction == "ASC" or direction == None):
-        sql_sentence = " ORDER BY ro.is_active ASC;"
+        sql_sentence = " ORDER BY ro.is_active ASC, ro.id ASC;"
 
     return sql_sentence
 
 
+ROLE_LIST_SORT_COLUMNS = {
+    "role": "ro.role",
+    "estatus": "ro.is_active",
+}
+
+
+# python type of each sort column, the keyset cursors carry a value of it
+ROLE_LIST_SORT_TYPES = {"estatus": bool}
+
+
+def role_list_sort_column(order: str | None) -> str:
+    return ROLE_LIST_SORT_COLUMNS.get(order or "role", "ro.role")
+
+
+def role_list_sort_type(order: str | None) -> type:
+    return ROLE_LIST_SORT_TYPES.get(order, str)
+
+
+def role_list_keyset(order: str | None, direction: str | None, before: bool):
+    """
+    Returns the (predicate, sort) pair to fetch the rows after (or before) the
+    (:cursor_key, :cursor_id) position, ro.id being the tie-breaker
+    """
+    column = role_list_sort_column(order)
+    descending = (direction == "DESC") != before
+    comparator = "<" if descending else ">"
+    direction = "DESC" if descending else "ASC"
+
+    predicate = f" ({column}, ro.id) {comparator} (:cursor_key, :cursor_id) "
+    sort = f" ORDER BY {column} {direction}, ro.id {direction} LIMIT :limit;"
+    return predicate, sort
+
+
 def role_list_search():
-    return " WHERE LOWER(ro.role) ILIKE :search "
+    return " WHERE ro.role ILIKE :search "
 
 
 CREATE_ROLE_ITEM = """
@@ -36,30 +70,49 @@ GET_ROLE_BY_ID = """
     WHERE id = :id; 
 """
 
-GET_ROLES_LIST = """
-    SELECT ro.id, ro.role, ro.permissions, ro.is_active, 
+ROLE_LIST_COLUMNS = """ro.id, ro.role, ro.permissions, ro.is_active,
         ro.created_at, us1.fullname AS created_by,
-        ro.updated_at, us2.fullname AS updated_by
+        ro.updated_at, us2.fullname AS updated_by"""
+
+ROLE_LIST_FUNCTIONALITY_SEARCH = " WHERE ro.permissions && CAST(:permits AS varchar[]) "
+
+GET_ROLES_LIST = f"""
+    SELECT {ROLE_LIST_COLUMNS}
     FROM roles AS ro
     LEFT JOIN users AS us1 ON ro.created_by = us1.id
     LEFT JOIN users AS us2 ON ro.updated_by = us2.id
 """
 
-GET_ROLES_LIST_FUNCTIONALITY = """
-    SELECT ro.id, ro.role, ro.permissions, ro.is_active, 
-        ro.created_at, us1.fullname AS created_by,
-        ro.updated_at, us2.fullname AS updated_by
+GET_ROLES_LIST_FUNCTIONALITY = GET_ROLES_LIST + ROLE_LIST_FUNCTIONALITY_SEARCH
+
+GET_ROLES_LIST_PAGE = f"""
+    SELECT {ROLE_LIST_COLUMNS}, count(*) OVER () AS total_count
     FROM roles AS ro
     LEFT JOIN users AS us1 ON ro.created_by = us1.id
     LEFT JOIN users AS us2 ON ro.updated_by = us2.id
-    WHERE :permit LIKE ANY(ro.permissions)
 """
 
+COUNT_ROLES_LIST = """
+    SELECT count(*)
+    FROM roles AS ro
+"""
+
+EXPORT_ROLES_COLUMNS = (
+    "id",
+    "role",
+    "permissions",
+    "is_active",
+    "created_by",
+    "created_at",
+    "updated_by",
+    "updated_at",
+)
+
 UPDATE_ROLE_BY_ID = """
     UPDATE roles
     SET role        = :role,
         permissions = :permissions,
-        created_at  = :created_at,
+        created_at  = COALESCE(:created_at, created_at),
         created_by  = :created_by,
         updated_by  = :updated_by,
         updated_at  = :updated_at,
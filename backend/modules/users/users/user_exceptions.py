@@ -134,3 +134,23 @@ class UserExceptions:
             status_code = 409
             msg = "No puede cambiar el password de otro usuario"
             AppExceptionCase.__init__(self, status_code, msg)
+
+    class UserInvalidCursorException(AppExceptionCase):
+        """_
+        Users list cursor invalid
+        """
+
+        def __init__(self, msg: str = ""):
+            status_code = 422
+            msg = "Cursor de paginación inválido"
+            AppExceptionCase.__init__(self, status_code, msg)
+
+    class UserImportInvalidFileException(AppExceptionCase):
+        """_
+        Users import file can not be read
+        """
+
+        def __init__(self, msg: str = ""):
+            status_code = 422
+            msg = f"Archivo de importación inválido: {msg}"
+            AppExceptionCase.__init__(self, status_code, msg)
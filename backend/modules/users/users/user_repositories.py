@@ -1,12 +1,22 @@
 from datetime import datetime
-from typing import List, Type
+from typing import AsyncIterator, Dict, List, Mapping, Tuple, Type
 from uuid import UUID
 
+from asyncpg.exceptions import ForeignKeyViolationError, UniqueViolationError
 from databases import Database
 from icecream import ic
 from loguru import logger
 from modules.users.users.user_exceptions import UserExceptions
-from modules.users.users.user_schemas import UserIn, UserInDB, UserUpdateDB
+from modules.users.users.user_schemas import (
+    UserActivate,
+    UserIn,
+    UserInDB,
+    UserOut,
+    UserPublic,
+    UserUpdateDB,
+)
+from shared.core.db.db_notifications import publish
+from shared.utils.json_pagination import paginated_json_query
 from shared.utils.record_to_dict import record_to_dict
 from shared.utils.repositories_base import BaseRepository
 
@@ -21,16 +31,61 @@ class UserRepository(BaseRepository):
         return UserIn
 
     async def create_user(self, user: UserIn) -> UserInDB:
+        """
+        Inserts the user and returns it with its role in a single round trip,
+        the unique indexes and the role foreign key are checked by Postgres
+        """
         from modules.users.users.user_sqlstaments import CREATE_USER_ITEM
 
         values = self.preprocess_create(user.dict())
-        record = await self.db.fetch_one(query=CREATE_USER_ITEM, values=values)
-
-        result = record_to_dict(record)
-
-        return self._schema_out(**result)
+        try:
+            record = await self.db.fetch_one(query=CREATE_USER_ITEM, values=values)
+        except UniqueViolationError as e:
+            logger.error("Usuario duplicado: {}", e)
+            if e.constraint_name == "ix_users_email":
+                raise UserExceptions.UserEmailAlreadyExistsExeption()
+            if e.constraint_name == "ix_users_username":
+                raise UserExceptions.UserUsernameAlreadyExistsExeption()
+            raise UserExceptions.UserCreateExcepton()
+        except ForeignKeyViolationError as e:
+            logger.error("Rol de usuario inexistente: {}", e)
+            raise UserExceptions.UserWithNoRoleException()
+
+        await publish(self.db, "users", record["id"])
+        return self._from_record(record_to_dict(record))
+
+    async def import_users(self, users: List[Tuple[int, UserIn]]) -> List[Dict]:
+        """
+        Loads the (row number, user) pairs with COPY into a staging table and
+        inserts them with a single statement, returning for every row whether
+        it was created or its role does not exist
+        """
+        from modules.users.users.user_sqlstaments import (
+            CREATE_USERS_IMPORT_TABLE,
+            IMPORT_USERS_FROM_STAGING,
+            USERS_IMPORT_COLUMNS,
+        )
 
-    async def get_user_by_email(self, email: str) -> UserInDB:
+        records = []
+        for row_number, user in users:
+            values = self.preprocess_create(user.dict())
+            values["row_number"] = row_number
+            records.append(tuple(values.get(column) for column in USERS_IMPORT_COLUMNS))
+
+        async with self.db.connection() as connection:
+            async with connection.transaction():
+                raw_connection = connection.raw_connection
+                await raw_connection.execute(CREATE_USERS_IMPORT_TABLE)
+                await raw_connection.copy_records_to_table(
+                    "users_import", records=records, columns=USERS_IMPORT_COLUMNS
+                )
+                results = await raw_connection.fetch(IMPORT_USERS_FROM_STAGING)
+
+        if any(result["created"] for result in results):
+            await publish(self.db, "users", "import")
+        return [dict(result) for result in results]
+
+    async def get_user_by_email(self, email: str) -> UserPublic:
         from modules.users.users.user_sqlstaments import GET_USER_BY_EMAIL
 
         values = {"email": email}
@@ -39,9 +94,12 @@ class UserRepository(BaseRepository):
         if not record:
             return None
 
-        return self._schema_out(**dict(record))
+        return self._from_record(record, UserPublic)
 
     async def get_user_by_username(self, username: str) -> UserInDB:
+        """
+        The only read of the password hash and salt, used to authenticate
+        """
         from modules.users.users.user_sqlstaments import GET_USER_BY_USERNAME
 
         values = {"username": username}
@@ -50,9 +108,9 @@ class UserRepository(BaseRepository):
         if not record:
             return None
 
-        return self._schema_out(**dict(record))
+        return self._from_record(record)
 
-    async def get_user_by_id(self, id: UUID) -> UserInDB | dict:
+    async def get_user_by_id(self, id: UUID) -> UserPublic | dict:
         from modules.users.users.user_sqlstaments import GET_USER_BY_ID
 
         values = {"id": id}
@@ -60,90 +118,198 @@ class UserRepository(BaseRepository):
         if not record:
             return {}
 
-        user_in_db = record_to_dict(record)
-        return self._schema_out(**user_in_db)
+        return self._from_record(record, UserPublic)
 
     async def get_users_list(
         self,
         search: str | None,
         order: str | None,
         direction: str | None,
-    ) -> List[UserInDB]:
+        page_num: int = 1,
+        page_size: int = 10,
+    ) -> Tuple[List[UserOut], int]:
+        """
+        Returns only the requested page of users along with the total number
+        of users matching the search, so the full table never leaves the DB
+        """
         from modules.users.users.user_sqlstaments import (
+            COUNT_USERS_LIST,
             GET_USERS_LIST,
             user_list_complements,
+            user_list_pagination,
             user_list_search,
         )
 
         order = order.lower() if order != None else None
-        direction = direction.upper() if order != None else None
+        direction = direction.upper() if direction != None else None
         values = {}
-        sql_sentence = user_list_complements(order, direction)
-        sql_search = user_list_search()
+        sql_sort = user_list_complements(order, direction)
+        sql_search = user_list_search() if search else ""
 
-        if not search:
-            sql_sentence = GET_USERS_LIST + sql_sentence
+        if search:
+            values["search"] = "%" + search + "%"
+
+        sql_sentence = GET_USERS_LIST + sql_search + sql_sort + user_list_pagination()
+        page_values = {**values, "limit": page_size, "offset": (page_num - 1) * page_size}
+        records = await self.db.fetch_all(query=sql_sentence, values=page_values)
+
+        if len(records) > 0:
+            total = records[0]["total_count"]
+        elif page_num > 1:
+            # the window count is lost when the page is past the end
+            total = await self.db.fetch_val(query=COUNT_USERS_LIST + sql_search, values=values)
         else:
-            sql_sentence = GET_USERS_LIST + sql_search + sql_sentence
+            total = 0
+
+        return self._from_records(records, UserOut), total
+
+    async def get_users_list_json(
+        self,
+        search: str | None,
+        order: str | None,
+        direction: str | None,
+        page_num: int,
+        page_size: int,
+        next_page: str,
+        previous_page: str | None,
+    ) -> str:
+        """
+        The same page as get_users_list, rendered by Postgres as the JSON of
+        the paginated response so no row goes through Python
+        """
+        from modules.users.users.user_sqlstaments import (
+            COUNT_USERS_LIST,
+            GET_USERS_LIST,
+            user_list_complements,
+            user_list_pagination,
+            user_list_search,
+        )
+
+        order = order.lower() if order != None else None
+        direction = direction.upper() if direction != None else None
+        sql_search = user_list_search() if search else ""
+        values = {
+            "limit": page_size,
+            "offset": (page_num - 1) * page_size,
+            "page_size": page_size,
+            "page_end": page_num * page_size,
+            "next": next_page,
+            "previous": previous_page,
+        }
+        if search:
             values["search"] = "%" + search + "%"
 
-        records = await self.db.fetch_all(query=sql_sentence, values=values)
+        sql_sort = user_list_complements(order, direction)
+        page = GET_USERS_LIST + sql_search + sql_sort
+        sql_sentence = paginated_json_query(
+            page + user_list_pagination(), COUNT_USERS_LIST + sql_search, UserOut, sql_sort
+        )
+        return await self.db.fetch_val(query=sql_sentence, values=values)
 
-        if len(records) == 0:
-            return []
+    async def get_users_list_by_cursor(
+        self,
+        search: str | None,
+        order: str | None,
+        direction: str | None,
+        cursor: dict,
+        limit: int,
+    ) -> List[UserOut]:
+        from modules.users.users.user_sqlstaments import (
+            GET_USERS_LIST_KEYSET,
+            user_list_keyset,
+            user_list_search,
+        )
 
-        if not records:
-            return None
+        before = cursor.get("before", False)
+        predicate, sql_sort = user_list_keyset(order, direction, before)
+        values = {"limit": limit}
+        sql_sentence = GET_USERS_LIST_KEYSET
 
-        return [self._schema_out(**dict(record)) for record in records]
+        if search:
+            sql_sentence += user_list_search()
+            values["search"] = "%" + search + "%"
+
+        if cursor:
+            sql_sentence += (" AND" if search else " WHERE") + predicate
+            values["cursor_key"] = cursor["key"]
+            values["cursor_id"] = cursor["id"]
+
+        records = await self.db.fetch_all(query=sql_sentence + sql_sort, values=values)
+
+        users = self._from_records(records, UserOut)
+        if before:
+            users.reverse()
+
+        return users
+
+    def export_users(self, search: str | None) -> AsyncIterator[Mapping]:
+        """
+        Iterates the users over a server-side cursor, rows are fetched from
+        Postgres as they are consumed
+        """
+        from modules.users.users.user_sqlstaments import (
+            EXPORT_USERS_LIST,
+            user_list_complements,
+            user_list_search,
+        )
+
+        values = {}
+        sql_sentence = EXPORT_USERS_LIST
+        if search:
+            sql_sentence += user_list_search()
+            values["search"] = "%" + search + "%"
+
+        sql_sentence += user_list_complements(None, None) + ";"
+        return self.db.iterate(query=sql_sentence, values=values)
+
+    @staticmethod
+    def get_sort_key(order: str | None, user: UserOut):
+        from modules.users.users.user_sqlstaments import user_list_sort_column
+
+        # sort columns are named like the attributes they are read from
+        return getattr(user, user_list_sort_column(order).split(".")[-1])
 
     async def update_user(
         self,
         id: UUID,
-        user_update: UserUpdateDB,
+        user_update: UserUpdateDB | UserActivate,
         updated_by_id: UUID,
         credentials: dict | None,
-    ) -> UserInDB | dict:
-        from modules.users.users.user_sqlstaments import UPDATE_USER_BY_ID
-
-        user = await self.get_user_by_id(id=id)
-        if not user:
-            return {}
-
-        user_update_params = user.copy(update=user_update.dict(exclude_unset=True))
+    ) -> UserPublic | dict:
+        from modules.users.users.user_sqlstaments import USER_UPDATE_COLUMNS, user_update_by_id
 
-        user_params_dict = user_update_params.dict()
-        user_params_dict.pop("role")
-        user_params_dict.pop("permissions")
-        user_params_dict["updated_by"] = updated_by_id
-        user_params_dict["updated_at"] = self._preprocess_date()
-        if len(credentials) > 0:
-            user_params_dict["password"] = credentials.get("password")
-            user_params_dict["salt"] = credentials.get("salt")
+        # the password is only ever written hashed, from the credentials
+        changes = user_update.dict(exclude_unset=True, exclude_none=True, exclude={"password"})
+        changes.update(credentials or {})
+        values = {column: changes[column] for column in USER_UPDATE_COLUMNS if column in changes}
+        values.update(id=id, updated_by=updated_by_id, updated_at=self._preprocess_date())
 
         try:
-            record = await self.db.fetch_one(query=UPDATE_USER_BY_ID, values=user_params_dict)
-            user_updated = record_to_dict(record)
-            return await self.get_user_by_id(id=user_updated.get("id"))
+            record = await self.db.fetch_one(query=user_update_by_id(values), values=values)
         except Exception as e:
-            logger.error(f"Datos inválidos para actualizar un usuario: {e}")
+            logger.error("Datos inválidos para actualizar un usuario: {}", e)
             raise UserExceptions.UserInvalidUpdateParamsException()
 
+        if not record:
+            return {}
+
+        await publish(self.db, "user", id)
+        return self._from_record(record, UserPublic)
+
     async def delete_user(
         self,
         id: UUID,
-    ) -> str | dict:
+    ) -> UUID | dict:
         from modules.users.users.user_sqlstaments import DELETE_USER_BY_ID
 
-        user = await self.get_user_by_id(id=id)
-        if not user:
+        deleted_id = await self.db.fetch_val(query=DELETE_USER_BY_ID, values={"id": id})
+        if not deleted_id:
             return {}
 
-        deleted_id = await self.db.execute(query=DELETE_USER_BY_ID, values={"id": id})
-
+        await publish(self.db, "user", id)
         return deleted_id
 
-    async def get_users_by_role_id(self, role_id: UUID) -> List | dict:
+    async def get_users_by_role_id(self, role_id: UUID) -> List[UserPublic]:
         from modules.users.users.user_sqlstaments import GET_USERS_LIST_BY_ROLE_ID
 
         values = {"role_id": role_id}
@@ -152,48 +318,31 @@ class UserRepository(BaseRepository):
         if len(records) == 0:
             return []
 
-        if not records:
-            return None
-
-        users = [dict(record) for record in records]
-        logger.debug(f"los usuarios son: {users}")
-
-        return [self._schema_out(**dict(record)) for record in records]
+        return self._from_records(records, UserPublic)
 
     async def change_password_by_id(
         self,
         id: UUID,
         credentials: dict | None,
-    ) -> UserInDB | dict:
-        from modules.users.users.user_sqlstaments import UPDATE_PSW_BY_ID
-
-        user = await self.get_user_by_id(id=id)
-        if not user:
-            return {}
+    ) -> UserPublic | dict:
+        from modules.users.users.user_sqlstaments import user_update_by_id
 
-        user_update_params = user
-
-        user_params_dict = user_update_params.dict()
-        user_params_dict["updated_by"] = id
-        user_params_dict["updated_at"] = self._preprocess_date()
-        user_params_dict["password"] = credentials.get("password")
-        user_params_dict["salt"] = credentials.get("salt")
-
-        user_params_dict.pop("created_at")
-        user_params_dict.pop("created_by")
-        user_params_dict.pop("fullname")
-        user_params_dict.pop("email")
-        user_params_dict.pop("is_active")
-        user_params_dict.pop("is_superadmin")
-        user_params_dict.pop("role_id")
-        user_params_dict.pop("role")
-        user_params_dict.pop("permissions")
-        user_params_dict.pop("username")
+        values = {
+            "id": id,
+            "password": credentials.get("password"),
+            "salt": credentials.get("salt"),
+            "updated_by": id,
+            "updated_at": self._preprocess_date(),
+        }
 
         try:
-            record = await self.db.fetch_one(query=UPDATE_PSW_BY_ID, values=user_params_dict)
-            user_updated = record_to_dict(record)
-            return await self.get_user_by_id(id=user_updated.get("id"))
+            record = await self.db.fetch_one(query=user_update_by_id(values), values=values)
         except Exception as e:
-            logger.error(f"Datos inválidos para actualizar el password del usuario: {e}")
+            logger.error("Datos inválidos para actualizar el password del usuario: {}", e)
             raise UserExceptions.UserInvalidUpdateParamsException()
+
+        if not record:
+            return {}
+
+        await publish(self.db, "user", id)
+        return self._from_record(record, UserPublic)
@@ -2,10 +2,10 @@ from typing import Dict
 from uuid import UUID
 
 from databases import Database
-from fastapi import APIRouter, Body, Depends, Path, status
+from fastapi import APIRouter, Body, Depends, File, Path, Query, UploadFile, status
 from loguru import logger
-from modules.users.auths.auth_dependencies import get_current_active_user
-from modules.users.auths.auth_exceptions import AuthExceptions
+from modules.users.auths.auth_dependencies import get_authorized_user
+from modules.users.etags import user_etag, users_list_etag
 from modules.users.users.user_schemas import (
     UserActivate,
     UserCreate,
@@ -19,7 +19,6 @@ from modules.users.users.user_schemas import (
 from modules.users.users.user_services import UserService
 from shared.core.db.db_dependencies import get_database
 from shared.utils.service_result import ServiceResult, handle_result
-from shared.utils.verify_auth import is_authorized
 
 router = APIRouter(
     responses={404: {"description": "Not found"}},
@@ -35,11 +34,8 @@ router = APIRouter(
 async def create_user(
     user: UserCreate = Body(..., embed=True),
     db: Database = Depends(get_database),
-    current_user: UserInDB = Depends(get_current_active_user),
+    current_user: UserInDB = Depends(get_authorized_user),
 ) -> ServiceResult:
-    if not is_authorized(current_user, "users:create-user"):
-        return handle_result(ServiceResult(AuthExceptions.AuthUnauthorizedException()))
-
     new_user = UserToSave(**user.dict())
     new_user.created_by = current_user.id
     new_user.updated_by = current_user.id
@@ -48,31 +44,89 @@ async def create_user(
     return handle_result(result)
 
 
-@router.get("/{id}", response_model=UserPublic, name="users:get-user-by-id")
+@router.post("/import", response_model=Dict, name="users:import-users")
+async def import_users(
+    file: UploadFile = File(..., description="Archivo CSV (con encabezado) o NDJSON"),
+    db: Database = Depends(get_database),
+    current_user: UserInDB = Depends(get_authorized_user),
+) -> ServiceResult:
+    """
+    Crea usuarios en lote a partir de un archivo CSV o NDJSON con los campos
+    de creación de un usuario (fullname, username, email, password,
+    is_superadmin, role_id)
+
+    Responde con el total de filas, los usuarios creados, los errores de
+    cada fila que no se pudo importar y los campos ignorados de cada fila
+    (is_active, los usuarios importados se crean activos)
+    """
+    content = await file.read()
+    result = await UserService(db).import_users(
+        content, file.filename, file.content_type, current_user=current_user
+    )
+    return handle_result(result)
+
+
+@router.get("/export", name="users:export-users")
+async def export_users(
+    search: str | None = None,
+    format: str = Query("ndjson", regex="^(ndjson|csv)$"),
+    db: Database = Depends(get_database),
+    current_user: UserInDB = Depends(get_authorized_user),
+) -> ServiceResult:
+    """
+    Descarga todos los usuarios en formato NDJSON (por defecto) o CSV, filtrados por
+    **search** igual que en la lista. Las filas se envían a medida que se
+    leen de la base de datos
+    """
+    result = await UserService(db).export_users(search, format)
+    return handle_result(result)
+
+
+@router.get(
+    "/{id}",
+    response_model=UserPublic,
+    name="users:get-user-by-id",
+    dependencies=[Depends(user_etag)],
+)
 async def get_user_by_id(
     id: UUID = Path(..., title="The id of the user to get"),
     db: Database = Depends(get_database),
-    current_user: UserInDB = Depends(get_current_active_user),
+    current_user: UserInDB = Depends(get_authorized_user),
 ) -> ServiceResult:
-    if not is_authorized(current_user, "users:get-user-by-id"):
-        return handle_result(ServiceResult(AuthExceptions.AuthUnauthorizedException()))
-
     result = await UserService(db).get_user_by_id(id=id)
     return handle_result(result)
 
 
-@router.get("/", response_model=Dict, name="users:users_list", status_code=status.HTTP_200_OK)
+@router.get(
+    "/",
+    response_model=Dict,
+    name="users:users_list",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(users_list_etag)],
+)
 async def get_users_list(
     search: str | None = None,
     page_number: int = 1,
     page_size: int = 10,
     order: str = "",
     direction: str = "",
+    cursor: str | None = None,
     db: Database = Depends(get_database),
-    current_user: UserInDB = Depends(get_current_active_user),
+    current_user: UserInDB = Depends(get_authorized_user),
 ) -> ServiceResult:
-    if not is_authorized(current_user, "users:users_list"):
-        return handle_result(ServiceResult(AuthExceptions.AuthUnauthorizedException()))
+    """
+    Lista de usuarios paginada por número de página, o por cursor cuando se
+    envía el parámetro **cursor** (vacío para la primera página)
+    """
+    if cursor is not None:
+        result = await UserService(db).get_users_list_by_cursor(
+            search,
+            cursor=cursor,
+            page_size=page_size,
+            order=order,
+            direction=direction,
+        )
+        return handle_result(result)
 
     result = await UserService(db).get_users_list(
         search,
@@ -89,11 +143,8 @@ async def update_user_by_id(
     id: UUID = Path(..., title="The id of the user to update"),
     user_update: UserUpdate = Body(..., embed=True),
     db: Database = Depends(get_database),
-    current_user: UserInDB = Depends(get_current_active_user),
+    current_user: UserInDB = Depends(get_authorized_user),
 ) -> ServiceResult:
-    if not is_authorized(current_user, "users:update-user-by-id"):
-        return handle_result(ServiceResult(AuthExceptions.AuthUnauthorizedException()))
-
     result = await UserService(db).update_user(
         id=id, user_update=user_update, current_user=current_user
     )
@@ -105,11 +156,8 @@ async def activate_user_by_id(
     id: UUID = Path(..., title="The id of the user to update"),
     user_update: UserActivate = Body(..., embed=True),
     db: Database = Depends(get_database),
-    current_user: UserInDB = Depends(get_current_active_user),
+    current_user: UserInDB = Depends(get_authorized_user),
 ) -> ServiceResult:
-    if not is_authorized(current_user, "users:activate-user-by-id"):
-        return handle_result(ServiceResult(AuthExceptions.AuthUnauthorizedException()))
-
     result = await UserService(db).activate_user(
         id=id, user_update=user_update, current_user=current_user
     )
@@ -120,11 +168,8 @@ async def activate_user_by_id(
 async def delete_user_by_id(
     id: UUID = Path(..., title="The id of the user to delete"),
     db: Database = Depends(get_database),
-    current_user: UserInDB = Depends(get_current_active_user),
+    current_user: UserInDB = Depends(get_authorized_user),
 ) -> ServiceResult:
-    if not is_authorized(current_user, "users:delete-user-by-id"):
-        return handle_result(ServiceResult(AuthExceptions.AuthUnauthorizedException()))
-
     result = await UserService(db).delete_user(id=id)
     return handle_result(result)
 
@@ -134,7 +179,7 @@ async def change_password_by_id(
     id: UUID = Path(..., title="The id of the user to update"),
     psw_update: str = Body(..., embed=True),
     db: Database = Depends(get_database),
-    current_user: UserInDB = Depends(get_current_active_user),
+    current_user: UserInDB = Depends(get_authorized_user),
 ) -> ServiceResult:
     """
     Un usuario va a poder cambiar su propio password
@@ -143,9 +188,6 @@ async def change_password_by_id(
     -**id**: el id del usuario que va a cambiar su password
     -**psw_update**: el nuevo password
     """
-    if not is_authorized(current_user, "users:change-password-by-id"):
-        return handle_result(ServiceResult(AuthExceptions.AuthUnauthorizedException()))
-
     result = await UserService(db).change_password_by_id(
         id=id, psw_update=psw_update, current_user=current_user
     )
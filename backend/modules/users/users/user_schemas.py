@@ -1,8 +1,8 @@
-from typing import List
+from typing import FrozenSet, List
 from uuid import UUID
 
 from modules.users.auths.auth_schemas import AccessToken
-from pydantic import EmailStr, constr
+from pydantic import EmailStr, PrivateAttr, constr
 from shared.utils.schemas_base import BaseSchema, DateTimeModelMixin, IDModelMixin
 
 
@@ -42,6 +42,14 @@ class UserInDB(IDModelMixin, DateTimeModelMixin):
     permissions: List | None
     created_by: UUID | str | None
     updated_by: UUID | str | None
+    _granted_permissions: FrozenSet[str] | None = PrivateAttr(default=None)
+
+    @property
+    def granted_permissions(self) -> FrozenSet[str]:
+        # built on first use, the principal is cached and checked on every request
+        if self._granted_permissions is None:
+            self._granted_permissions = frozenset(self.permissions or ())
+        return self._granted_permissions
 
 
 class UserIn(UserBase):
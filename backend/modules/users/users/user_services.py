@@ -2,30 +2,35 @@ from typing import List
 from uuid import UUID
 
 from databases import Database
+from fastapi.responses import Response
 from icecream import ic
 from loguru import logger
+from pydantic import ValidationError
 from modules.users.auths.auth_services import AuthService
-from modules.users.roles.role_repositories import RoleRepository
 from modules.users.users.user_exceptions import UserExceptions
 from modules.users.users.user_repositories import UserRepository
+from modules.users.users.user_sqlstaments import (
+    USERS_IMPORT_IGNORED_FIELDS,
+    user_list_sort_type,
+)
 from modules.users.users.user_schemas import (
     UserActivate,
+    UserCreate,
     UserIn,
     UserInDB,
-    UserOut,
-    UserPublic,
     UserToSave,
     UserUpdate,
     UserUpdateDB,
 )
-from passlib.context import CryptContext
-from shared.core.config import API_PREFIX
+from shared.core.config import API_PREFIX, LIST_JSON_FAST_PATH, USERS_IMPORT_MAX_ROWS
+from shared.utils.app_exceptions import AppExceptionCase
+from shared.utils.export_stream import export_response
+from shared.utils.keyset_pagination import decode_cursor, encode_cursor, keyset_pagination
 from shared.utils.service_result import ServiceResult
-from shared.utils.short_pagination import short_pagination
+from shared.utils.short_pagination import short_pagination_aps
+from shared.utils.tabular_file import read_rows
 from shared.utils.verify_uuid import is_valid_uuid
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 
 class UserService:
     def __init__(self, db: Database):
@@ -53,18 +58,7 @@ class UserService:
             logger.error("Try to create a User with no user  type information")
             return ServiceResult(UserExceptions.UserWithNoUserTypeException())
 
-        user_repo = UserRepository(self.db)
-
-        # validates iis not existing in db
-        if await user_repo.get_user_by_email(user.email):
-            logger.error(f"Try to create a User with an existing email: {user.email}")
-            return ServiceResult(UserExceptions.UserEmailAlreadyExistsExeption())
-
-        if await user_repo.get_user_by_username(user.username):
-            logger.error(f"Try to create a User with an existing username: {user.username}")
-            return ServiceResult(UserExceptions.UserUsernameAlreadyExistsExeption())
-
-        user_password_update = AuthService().create_salt_and_hashedpassword(
+        user_password_update = await AuthService().create_salt_and_hashedpassword(
             plaintext_password=user.password
         )
         user.password = user_password_update.password
@@ -72,20 +66,97 @@ class UserService:
 
         user.username = user.username.lower()
 
-        user_item = await user_repo.create_user(user)
+        try:
+            user_item = await UserRepository(self.db).create_user(user)
+        except AppExceptionCase as e:
+            logger.error("No se pudo crear el usuario {}: {}", user.username, e.msg)
+            return ServiceResult(e)
+
         if not user_item:
             logger.error("Error in DB creating a user")
             return ServiceResult(UserExceptions.UserCreateExcepton())
 
-        role_repo = RoleRepository(db=self.db)
-        role = await role_repo.get_role_by_id(user_item.id)
-        if not role:
-            user_item.role = None
-        else:
-            user_item.role = role.role
-
         return ServiceResult(user_item)
 
+    async def import_users(
+        self,
+        content: bytes,
+        filename: str | None,
+        content_type: str | None,
+        current_user: UserInDB,
+    ) -> ServiceResult:
+        try:
+            rows = read_rows(content, filename, content_type)
+        except ValueError as e:
+            logger.error("Archivo de importación inválido: {}", e)
+            return ServiceResult(UserExceptions.UserImportInvalidFileException(str(e)))
+
+        if len(rows) == 0:
+            return ServiceResult(UserExceptions.UserImportInvalidFileException("vacío"))
+
+        if len(rows) > USERS_IMPORT_MAX_ROWS:
+            msg = f"más de {USERS_IMPORT_MAX_ROWS} filas"
+            return ServiceResult(UserExceptions.UserImportInvalidFileException(msg))
+
+        errors = []
+        ignored = []
+        valid_rows = []
+        for row_number, row in rows:
+            # imported users are created active, like the ones created one by one
+            fields = [field for field in USERS_IMPORT_IGNORED_FIELDS if field in row]
+            if fields:
+                ignored.append({"row": row_number, "fields": fields})
+            try:
+                valid_rows.append((row_number, UserCreate(**row)))
+            except ValidationError as e:
+                messages = [
+                    f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors()
+                ]
+                errors.append({"row": row_number, "errors": messages})
+
+        credentials = await AuthService().create_salts_and_hashedpasswords(
+            [user.password for _, user in valid_rows]
+        )
+
+        users = []
+        for (row_number, user), credential in zip(valid_rows, credentials):
+            user_in = UserIn(
+                **user.dict(exclude={"username", "password"}),
+                username=user.username.lower(),
+                password=credential.password,
+                salt=credential.salt,
+                created_by=current_user.id,
+                updated_by=current_user.id,
+            )
+            users.append((row_number, user_in))
+
+        results = await UserRepository(self.db).import_users(users) if users else []
+
+        for result in results:
+            if result["missing_role"]:
+                errors.append({"row": result["row_number"], "errors": ["role_id: rol inexistente"]})
+            elif not result["created"]:
+                messages = ["email o nombre de usuario (username) ya existe"]
+                errors.append({"row": result["row_number"], "errors": messages})
+
+        created = sum(1 for result in results if result["created"])
+        logger.info("Importados {} de {} usuarios", created, len(rows))
+
+        return ServiceResult(
+            {
+                "total": len(rows),
+                "created": created,
+                "errors": sorted(errors, key=lambda error: error["row"]),
+                "ignored": ignored,
+            }
+        )
+
+    async def export_users(self, search: str | None, format: str) -> ServiceResult:
+        from modules.users.users.user_sqlstaments import EXPORT_USERS_COLUMNS
+
+        records = UserRepository(self.db).export_users(search)
+        return ServiceResult(export_response(records, EXPORT_USERS_COLUMNS, format, "users"))
+
     async def get_users_list(
         self,
         search: str | None,
@@ -94,25 +165,107 @@ class UserService:
         order: str = None,
         direction: str = None,
     ) -> ServiceResult:
-        users = await UserRepository(self.db).get_users_list(search, order, direction)
+        page_num = max(page_num, 1)
+        page_size = max(page_size, 1)
+        route = f"{API_PREFIX}/users/"
+        if LIST_JSON_FAST_PATH:
+            previous_page = None
+            if page_num > 1:
+                previous_page = f"{route}?page_number={page_num-1}&page_size={page_size}"
+            content = await UserRepository(self.db).get_users_list_json(
+                search,
+                order,
+                direction,
+                page_num=page_num,
+                page_size=page_size,
+                next_page=f"{route}?page_number={page_num+1}&page_size={page_size}",
+                previous_page=previous_page,
+            )
+            return ServiceResult(Response(content=content, media_type="application/json"))
+
+        users, total = await UserRepository(self.db).get_users_list(
+            search, order, direction, page_num=page_num, page_size=page_size
+        )
 
         service_result = None
-        if len(users) == 0:
+        if total == 0:
             users_list = []
             service_result = ServiceResult(users_list)
             service_result.status_code = 204
         else:
-            users_list = [UserOut(**item.dict()) for item in users]
-            response = short_pagination(
+            response = short_pagination_aps(
                 page_num=page_num,
                 page_size=page_size,
-                data_list=users_list,
-                route=f"{API_PREFIX}/users",
+                data_list=users,
+                total=total,
+                route=route,
             )
             service_result = ServiceResult(response)
 
         return service_result
 
+    async def get_users_list_by_cursor(
+        self,
+        search: str | None,
+        cursor: str = "",
+        page_size: int = 10,
+        order: str = None,
+        direction: str = None,
+    ) -> ServiceResult:
+        try:
+            state = decode_cursor(cursor, user_list_sort_type)
+        except ValueError as e:
+            logger.error("Invalid users list cursor: {}", e)
+            return ServiceResult(UserExceptions.UserInvalidCursorException())
+
+        if state:
+            search = state["search"]
+            order = state["order"]
+            direction = state["direction"]
+        else:
+            order = order.lower() if order else None
+            direction = direction.upper() if direction else None
+
+        page_size = max(page_size, 1)
+        user_repo = UserRepository(self.db)
+        users = await user_repo.get_users_list_by_cursor(
+            search, order, direction, cursor=state, limit=page_size + 1
+        )
+
+        has_more = len(users) > page_size
+        if state.get("before"):
+            users = users[-page_size:]
+            has_next, has_previous = True, has_more
+        else:
+            users = users[:page_size]
+            has_next, has_previous = has_more, bool(state)
+
+        next_cursor = previous_cursor = None
+        if users and has_next:
+            last = users[-1]
+            next_cursor = encode_cursor(
+                order, direction, search, user_repo.get_sort_key(order, last), last.id
+            )
+        if users and has_previous:
+            first = users[0]
+            previous_cursor = encode_cursor(
+                order,
+                direction,
+                search,
+                user_repo.get_sort_key(order, first),
+                first.id,
+                before=True,
+            )
+
+        response = keyset_pagination(
+            data_list=users,
+            page_size=page_size,
+            next_cursor=next_cursor,
+            previous_cursor=previous_cursor,
+            route=f"{API_PREFIX}/users/",
+        )
+        return ServiceResult(response)
+
     async def get_user_by_id(self, id: UUID) -> ServiceResult:
         user = await UserRepository(self.db).get_user_by_id(id=id)
 
@@ -120,8 +273,7 @@ class UserService:
             logger.info("El usuario solicitado no está en base de datos")
             return ServiceResult(UserExceptions.UserNotFoundException())
 
-        user_public = UserPublic(**user.dict())
-        return ServiceResult(user_public)
+        return ServiceResult(user)
 
     async def update_user(
         self, id: UUID, user_update: UserUpdate, current_user: UserInDB
@@ -132,7 +284,7 @@ class UserService:
         credentials = {}
         try:
             if user_update.password:
-                user_password_update = AuthService().create_salt_and_hashedpassword(
+                user_password_update = await AuthService().create_salt_and_hashedpassword(
                     plaintext_password=user_update.password
                 )
                 credentials["password"] = user_password_update.password
@@ -149,11 +301,13 @@ class UserService:
                 logger.info("El usuario a actualizar no está en base de datos")
                 return ServiceResult(UserExceptions.UserNotFoundException())
 
-            user_public = UserPublic(**user.dict())
-            return ServiceResult(user_public)
+            return ServiceResult(user)
 
+        except AppExceptionCase as e:
+            # a busy password hasher or connection pool keeps its 503
+            return ServiceResult(e)
         except Exception as e:
-            logger.error(f"Se produjo un error: {e}")
+            logger.error("Se produjo un error: {}", e)
             return ServiceResult(UserExceptions.UserInvalidUpdateParamsException(e))
 
     async def activate_user(
@@ -173,8 +327,7 @@ class UserService:
             logger.info("El usuario a activar / desactivar no está en base de datos")
             return ServiceResult(UserExceptions.UserNotFoundException())
 
-        user_public = UserPublic(**user.dict())
-        return ServiceResult(user_public)
+        return ServiceResult(user)
 
     async def delete_user(
         self,
@@ -199,7 +352,7 @@ class UserService:
 
         credentials = {}
         try:
-            user_password_update = AuthService().create_salt_and_hashedpassword(
+            user_password_update = await AuthService().create_salt_and_hashedpassword(
                 plaintext_password=psw_update
             )
             credentials["password"] = user_password_update.password
@@ -214,9 +367,11 @@ class UserService:
                 logger.info("El usuario a actualizar no está en base de datos")
                 return ServiceResult(UserExceptions.UserNotFoundException())
 
-            user_public = UserPublic(**user.dict())
-            return ServiceResult(user_public)
+            return ServiceResult(user)
 
+        except AppExceptionCase as e:
+            # a busy password hasher or connection pool keeps its 503
+            return ServiceResult(e)
         except Exception as e:
-            logger.error(f"Se produjo un error: {e}")
+            logger.error("Se produjo un error: {}", e)
             return ServiceResult(UserExceptions.UserInvalidUpdateParamsException())
@@ -1,51 +1,156 @@
+USER_LIST_SORT_COLUMNS = {
+    "fullname": "us.fullname",
+    "username": "us.username",
+    "email": "us.email",
+    "rol": "ro.role",
+    "status": "us.is_active",
+}
+
+
+# python type of each sort column, the keyset cursors carry a value of it
+USER_LIST_SORT_TYPES = {"status": bool}
+
+
+def user_list_sort_column(order: str | None) -> str:
+    return USER_LIST_SORT_COLUMNS.get(order or "username", "us.username")
+
+
+def user_list_sort_type(order: str | None) -> type:
+    return USER_LIST_SORT_TYPES.get(order, str)
+
+
 def user_list_complements(order: str | None, direction: str | None):
-    sql_sentence = ""
-    if not order and not direction:
-        sql_sentence = " ORDER BY us.username ASC;"
-    elif order == "fullname" and direction == "DESC":
-        sql_sentence = " ORDER BY us.fullname DESC;"
-    elif order == "fullname" and (direction == "ASC" or direction == None):
-        sql_sentence = " ORDER BY us.fullname ASC;"
-    elif order == "username" and direction == "DESC":
-        sql_sentence = " ORDER BY us.username DESC;"
-    elif order == "username" and (direction == "ASC" or direction == None):
-        sql_sentence = " ORDER BY us.username ASC;"
-    elif order == "email" and direction == "DESC":
-        sql_sentence = " ORDER BY us.email DESC;"
-    elif order == "email" and (direction == "ASC" or direction == None):
-        sql_sentence = " ORDER BY us.email ASC;"
-    elif order == "rol" and direction == "DESC":
-        sql_sentence = " ORDER BY ro.role DESC;"
-    elif order == "rol" and (direction == "ASC" or direction == None):
-        sql_sentence = " ORDER BY ro.role ASC;"
-    elif order == "status" and direction == "DESC":
-        sql_sentence = " ORDER BY ro.is_active DESC;"
-    elif order == "status" and (direction == "ASC" or direction == None):
-        sql_sentence = " ORDER BY ro.is_active ASC;"
-
-    return sql_sentence
+    column = user_list_sort_column(order)
+    direction = "DESC" if direction == "DESC" else "ASC"
+
+    # us.id breaks ties so LIMIT / OFFSET pages are stable
+    return f" ORDER BY {column} {direction}, us.id {direction}"
+
+
+def user_list_pagination():
+    return " LIMIT :limit OFFSET :offset;"
+
+
+def user_list_keyset(order: str | None, direction: str | None, before: bool):
+    """
+    Returns the (predicate, sort) pair to fetch the rows after (or before) the
+    (:cursor_key, :cursor_id) position using the same keys as
+    user_list_complements
+    """
+    column = user_list_sort_column(order)
+    descending = (direction == "DESC") != before
+    comparator = "<" if descending else ">"
+    direction = "DESC" if descending else "ASC"
+
+    predicate = f" ({column}, us.id) {comparator} (:cursor_key, :cursor_id) "
+    sort = f" ORDER BY {column} {direction}, us.id {direction} LIMIT :limit;"
+    return predicate, sort
 
 
 def user_list_search():
-    return """ WHERE (us.fullname LIKE :search 
-        or us.username ILIKE :search 
-        or ro.role ILIKE :search
-        or us.email ILIKE :search) """
+    """
+    Every branch filters a single trigram indexed column, so the users
+    matching the term are found through the indexes instead of scanning the
+    users JOIN roles result
+    """
+    return """ WHERE us.id IN (
+        SELECT id FROM users
+        WHERE fullname ILIKE :search
+            OR username ILIKE :search
+            OR email ILIKE :search
+        UNION
+        SELECT users.id FROM roles
+        INNER JOIN users ON users.role_id = roles.id
+        WHERE roles.role ILIKE :search) """
 
 
 CREATE_USER_ITEM = """
-    INSERT INTO users (id, fullname, username, password, email, is_superadmin, role_id,
-        is_active, created_by, created_at, updated_by, updated_at, salt)
-    VALUES(:id, :fullname, :username, :password, :email, :is_superadmin, :role_id,
-        :is_active, :created_by, :created_at, :updated_by, :updated_at, :salt)
-    RETURNING id, fullname, username, email, is_superadmin, is_active, role_id, password, salt;
+    WITH us AS (
+        INSERT INTO users (id, fullname, username, password, email, is_superadmin, role_id,
+            is_active, created_by, created_at, updated_by, updated_at, salt)
+        VALUES(:id, :fullname, :username, :password, :email, :is_superadmin, :role_id,
+            :is_active, :created_by, :created_at, :updated_by, :updated_at, :salt)
+        RETURNING id, fullname, username, email, is_superadmin, is_active, role_id, password,
+            salt, created_at, updated_at
+    )
+    SELECT us.*, ro.role, ro.permissions
+    FROM us
+    INNER JOIN roles AS ro ON us.role_id = ro.id;
 """
 
-GET_USER_BY_EMAIL = """
-    SELECT us.id, us.fullname, us.username, us.password, us.salt, us.email, us.is_active, 
-        us.is_superadmin, us.role_id,ro.role, ro.permissions
+USERS_IMPORT_COLUMNS = (
+    "row_number",
+    "id",
+    "fullname",
+    "username",
+    "password",
+    "salt",
+    "email",
+    "is_superadmin",
+    "is_active",
+    "role_id",
+    "created_by",
+    "created_at",
+    "updated_by",
+    "updated_at",
+)
+
+# accepted by UserCreate but not imported, reported back for every row that has them
+USERS_IMPORT_IGNORED_FIELDS = ("is_active",)
+
+CREATE_USERS_IMPORT_TABLE = """
+    CREATE TEMPORARY TABLE users_import (
+        row_number integer NOT NULL,
+        id uuid NOT NULL,
+        fullname text NOT NULL,
+        username varchar(40) NOT NULL,
+        password text NOT NULL,
+        salt text NOT NULL,
+        email varchar(60) NOT NULL,
+        is_superadmin boolean NOT NULL,
+        is_active boolean NOT NULL,
+        role_id uuid NOT NULL,
+        created_by uuid,
+        created_at timestamptz,
+        updated_by uuid,
+        updated_at timestamptz
+    ) ON COMMIT DROP;
+"""
+
+# rows whose email or username is already taken (in the table or earlier in the
+# file) are skipped by ON CONFLICT, every staged row is reported back
+IMPORT_USERS_FROM_STAGING = """
+    WITH inserted AS (
+        INSERT INTO users (id, fullname, username, password, email, is_superadmin, role_id,
+            is_active, created_by, created_at, updated_by, updated_at, salt)
+        SELECT im.id, im.fullname, im.username, im.password, im.email, im.is_superadmin,
+            im.role_id, im.is_active, im.created_by, im.created_at, im.updated_by,
+            im.updated_at, im.salt
+        FROM users_import AS im
+        INNER JOIN roles AS ro ON ro.id = im.role_id
+        ORDER BY im.row_number
+        ON CONFLICT DO NOTHING
+        RETURNING id
+    )
+    SELECT im.row_number, im.id, inserted.id IS NOT NULL AS created,
+        ro.id IS NULL AS missing_role
+    FROM users_import AS im
+    LEFT JOIN roles AS ro ON ro.id = im.role_id
+    LEFT JOIN inserted ON inserted.id = im.id
+    ORDER BY im.row_number;
+"""
+
+# projections: "public" rows hydrate UserPublic, "list" rows hydrate UserOut and
+# only the "auth" row (GET_USER_BY_USERNAME) carries the password hash and salt
+USER_PUBLIC_COLUMNS = """us.id, us.fullname, us.username, us.email, us.is_active,
+        us.is_superadmin, us.role_id, us.created_at, us.updated_at"""
+
+USER_LIST_COLUMNS = """us.id, us.fullname, us.username, us.email, us.is_active,
+        us.role_id, ro.role, us1.fullname AS created_by, us2.fullname AS updated_by"""
+
+GET_USER_BY_EMAIL = f"""
+    SELECT {USER_PUBLIC_COLUMNS}
     FROM users AS us
-    INNER JOIN roles as ro ON us.role_id = ro.id
     WHERE email = :email;
 """
 
@@ -57,60 +162,98 @@ GET_USER_BY_USERNAME = """
     WHERE username = :username;
 """
 
-GET_USER_BY_ID = """
-    SELECT us.id, us.fullname, us.username, us.password, us.salt, us.email, us.is_active, 
-        us.is_superadmin, us.role_id,ro.role, ro.permissions
-    FROM users AS us 
-    INNER JOIN roles as ro ON us.role_id = ro.id
-    WHERE us.id = :id; 
+GET_USER_BY_ID = f"""
+    SELECT {USER_PUBLIC_COLUMNS}
+    FROM users AS us
+    WHERE us.id = :id;
 """
 
-GET_USERS_LIST = """
-    SELECT us.id, us.fullname, us.username, us.password, us.salt, us.email, us.is_superadmin, 
-        us.is_active, us.role_id, ro.role, ro.permissions, us1.fullname AS created_by, 
-        us2.fullname AS updated_by
+GET_USERS_LIST = f"""
+    SELECT {USER_LIST_COLUMNS}, count(*) OVER () AS total_count
     FROM users AS us
     INNER JOIN roles AS ro ON us.role_id = ro.id
     LEFT JOIN users AS us1 ON us1.id = us.created_by
     LEFT JOIN users AS us2 ON us2.id = us.updated_by
 """
 
-GET_USERS_LIST_BY_ROLE_ID = """
-    SELECT *
+GET_USERS_LIST_KEYSET = f"""
+    SELECT {USER_LIST_COLUMNS}
     FROM users AS us
-    WHERE us.role_id = :role_id
+    INNER JOIN roles AS ro ON us.role_id = ro.id
+    LEFT JOIN users AS us1 ON us1.id = us.created_by
+    LEFT JOIN users AS us2 ON us2.id = us.updated_by
 """
 
-UPDATE_USER_BY_ID = """
-    UPDATE users
-    SET fullname      = :fullname,
-        username      = :username,
-        email         = :email,
-        password      = :password,
-        role_id       = :role_id,
-        is_superadmin = :is_superadmin,
-        is_active     = :is_active,
-        salt          = :salt,
-        created_by    = :created_by,
-        created_at    = :created_at,
-        updated_by    = :updated_by,
-        updated_at    = :updated_at
-    WHERE id = :id
-    RETURNING id, fullname, username, email, is_superadmin, role_id, password, salt, updated_by;
+COUNT_USERS_LIST = """
+    SELECT count(*)
+    FROM users AS us
+    INNER JOIN roles AS ro ON us.role_id = ro.id
 """
 
-UPDATE_PSW_BY_ID = """
-    UPDATE users
-    SET password      = :password,
-        salt          = :salt,
-        updated_by    = :updated_by,
-        updated_at    = :updated_at
-    WHERE id = :id
-    RETURNING id, password;
+EXPORT_USERS_COLUMNS = (
+    "id",
+    "fullname",
+    "username",
+    "email",
+    "is_superadmin",
+    "is_active",
+    "role_id",
+    "role",
+    "created_by",
+    "created_at",
+    "updated_by",
+    "updated_at",
+)
+
+# no password or salt, the export is read by reporting tools
+EXPORT_USERS_LIST = """
+    SELECT us.id, us.fullname, us.username, us.email, us.is_superadmin, us.is_active,
+        us.role_id, ro.role, us1.fullname AS created_by, us.created_at,
+        us2.fullname AS updated_by, us.updated_at
+    FROM users AS us
+    INNER JOIN roles AS ro ON us.role_id = ro.id
+    LEFT JOIN users AS us1 ON us1.id = us.created_by
+    LEFT JOIN users AS us2 ON us2.id = us.updated_by
+"""
+
+GET_USERS_LIST_BY_ROLE_ID = f"""
+    SELECT {USER_PUBLIC_COLUMNS}
+    FROM users AS us
+    WHERE us.role_id = :role_id;
 """
 
+USER_UPDATE_COLUMNS = (
+    "fullname",
+    "username",
+    "email",
+    "password",
+    "salt",
+    "role_id",
+    "is_superadmin",
+    "is_active",
+)
+
+
+def user_update_by_id(columns) -> str:
+    """
+    UPDATE of the given columns (and the audit ones) returning the same
+    public projection as GET_USER_BY_ID
+    """
+    columns = [column for column in USER_UPDATE_COLUMNS if column in columns]
+    assignments = ",\n        ".join(
+        f"{column} = :{column}" for column in [*columns, "updated_by", "updated_at"]
+    )
+
+    return f"""
+    UPDATE users AS us
+    SET {assignments}
+    WHERE us.id = :id
+    RETURNING {USER_PUBLIC_COLUMNS};
+"""
+
+
 DELETE_USER_BY_ID = """
     DELETE from users
     WHERE id = :id
-    RETURNING id
+    RETURNING id;
 """
@@ -4,7 +4,7 @@ from typing import Optional
 from databases import DatabaseURL
 from pydantic import PostgresDsn
 from starlette.config import Config
-from starlette.datastructures import Secret
+from starlette.datastructures import CommaSeparatedStrings, Secret
 
 config = Config(".env")
 
@@ -38,13 +38,80 @@ JWT_TOKEN_PREFIX = config("JWT_TOKEN_PREFIX", cast=str)
 AES_KEY = config("AES_KEY", cast=str)
 AES_BLOCKSIZE = config("AES_BLOCKSIZE", cast=int)
 
+# bcrypt runs in a process pool so it never blocks the event loop
+PASSWORD_HASH_WORKERS = config("PASSWORD_HASH_WORKERS", cast=int, default=os.cpu_count() or 1)
+PASSWORD_HASH_QUEUE_DEPTH = config("PASSWORD_HASH_QUEUE_DEPTH", cast=int, default=64)
+PASSWORD_HASH_TIMEOUT = config("PASSWORD_HASH_TIMEOUT", cast=float, default=10.0)
+
+# authenticated users resolved from tokens, a size of 0 disables the cache
+PRINCIPAL_CACHE_SIZE = config("PRINCIPAL_CACHE_SIZE", cast=int, default=1024)
+PRINCIPAL_CACHE_TTL = config("PRINCIPAL_CACHE_TTL", cast=float, default=60.0)
+
+# caches are invalidated across workers with LISTEN/NOTIFY on this channel
+CACHE_INVALIDATION_CHANNEL = config(
+    "CACHE_INVALIDATION_CHANNEL", cast=str, default="cache_invalidation"
+)
+CACHE_INVALIDATION_RETRY = config("CACHE_INVALIDATION_RETRY", cast=float, default=5.0)
+
+# resources whose ETag was invalidated that are remembered, past it every ETag changes
+ETAG_STORE_SIZE = config("ETAG_STORE_SIZE", cast=int, default=10000)
+
+# rows accepted by a single bulk users import, every password is hashed within the
+# request on the bulk slots of the password hasher
+USERS_IMPORT_MAX_ROWS = config("USERS_IMPORT_MAX_ROWS", cast=int, default=10000)
+
+# responses of these types reaching the minimum size are compressed with gzip, or
+# with brotli when it is installed and the client prefers it
+COMPRESSION_ENABLED = config("COMPRESSION_ENABLED", cast=bool, default=True)
+COMPRESSION_MINIMUM_SIZE = config("COMPRESSION_MINIMUM_SIZE", cast=int, default=1024)
+COMPRESSION_CONTENT_TYPES = config(
+    "COMPRESSION_CONTENT_TYPES",
+    cast=CommaSeparatedStrings,
+    default="application/json,application/x-ndjson,text/csv,text/plain,text/html",
+)
+COMPRESSION_GZIP_LEVEL = config("COMPRESSION_GZIP_LEVEL", cast=int, default=6)
+COMPRESSION_BROTLI = config("COMPRESSION_BROTLI", cast=bool, default=True)
+COMPRESSION_BROTLI_QUALITY = config("COMPRESSION_BROTLI_QUALITY", cast=int, default=4)
+
+# logs are written to stderr from a background thread, as JSON lines if LOG_JSON is set,
+# and at most LOG_SAMPLE_BURST repeated errors (invalid logins, ...) per window of seconds
+LOG_LEVEL = config("LOG_LEVEL", default="INFO")
+LOG_JSON = config("LOG_JSON", cast=bool, default=False)
+LOG_ENQUEUE = config("LOG_ENQUEUE", cast=bool, default=True)
+LOG_SAMPLE_BURST = config("LOG_SAMPLE_BURST", cast=int, default=10)
+LOG_SAMPLE_WINDOW = config("LOG_SAMPLE_WINDOW", cast=float, default=60.0)
+
+# GET /metrics in the Prometheus text format and the request latency behind it, the
+# scraper must send METRICS_TOKEN as a bearer token, without one the route is not served
+METRICS_ENABLED = config("METRICS_ENABLED", cast=bool, default=False)
+METRICS_TOKEN = config("METRICS_TOKEN", cast=Secret, default="")
+
+# responses tell in a Server-Timing header the time spent in the database, hashing
+# passwords and rendering JSON (not the response_model validation), for the browser devtools
+SERVER_TIMING_ENABLED = config("SERVER_TIMING_ENABLED", cast=bool, default=False)
+
+# GET /users and /users/roles answer with the JSON built by Postgres
+LIST_JSON_FAST_PATH = config("LIST_JSON_FAST_PATH", cast=bool, default=False)
+
 DATABASE_URL = config(
     "DATABASE_URL",
     cast=DatabaseURL,
     default=f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_SERVER}:{POSTGRES_PORT}/{POSTGRES_DB}",
 )
 
+# connection pool, the timeouts are in seconds except the statement timeout (ms, 0 keeps
+# the server default) and an acquire timeout of 0 waits for a connection forever
+DB_MIN_SIZE = config("DB_MIN_SIZE", cast=int, default=2)
+DB_MAX_SIZE = config("DB_MAX_SIZE", cast=int, default=15)
+DB_ACQUIRE_TIMEOUT = config("DB_ACQUIRE_TIMEOUT", cast=float, default=10.0)
+DB_MAX_QUERIES = config("DB_MAX_QUERIES", cast=int, default=50000)
+DB_MAX_IDLE_LIFETIME = config("DB_MAX_IDLE_LIFETIME", cast=float, default=300.0)
+DB_STATEMENT_TIMEOUT = config("DB_STATEMENT_TIMEOUT", cast=int, default=0)
+DB_WARM_UP = config("DB_WARM_UP", cast=bool, default=True)
+
+# queries of a request slower than this are logged (0 logs none), and a request running
+# more than the budget is logged, or fails while testing (0 sets no budget)
+DB_SLOW_QUERY_MS = config("DB_SLOW_QUERY_MS", cast=float, default=200.0)
+DB_QUERY_BUDGET = config("DB_QUERY_BUDGET", cast=int, default=20)
 
-DB_MIN_SIZE: int = 2
-DB_MAX_SIZE: int = 15
 DB_FORCE_ROLL_BACK: bool = False
@@ -1,7 +1,11 @@
-from databases import Database
 from fastapi import FastAPI
 from starlette.requests import Request
 
+from shared.core.db.db_request import RequestDatabase
 
-def get_database(request: Request) -> Database:
-    return request.app.state._db
+
+def get_database(request: Request) -> RequestDatabase:
+    # FastAPI caches it, every dependency of the request gets the same one
+    route = getattr(request.scope.get("route"), "name", None)
+    request.state.db = RequestDatabase(request.app.state._db, route)
+    return request.state.db
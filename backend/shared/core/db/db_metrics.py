@@ -0,0 +1,110 @@
+import re
+import time
+from contextlib import contextmanager
+from types import ModuleType
+from typing import Any, Dict, Iterator, List, Optional
+
+from databases import Database
+
+from shared.core.metrics import Histogram, metrics
+
+# constants of these kinds are whole statements, the rest are fragments
+_STATEMENT = re.compile(r"^\s*(SELECT|INSERT|UPDATE|DELETE|WITH|CREATE|COPY)\b", re.IGNORECASE)
+_TARGET = re.compile(r"\b(INSERT\s+INTO|UPDATE|DELETE\s+FROM|FROM)\s+(\w+)", re.IGNORECASE)
+
+
+class StatementNames:
+    """
+    Names a query after the SQL constant it was built from, e.g. a page of
+    the users list after GET_USERS_LIST whatever search and sort was added to
+    it. Queries built by functions are named after their verb and table.
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize = maxsize
+        self._statements: Dict[str, str] = {}
+        self._names: Dict[str, str] = {}
+
+    def register(self, *modules: ModuleType) -> None:
+        for module in modules:
+            for name, value in vars(module).items():
+                if name.isupper() and isinstance(value, str) and _STATEMENT.match(value):
+                    self._statements[value.strip()] = name
+        self._names.clear()
+
+    def name(self, query: Any) -> str:
+        if not isinstance(query, str):
+            return "other"
+
+        name = self._names.get(query)
+        if name is None:
+            name = self._resolve(query)
+            if len(self._names) >= self.maxsize:
+                self._names.clear()
+            self._names[query] = name
+        return name
+
+    def _resolve(self, query: str) -> str:
+        # the longest constant contained in the query, the CTE of a JSON page
+        # also contains its count
+        found = [statement for statement in self._statements if statement in query]
+        if found:
+            return self._statements[max(found, key=len)]
+
+        verb = query.split(None, 1)[0].upper() if query.strip() else "other"
+        target = _TARGET.search(query)
+        return f"{verb}_{target.group(2).upper()}" if target else verb
+
+
+statement_names = StatementNames()
+
+
+class InstrumentedDatabase(Database):
+    """
+    A `databases.Database` observing how long each query takes once it has a
+    connection, labelled by its statement name. Waiting for the connection is
+    measured by the pool. Queries run on an explicit `connection()` and the
+    rows of `iterate`, consumed at the pace of the client, are not observed.
+    """
+
+    def __init__(self, url: Any, **options: Any) -> None:
+        super().__init__(url, **options)
+        self.names = statement_names
+        self.latency: Histogram = metrics.histogram(
+            "db_query_duration_seconds",
+            "Latency of the database queries by statement",
+            ("statement",),
+        )
+
+    @contextmanager
+    def _observe(self, query: Any) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.latency.observe(time.perf_counter() - started, self.names.name(query))
+
+    async def fetch_all(self, query: Any, values: Optional[dict] = None) -> List[Any]:
+        async with self.connection() as connection:
+            with self._observe(query):
+                return await connection.fetch_all(query, values)
+
+    async def fetch_one(self, query: Any, values: Optional[dict] = None) -> Any:
+        async with self.connection() as connection:
+            with self._observe(query):
+                return await connection.fetch_one(query, values)
+
+    async def fetch_val(self, query: Any, values: Optional[dict] = None, column: Any = 0) -> Any:
+        async with self.connection() as connection:
+            with self._observe(query):
+                return await connection.fetch_val(query, values, column=column)
+
+    async def execute(self, query: Any, values: Optional[dict] = None) -> Any:
+        async with self.connection() as connection:
+            with self._observe(query):
+                return await connection.execute(query, values)
+
+    async def execute_many(self, query: Any, values: list) -> None:
+        async with self.connection() as connection:
+            with self._observe(query):
+                return await connection.execute_many(query, values)
@@ -0,0 +1,130 @@
+import asyncio
+import json
+from collections import defaultdict
+from typing import Any, Callable, Dict, List
+from uuid import uuid4
+
+import asyncpg
+from databases import Database, DatabaseURL
+from loguru import logger
+
+from shared.core.config import CACHE_INVALIDATION_CHANNEL, CACHE_INVALIDATION_RETRY
+
+# identifies this process, its own notifications were already applied locally
+ORIGIN = uuid4().hex
+
+PUBLISH_INVALIDATION = "SELECT pg_notify(:channel, :payload);"
+
+_handlers: Dict[str, List[Callable[[Any], None]]] = defaultdict(list)
+
+
+def subscribe(kind: str, handler: Callable[[Any], None]) -> None:
+    """
+    Registers `handler` for invalidations of `kind` ("user", "role", ...).
+    Handlers of the "all" kind are called without arguments whenever the
+    listener loses track of the channel and every cache must be dropped.
+    """
+    _handlers[kind].append(handler)
+
+
+def dispatch(kind: str, key: Any = None) -> None:
+    for handler in _handlers.get(kind, []):
+        try:
+            handler() if kind == "all" else handler(key)
+        except Exception as e:
+            logger.error("Error al invalidar la cache {} {}: {}", kind, key, e)
+
+
+async def publish(db: Database, kind: str, key: Any) -> None:
+    """
+    Invalidates `key` in this process and notifies every other worker. Inside
+    a transaction Postgres only delivers the notification on commit.
+    """
+    dispatch(kind, str(key))
+    payload = json.dumps({"origin": ORIGIN, "kind": kind, "key": str(key)})
+    try:
+        await db.execute(
+            query=PUBLISH_INVALIDATION,
+            values={"channel": CACHE_INVALIDATION_CHANNEL, "payload": payload},
+        )
+    except Exception as e:
+        logger.warning("No se pudo publicar la invalidación {} {}: {}", kind, key, e)
+
+
+class InvalidationListener:
+    """
+    Keeps a dedicated connection LISTENing on the invalidation channel and
+    dispatches the notifications sent by other workers. Notifications sent
+    while disconnected are lost, so every cache is cleared on (re)connect.
+    """
+
+    def __init__(self, channel: str, retry_interval: float) -> None:
+        self.channel = channel
+        self.retry_interval = retry_interval
+        self._task: asyncio.Task | None = None
+
+    def start(self, database_url: DatabaseURL) -> None:
+        if self._task is None:
+            dsn = str(database_url.replace(driver=""))
+            self._task = asyncio.get_running_loop().create_task(self._run(dsn))
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def _on_notification(self, connection, pid: int, channel: str, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning("Notificación de invalidación inválida: {}", payload)
+            return
+
+        if message.get("origin") != ORIGIN:
+            dispatch(message.get("kind"), message.get("key"))
+
+    async def _listen(self, dsn: str) -> None:
+        connection = await asyncpg.connect(dsn)
+        lost = asyncio.Event()
+        connection.add_termination_listener(lambda _: lost.set())
+        try:
+            await connection.add_listener(self.channel, self._on_notification)
+            dispatch("all")
+            logger.info("Escuchando invalidaciones en el canal {}", self.channel)
+
+            while not lost.is_set():
+                try:
+                    await asyncio.wait_for(lost.wait(), timeout=self.retry_interval * 6)
+                except asyncio.TimeoutError:
+                    # a half-open socket is only noticed when something is sent
+                    await connection.execute("SELECT 1;", timeout=self.retry_interval)
+        finally:
+            if not connection.is_closed():
+                await connection.close(timeout=self.retry_interval)
+
+    async def _run(self, dsn: str) -> None:
+        while True:
+            try:
+                await self._listen(dsn)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Conexión de invalidaciones perdida: {}", e)
+
+            dispatch("all")
+            await asyncio.sleep(self.retry_interval)
+
+
+invalidation_listener = InvalidationListener(
+    channel=CACHE_INVALIDATION_CHANNEL, retry_interval=CACHE_INVALIDATION_RETRY
+)
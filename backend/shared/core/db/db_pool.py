@@ -0,0 +1,169 @@
+import asyncio
+import math
+import statistics
+import time
+from collections import deque
+from typing import Any, Dict
+
+import asyncpg
+import databases
+from databases import Database
+from databases.backends.postgres import PostgresBackend
+from loguru import logger
+
+from shared.core import config
+from shared.core.metrics import metrics
+from shared.utils.app_exceptions import AppExceptionCase
+
+
+class DatabaseExceptions:
+    class PoolAcquireTimeoutException(AppExceptionCase):
+        """_
+        No connection of the pool became free within DB_ACQUIRE_TIMEOUT
+        """
+
+        def __init__(self, msg: str = ""):
+            status_code = 503
+            msg = "El servicio está ocupado, intente de nuevo en unos segundos"
+            AppExceptionCase.__init__(self, status_code, msg)
+
+    class QueryBudgetExceededException(AppExceptionCase):
+        """_
+        A request ran more queries than DB_QUERY_BUDGET, only raised while testing
+        """
+
+        def __init__(self, msg: str = ""):
+            status_code = 500
+            msg = f"Se superó el presupuesto de consultas de la petición, {msg}"
+            AppExceptionCase.__init__(self, status_code, msg)
+
+
+def pool_options() -> Dict[str, Any]:
+    """
+    The asyncpg.create_pool arguments of the application database
+    """
+    options = {
+        "min_size": config.DB_MIN_SIZE,
+        "max_size": config.DB_MAX_SIZE,
+        "max_queries": config.DB_MAX_QUERIES,
+        "max_inactive_connection_lifetime": config.DB_MAX_IDLE_LIFETIME,
+    }
+    if config.DB_STATEMENT_TIMEOUT:
+        options["server_settings"] = {"statement_timeout": str(config.DB_STATEMENT_TIMEOUT)}
+
+    return options
+
+
+class MonitoredPool:
+    """
+    Wraps the asyncpg pool of a `databases.Database` to bound how long a
+    request waits for a connection and to measure that wait. Everything else
+    is delegated to the pool.
+    """
+
+    def __init__(self, pool: asyncpg.Pool, acquire_timeout: float | None) -> None:
+        self._pool = pool
+        self.acquire_timeout = acquire_timeout or None
+        self.waiters = 0
+        self.acquired = 0
+        self.timeouts = 0
+        # the latencies of the last acquires
+        self._latencies = deque(maxlen=1024)
+        self.latency = metrics.histogram(
+            "db_pool_acquire_duration_seconds", "Time waited for a pool connection"
+        )
+
+    @classmethod
+    def install(cls, database: Database, acquire_timeout: float | None) -> "MonitoredPool":
+        """
+        Replaces the pool of the connected `database`. databases exposes no
+        hook around acquire, so this relies on the private `_pool` its postgres
+        backend (0.7) acquires every connection from; anything else fails at
+        startup instead of leaving the pool unmonitored.
+        """
+        backend = getattr(database, "_backend", None)
+        if not isinstance(backend, PostgresBackend) or not isinstance(
+            getattr(backend, "_pool", None), asyncpg.Pool
+        ):
+            raise RuntimeError(
+                f"databases {databases.__version__} no expone el pool de asyncpg "
+                "como _backend._pool, MonitoredPool no se puede instalar"
+            )
+        pool = cls(backend._pool, acquire_timeout)
+        backend._pool = pool
+        metrics.collector("db_pool", pool.collect)
+        return pool
+
+    async def acquire(self) -> asyncpg.Connection:
+        self.waiters += 1
+        started = time.perf_counter()
+        try:
+            connection = await self._pool.acquire(timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            logger.warning("Sin conexiones libres tras {}s: {}", self.acquire_timeout, self.stats())
+            raise DatabaseExceptions.PoolAcquireTimeoutException()
+        finally:
+            self.waiters -= 1
+
+        self.acquired += 1
+        latency = time.perf_counter() - started
+        self._latencies.append(latency)
+        self.latency.observe(latency)
+        return connection
+
+    async def release(self, connection: asyncpg.Connection) -> None:
+        await self._pool.release(connection)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._pool, name)
+
+    async def warm_up(self) -> None:
+        """
+        Opens and checks the minimum number of connections before the first
+        request needs them
+        """
+        connections = [await self._pool.acquire() for _ in range(self._pool.get_min_size())]
+        try:
+            await asyncio.gather(*(connection.fetchval("SELECT 1;") for connection in connections))
+        finally:
+            for connection in connections:
+                await self._pool.release(connection)
+
+    def stats(self) -> Dict[str, Any]:
+        size = self._pool.get_size()
+        idle = self._pool.get_idle_size()
+        latencies = sorted(self._latencies)
+        stats = {
+            "min_size": self._pool.get_min_size(),
+            "max_size": self._pool.get_max_size(),
+            "size": size,
+            "in_use": size - idle,
+            "idle": idle,
+            "waiters": self.waiters,
+            "acquired": self.acquired,
+            "timeouts": self.timeouts,
+            "acquire_ms": {"mean": None, "p95": None, "max": None},
+        }
+        if latencies:
+            stats["acquire_ms"] = {
+                "mean": round(statistics.fmean(latencies) * 1000, 3),
+                "p95": round(latencies[math.ceil(len(latencies) * 0.95) - 1] * 1000, 3),
+                "max": round(latencies[-1] * 1000, 3),
+            }
+
+        return stats
+
+    def collect(self) -> None:
+        size = self._pool.get_size()
+        idle = self._pool.get_idle_size()
+        connections = metrics.gauge(
+            "db_pool_connections", "Connections of the pool by state", ("state",)
+        )
+        connections.set(size - idle, "in_use")
+        connections.set(idle, "idle")
+        metrics.gauge("db_pool_max_size", "Maximum size of the pool").set(self._pool.get_max_size())
+        metrics.gauge("db_pool_waiters", "Requests waiting for a connection").set(self.waiters)
+        metrics.counter(
+            "db_pool_acquire_timeouts_total", "Requests that got no connection in time"
+        ).set(self.timeouts)
@@ -0,0 +1,101 @@
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, List, Mapping, Optional
+
+from databases import Database
+from loguru import logger
+
+from shared.core import config
+from shared.core.db.db_metrics import statement_names
+from shared.core.db.db_pool import DatabaseExceptions
+from shared.core.middlewares.server_timing import record_timing
+
+# parameter values that can reach the logs as they are, anything else could be a
+# password, a token or an email
+_LOGGABLE = (bool, int, float, type(None))
+
+
+def redact(values: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+    return {
+        key: value if isinstance(value, _LOGGABLE) else f"<{type(value).__name__}>"
+        for key, value in (values or {}).items()
+    }
+
+
+class RequestDatabase:
+    """
+    The database as one request sees it: every query run through it is
+    counted and timed by statement name, the slow ones are logged with their
+    parameters redacted, and going over the query budget of a request is
+    logged (raised while testing, so an N+1 fails its test). Everything else,
+    `connection()` and `transaction()` included, is the wrapped database.
+    """
+
+    def __init__(self, database: Database, route: str | None = None) -> None:
+        self._database = database
+        self.route = route
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Counter = Counter()
+        self.budget = config.DB_QUERY_BUDGET
+        self.slow_query = config.DB_SLOW_QUERY_MS / 1000
+        self.strict = bool(os.environ.get("TESTING"))
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._database, name)
+
+    def _count(self, statement: str) -> None:
+        self.count += 1
+        self.statements[statement] += 1
+        if self.budget and self.count == self.budget + 1:
+            detail = f"{self.route}: más de {self.budget} consultas {dict(self.statements)}"
+            if self.strict:
+                raise DatabaseExceptions.QueryBudgetExceededException(detail)
+            logger.warning("Presupuesto de consultas superado en {}", detail)
+
+    @contextmanager
+    def _record(self, query: Any, values: Optional[Mapping[str, Any]]) -> Iterator[None]:
+        statement = statement_names.name(query)
+        self._count(statement)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.duration += elapsed
+            record_timing("db", elapsed)
+            if self.slow_query and elapsed >= self.slow_query:
+                logger.warning(
+                    "Consulta lenta {} en {}: {:.1f} ms {}",
+                    statement,
+                    self.route,
+                    elapsed * 1000,
+                    redact(values),
+                )
+
+    async def fetch_all(self, query: Any, values: Optional[dict] = None) -> List[Any]:
+        with self._record(query, values):
+            return await self._database.fetch_all(query, values)
+
+    async def fetch_one(self, query: Any, values: Optional[dict] = None) -> Any:
+        with self._record(query, values):
+            return await self._database.fetch_one(query, values)
+
+    async def fetch_val(self, query: Any, values: Optional[dict] = None, column: Any = 0) -> Any:
+        with self._record(query, values):
+            return await self._database.fetch_val(query, values, column=column)
+
+    async def execute(self, query: Any, values: Optional[dict] = None) -> Any:
+        with self._record(query, values):
+            return await self._database.execute(query, values)
+
+    async def execute_many(self, query: Any, values: list) -> None:
+        with self._record(query, values[0] if values else None):
+            return await self._database.execute_many(query, values)
+
+    def iterate(self, query: Any, values: Optional[dict] = None) -> AsyncIterator[Mapping]:
+        # counted but not timed, the rows are fetched at the pace of the client
+        self._count(statement_names.name(query))
+        return self._database.iterate(query, values)
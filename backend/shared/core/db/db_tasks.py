@@ -1,15 +1,21 @@
 import os
 
-from databases import Database
+from databases import Database, DatabaseURL
 from fastapi import FastAPI
 from loguru import logger
 
 from modules.users.users.user_repositories import UserRepository
+from modules.users.auths import auth_sqlstaments
+from modules.users.roles import role_sqlsentences
 from modules.users.roles.role_schemas import RoleOut
+from modules.users.users import user_sqlstaments
+from shared.core.db import db_notifications
+from shared.core.db.db_metrics import InstrumentedDatabase, statement_names
+from shared.core.db.db_pool import MonitoredPool, pool_options
 from shared.core.config import (
     DATABASE_URL,
-    DB_MIN_SIZE,
-    DB_MAX_SIZE,
+    DB_ACQUIRE_TIMEOUT,
+    DB_WARM_UP,
     SUPER_ADMIN,
     SUPER_PASSWORD,
     SUPER_EMAIL,
@@ -18,13 +24,26 @@ from shared.core.config import (
 )
 
 
+def get_database_url() -> DatabaseURL:
+    if os.environ.get("TESTING"):
+        return DatabaseURL(f"{DATABASE_URL}_test")
+
+    return DatabaseURL(str(DATABASE_URL))
+
+
 async def connect_to_db(app: FastAPI) -> None:
     try:
-        DB_URL = f"{DATABASE_URL}_test" if os.environ.get("TESTING") else DATABASE_URL
-        database = Database(DB_URL, min_size=DB_MIN_SIZE, max_size=DB_MAX_SIZE)
+        DB_URL = get_database_url()
+        statement_names.register(
+            user_sqlstaments, role_sqlsentences, auth_sqlstaments, db_notifications
+        )
+        database = InstrumentedDatabase(DB_URL, **pool_options())
 
         await database.connect()
         app.state._db = database
+        app.state._db_pool = MonitoredPool.install(database, DB_ACQUIRE_TIMEOUT)
+        if DB_WARM_UP:
+            await app.state._db_pool.warm_up()
 
         await verify_super_admin(db=database)
 
@@ -53,7 +72,7 @@ async def verify_super_admin(db: Database) -> None:
         if not super:
             await _create_super_admin(db)
     except Exception as e:
-        logger.error("se produjo este error: {e}")
+        logger.error("se produjo este error: {}", e)
 
 
 async def _create_super_admin(db: Database) -> None:
@@ -71,7 +90,7 @@ async def _create_super_admin(db: Database) -> None:
         role_id=role.id,
     )
 
-    user_password_update = AuthService().create_salt_and_hashedpassword(
+    user_password_update = await AuthService().create_salt_and_hashedpassword(
         plaintext_password=super_admin.password
     )
     super_admin.password = user_password_update.password
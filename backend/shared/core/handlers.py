@@ -3,18 +3,25 @@ from typing import Callable
 from fastapi import FastAPI
 from loguru import logger
 
-from shared.core.db.db_tasks import connect_to_db, close_db_connection
+from modules.users.auths.auth_hasher import password_hasher
+from shared.core.db.db_notifications import invalidation_listener
+from shared.core.db.db_tasks import connect_to_db, close_db_connection, get_database_url
 
 
 def create_start_app_handler(app: FastAPI) -> Callable:
     async def start_app() -> None:
+        password_hasher.start()
         await connect_to_db(app)
+        invalidation_listener.start(get_database_url())
 
     return start_app
 
 
 def create_stop_app_handler(app: FastAPI) -> Callable:
     async def stop_app() -> None:
+        await invalidation_listener.stop()
         await close_db_connection(app)
+        password_hasher.shutdown()
+        await logger.complete()
 
     return stop_app
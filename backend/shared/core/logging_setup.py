@@ -0,0 +1,76 @@
+import sys
+import time
+from typing import Dict, List
+
+from loguru import logger
+
+from shared.core import config
+
+LOG_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | "
+    "{extra[request_id]} | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - "
+    "<level>{message}</level>"
+)
+
+# loguru's own stderr handler, replaced by the first setup
+_handler_id = 0
+
+
+class LogSampler:
+    """
+    Filter letting through the first `burst` records of each `sample` key
+    (bound with `logger.bind(sample=...)`) every `window` seconds. The first
+    record of a window tells in `extra["dropped"]` how many the last one
+    dropped. Records without the key always pass.
+    """
+
+    def __init__(self, burst: int, window: float) -> None:
+        self.burst = burst
+        self.window = window
+        # per key, the start of its window, the records seen and the dropped ones
+        self._windows: Dict[str, List[float]] = {}
+
+    def __call__(self, record: dict) -> bool:
+        key = record["extra"].get("sample")
+        if key is None or self.burst <= 0:
+            return True
+
+        now = time.monotonic()
+        state = self._windows.get(key)
+        if state is None or now - state[0] >= self.window:
+            if state is not None and state[2]:
+                record["extra"]["dropped"] = int(state[2])
+            state = self._windows[key] = [now, 0, 0]
+
+        state[1] += 1
+        if state[1] <= self.burst:
+            return True
+
+        state[2] += 1
+        return False
+
+
+def setup_logging() -> int:
+    """
+    Sends the logs to stderr from a background thread, so a slow terminal or
+    collector never blocks the event loop, as JSON lines when LOG_JSON is set.
+    Calling it again replaces the handler it added.
+    """
+    global _handler_id
+    try:
+        logger.remove(_handler_id)
+    except ValueError:
+        pass
+
+    logger.configure(extra={"request_id": "-"})
+    _handler_id = logger.add(
+        sys.stderr,
+        level=config.LOG_LEVEL,
+        format=LOG_FORMAT,
+        serialize=config.LOG_JSON,
+        enqueue=config.LOG_ENQUEUE,
+        filter=LogSampler(burst=config.LOG_SAMPLE_BURST, window=config.LOG_SAMPLE_WINDOW),
+        backtrace=False,
+        diagnose=config.DEBUG,
+    )
+    return _handler_id
@@ -0,0 +1,187 @@
+import zlib
+from typing import Dict, Iterable, List
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+
+class _GzipEncoder:
+    def __init__(self, level: int) -> None:
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        # flushed so every chunk of a streamed body reaches the client
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+class _BrotliEncoder:
+    def __init__(self, quality: int) -> None:
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.finish()
+
+
+def accepted_encodings(accept_encoding: str) -> Dict[str, float]:
+    """
+    Returns the quality of every coding of an Accept-Encoding header
+    """
+    encodings = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        encodings[coding] = quality
+
+    return encodings
+
+
+class CompressionMiddleware:
+    """
+    Compresses the responses whose content type is in `content_types` and
+    whose body reaches `minimum_size` bytes, with brotli when it is
+    installed and preferred by the client and with gzip otherwise. Streamed
+    bodies are buffered up to `minimum_size` and then compressed chunk by
+    chunk. Responses that already have a Content-Encoding or a Content-Range
+    are sent untouched.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        content_types: Iterable[str] = ("application/json",),
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        brotli_enabled: bool = True,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.content_types = frozenset(content_type.lower() for content_type in content_types)
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.brotli_enabled = brotli_enabled and brotli is not None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self.select_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+    def select_encoding(self, accept_encoding: str) -> str | None:
+        encodings = accepted_encodings(accept_encoding)
+        wildcard = encodings.get("*", 0.0)
+        candidates = ["br", "gzip"] if self.brotli_enabled else ["gzip"]
+
+        selected, best = None, 0.0
+        for coding in candidates:
+            quality = encodings.get(coding, wildcard)
+            if quality > best:
+                selected, best = coding, quality
+
+        return selected
+
+    def compressible(self, headers: Headers) -> bool:
+        content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        return (
+            content_type in self.content_types
+            and "content-encoding" not in headers
+            and "content-range" not in headers
+        )
+
+    def encoder(self, encoding: str) -> _GzipEncoder | _BrotliEncoder:
+        if encoding == "br":
+            return _BrotliEncoder(self.brotli_quality)
+        return _GzipEncoder(self.gzip_level)
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str | None, send: Send) -> None:
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.start: Message | None = None
+        self.pending: List[bytes] = []
+        self.pending_size = 0
+        self.encoder: _GzipEncoder | _BrotliEncoder | None = None
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = MutableHeaders(raw=message["headers"])
+            if not self.middleware.compressible(headers):
+                self.passthrough = True
+                await self._send(message)
+                return
+
+            # the representation depends on the header even when not compressed
+            headers.add_vary_header("Accept-Encoding")
+            if self.encoding is None:
+                self.passthrough = True
+                await self._send(message)
+                return
+
+            self.start = message
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.encoder is not None:
+            data = self.encoder.compress(body) if more_body else self.encoder.finish(body)
+            await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
+            return
+
+        self.pending.append(body)
+        self.pending_size += len(body)
+        if more_body and self.pending_size < self.middleware.minimum_size:
+            return
+
+        body = b"".join(self.pending)
+        self.pending = []
+        headers = MutableHeaders(raw=self.start["headers"])
+
+        if self.pending_size < self.middleware.minimum_size:
+            await self._send(self.start)
+            await self._send({"type": "http.response.body", "body": body})
+            return
+
+        self.encoder = self.middleware.encoder(self.encoding)
+        headers["Content-Encoding"] = self.encoding
+        if more_body:
+            del headers["Content-Length"]
+            body = self.encoder.compress(body)
+        else:
+            body = self.encoder.finish(body)
+            headers["Content-Length"] = str(len(body))
+
+        await self._send(self.start)
+        await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
@@ -0,0 +1,47 @@
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# the browser may keep the representation but has to revalidate it every time
+CACHE_CONTROL = "private, no-cache"
+
+
+class NotModified(Exception):
+    """
+    Raised by a route dependency when the If-None-Match of the request
+    matches the current ETag, the route itself never runs
+    """
+
+    def __init__(self, etag: str) -> None:
+        self.etag = etag
+
+
+async def not_modified_handler(request: Request, exc: NotModified) -> Response:
+    return Response(status_code=304, headers={"ETag": exc.etag, "Cache-Control": CACHE_CONTROL})
+
+
+class ETagMiddleware:
+    """
+    Adds the ETag a route dependency left in `request.state.etag` to the
+    successful response, whatever response class the route returned
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_etag(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                etag = scope.get("state", {}).get("etag")
+                headers = MutableHeaders(raw=message["headers"])
+                if etag and "etag" not in headers:
+                    headers["ETag"] = etag
+                    headers["Cache-Control"] = CACHE_CONTROL
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
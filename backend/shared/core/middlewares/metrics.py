@@ -0,0 +1,49 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from shared.core.metrics import MetricsRegistry, metrics
+
+# requests that matched no route share a label, their paths are unbounded
+UNMATCHED_ROUTE = "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Observes the latency of every HTTP request, until its last body chunk is
+    sent, labelled by the `name=` of the route that handled it
+    """
+
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry = metrics) -> None:
+        self.app = app
+        self.latency = registry.histogram(
+            "http_request_duration_seconds",
+            "Latency of the HTTP requests by route",
+            ("route", "method", "status"),
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # the router leaves the matched route in the scope
+            route = scope.get("route")
+            self.latency.observe(
+                time.perf_counter() - started,
+                getattr(route, "name", None) or UNMATCHED_ROUTE,
+                scope["method"],
+                str(status),
+            )
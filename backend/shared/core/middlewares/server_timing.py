@@ -0,0 +1,54 @@
+import time
+from contextvars import ContextVar
+from typing import Dict
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# the phases of the request being handled, only set while the middleware is on
+_timings: ContextVar[Dict[str, float] | None] = ContextVar("server_timing", default=None)
+
+
+def record_timing(name: str, seconds: float) -> None:
+    """
+    Adds `seconds` to the `name` phase ("db", "hash", "render") of the
+    current request, does nothing outside one or with Server-Timing off
+    """
+    timings = _timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+class ServerTimingMiddleware:
+    """
+    Returns in the Server-Timing header, shown by the browser devtools, how
+    long the request took until its response started and how much of it was
+    spent in each phase recorded with `record_timing`
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        timings: Dict[str, float] = {}
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                total = time.perf_counter() - started
+                phases = [*timings.items(), ("total", total)]
+                MutableHeaders(raw=message["headers"]).append(
+                    "Server-Timing",
+                    ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in phases),
+                )
+            await send(message)
+
+        token = _timings.set(timings)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _timings.reset(token)
@@ -1,19 +1,36 @@
 import time
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Header
 from fastapi.middleware.cors import CORSMiddleware
+from loguru import logger
+from starlette.responses import Response
 from shared.core import config
 from shared.core.handlers import create_start_app_handler, create_stop_app_handler
+from shared.core.logging_setup import setup_logging
+from shared.core.metrics import CONTENT_TYPE, authorized, metrics
+from shared.core.middlewares.compression import CompressionMiddleware
+from shared.core.middlewares.conditional_get import (
+    ETagMiddleware,
+    NotModified,
+    not_modified_handler,
+)
+from shared.core.middlewares.metrics import MetricsMiddleware
+from shared.core.middlewares.request_id import RequestIdMiddleware
+from shared.core.middlewares.server_timing import ServerTimingMiddleware
 from shared.core.routers import router
 from shared.utils.app_exceptions import AppExceptionCase, app_exception_handler
+from shared.utils.json_response import FastJSONResponse
 
 
 def get_application():
+    setup_logging()
+
     app = FastAPI(
         title=config.PROJECT_NAME,
         description=config.DESCRIPTION,
         version=config.VERSION,
         debug=config.DEBUG,
+        default_response_class=FastJSONResponse,
     )
 
     app.add_middleware(
@@ -24,6 +41,26 @@ def get_application():
         allow_headers=["*"],
     )
 
+    app.add_middleware(ETagMiddleware)
+
+    if config.SERVER_TIMING_ENABLED:
+        app.add_middleware(ServerTimingMiddleware)
+
+    if config.COMPRESSION_ENABLED:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=config.COMPRESSION_MINIMUM_SIZE,
+            content_types=config.COMPRESSION_CONTENT_TYPES,
+            gzip_level=config.COMPRESSION_GZIP_LEVEL,
+            brotli_quality=config.COMPRESSION_BROTLI_QUALITY,
+            brotli_enabled=config.COMPRESSION_BROTLI,
+        )
+
+    if config.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware)
+
+    app.add_middleware(RequestIdMiddleware)
+
     app.add_event_handler("startup", create_start_app_handler(app))
     app.add_event_handler("shutdown", create_stop_app_handler(app))
 
@@ -31,12 +68,26 @@ def get_application():
     async def custom_app_exception_handler(request, e):
         return await app_exception_handler(request, e)
 
+    @app.exception_handler(NotModified)
+    async def custom_not_modified_handler(request, e):
+        return await not_modified_handler(request, e)
+
     app.include_router(router, prefix=config.API_PREFIX)
 
     @app.get("/")
     def home():
         return {"message": "Bienvenido al backend del Sistema Demo de Desarrollo de APIs con Python"}
 
+    if config.METRICS_ENABLED and not str(config.METRICS_TOKEN):
+        logger.warning("METRICS_TOKEN no está configurado, /metrics no se publica")
+    elif config.METRICS_ENABLED:
+
+        @app.get("/metrics", include_in_schema=False)
+        def metrics_exposition(authorization: str | None = Header(None)):
+            if not authorized(authorization, str(config.METRICS_TOKEN)):
+                return Response(status_code=401, headers={"WWW-Authenticate": "Bearer"})
+            return Response(metrics.render(), media_type=CONTENT_TYPE)
+
     return app
 
 
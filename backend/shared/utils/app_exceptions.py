@@ -1,5 +1,6 @@
 from fastapi import Request
-from starlette.responses import JSONResponse
+
+from shared.utils.json_response import FastJSONResponse
 
 
 class AppExceptionCase(Exception):
@@ -16,7 +17,7 @@ class AppExceptionCase(Exception):
 
 
 async def app_exception_handler(request: Request, exc: AppExceptionCase):
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=exc.status_code,
         content={
             "app_exception": exc.exception_case,
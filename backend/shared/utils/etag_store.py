@@ -0,0 +1,71 @@
+import hashlib
+from typing import Dict
+from uuid import uuid4
+
+
+def weak_etag(value: str) -> str:
+    return f'W/"{value}"'
+
+
+def content_etag(content: bytes) -> str:
+    return weak_etag(hashlib.blake2b(content, digest_size=12).hexdigest())
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Weak comparison of `etag` with the tags of an If-None-Match header
+    """
+    if not if_none_match:
+        return False
+
+    opaque = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == opaque:
+            return True
+
+    return False
+
+
+class ETagStore:
+    """
+    Weak ETags derived from in-memory versions instead of the content, so a
+    conditional request is answered without reading the database.
+
+    A key keeps its tag until it is invalidated; `variant` tells apart the
+    representations of a key (the query of a list). The tags embed a per
+    process epoch, a restarted process or another worker never matches them.
+    When more than `maxsize` keys were invalidated they are all forgotten and
+    every tag changes.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.epoch = uuid4().hex[:8]
+        self._maxsize = maxsize
+        self._versions: Dict[str, int] = {}
+        self._base = 0
+        self._counter = 0
+
+    def tag(self, key: str, variant: str = "") -> str:
+        version = self._versions.get(key, self._base)
+        value = f"{self.epoch}-{version}"
+        if variant:
+            value += "-" + hashlib.blake2b(variant.encode(), digest_size=6).hexdigest()
+        return weak_etag(value)
+
+    def invalidate(self, *keys: str) -> None:
+        self._counter += 1
+        if len(self._versions) + len(keys) > self._maxsize:
+            self.clear()
+            return
+
+        for key in keys:
+            self._versions[key] = self._counter
+
+    def clear(self) -> None:
+        self._counter += 1
+        self._versions.clear()
+        self._base = self._counter
+
+    def __len__(self) -> int:
+        return len(self._versions)
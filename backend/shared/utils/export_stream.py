@@ -0,0 +1,85 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Mapping, Sequence
+
+from starlette.responses import StreamingResponse
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return json.dumps(value, default=_default)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+async def _ndjson_chunks(
+    records: AsyncIterator[Mapping], columns: Sequence[str], chunk_rows: int
+) -> AsyncIterator[bytes]:
+    lines = []
+    async for record in records:
+        row = {column: record[column] for column in columns}
+        lines.append(json.dumps(row, default=_default, ensure_ascii=False))
+        if len(lines) >= chunk_rows:
+            yield ("\n".join(lines) + "\n").encode()
+            lines = []
+
+    if lines:
+        yield ("\n".join(lines) + "\n").encode()
+
+
+async def _csv_chunks(
+    records: AsyncIterator[Mapping], columns: Sequence[str], chunk_rows: int
+) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+
+    rows = 0
+    async for record in records:
+        writer.writerow([_csv_value(record[column]) for column in columns])
+        rows += 1
+        if rows >= chunk_rows:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+            rows = 0
+
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def export_response(
+    records: AsyncIterator[Mapping],
+    columns: Sequence[str],
+    format: str,
+    filename: str,
+    chunk_rows: int = 500,
+) -> StreamingResponse:
+    """
+    Streams `records` as NDJSON or CSV, `chunk_rows` rows per write. The
+    records are pulled as the client reads, so memory does not grow with the
+    number of rows exported.
+    """
+    chunks = _csv_chunks if format == "csv" else _ndjson_chunks
+
+    return StreamingResponse(
+        chunks(records, columns, chunk_rows),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{format}"'},
+    )
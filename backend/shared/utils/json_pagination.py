@@ -0,0 +1,69 @@
+import re
+from datetime import datetime
+from typing import Type
+
+from pydantic import BaseModel
+
+
+def json_timestamp(column: str) -> str:
+    """
+    Formats a timestamptz column like datetime.isoformat does for the UTC
+    datetimes asyncpg returns, without the fraction when it is zero
+    """
+    utc = f"{column} AT TIME ZONE 'UTC'"
+    return f"""CASE
+            WHEN CAST(date_part('microseconds', {column}) AS integer) % 1000000 = 0
+            THEN to_char({utc}, 'YYYY-MM-DD"T"HH24:MI:SS"+00:00"')
+            ELSE to_char({utc}, 'YYYY-MM-DD"T"HH24:MI:SS.US"+00:00"')
+        END"""
+
+
+def _page_sort(sort: str) -> str:
+    # the sort of the page over the columns of the CTE, page.id breaks the ties
+    columns = re.sub(r"\b\w+\.(\w+)\b", r"page.\1", sort.strip().rstrip(";"))
+    columns = re.sub(r"^ORDER\s+BY\s+", "", columns, flags=re.IGNORECASE)
+    return ", ".join(column for column in (columns, "page.id") if column)
+
+
+def paginated_json_query(page: str, count: str, schema: Type[BaseModel], sort: str) -> str:
+    """
+    Wraps the `page` query so Postgres returns the short_pagination_aps
+    response as JSON text, every row of the page rendered with the fields of
+    `schema`, or an empty list when nothing matches.
+
+    `page` must be limited and select a total_count window column, `count` is
+    only run to get the total when the page is past the end. `sort` is the
+    ORDER BY of the page, its columns must be selected under their own name:
+    an aggregate does not keep the order of the rows it reads, so the rows
+    are aggregated sorted again. Besides the page values it takes :page_size,
+    :page_end (the last position of the page) and the :next and :previous
+    links.
+    """
+    fields = []
+    for name, field in schema.__fields__.items():
+        value = json_timestamp(f"page.{name}") if field.type_ is datetime else f"page.{name}"
+        fields.append(f"'{name}', {value}")
+
+    return f"""
+    WITH page AS ({page.strip().rstrip(";")}),
+    total AS (
+        SELECT COALESCE((SELECT total_count FROM page LIMIT 1), ({count})) AS total
+    )
+    SELECT CAST(CASE WHEN total.total = 0 THEN CAST('[]' AS json) ELSE json_build_object(
+        'data', (
+            SELECT COALESCE(
+                json_agg(json_build_object({", ".join(fields)}) ORDER BY {_page_sort(sort)}),
+                CAST('[]' AS json)
+            )
+            FROM page
+        ),
+        'total', total.total,
+        'count', CAST(:page_size AS integer),
+        'pages', CAST(ceil(total.total / CAST(:page_size AS numeric)) AS integer),
+        'pagination', json_build_object(
+            'next', CASE WHEN CAST(:page_end AS bigint) < total.total THEN CAST(:next AS text) END,
+            'previous', CAST(:previous AS text)
+        )
+    ) END AS text)
+    FROM total;
+    """
@@ -0,0 +1,54 @@
+import json
+import time
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+
+from shared.core.middlewares.server_timing import record_timing
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    # orjson serializes the UUIDs and datetimes of the model itself
+    if orjson is not None and isinstance(value, BaseModel):
+        return value.dict()
+    return jsonable_encoder(value)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with orjson when it is installed, which serializes
+    UUIDs, datetimes and the dicts of pydantic models natively, and with the
+    standard json module otherwise. Any other value goes through
+    jsonable_encoder.
+
+    The time spent here is the "render" Server-Timing phase. It leaves out the
+    validation and jsonable_encoder run by FastAPI for a `response_model`
+    before the response is created, which count in no phase.
+    """
+
+    def render(self, content: Any) -> bytes:
+        started = time.perf_counter()
+        try:
+            return self._dumps(content)
+        finally:
+            record_timing("render", time.perf_counter() - started)
+
+    def _dumps(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+        return json.dumps(
+            content,
+            default=_default,
+            ensure_ascii=False,
+            allow_nan=False,
+            indent=None,
+            separators=(",", ":"),
+        ).encode("utf-8")
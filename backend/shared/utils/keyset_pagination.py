@@ -0,0 +1,91 @@
+import base64
+import binascii
+import json
+from typing import Any, Callable, Dict, List
+from uuid import UUID
+
+CURSOR_FIELDS = ("order", "direction", "search", "key", "id", "before")
+
+
+def encode_cursor(
+    order: str | None,
+    direction: str | None,
+    search: str | None,
+    key: Any,
+    id: UUID,
+    before: bool = False,
+) -> str:
+    payload = {
+        "order": order,
+        "direction": direction,
+        "search": search,
+        "key": key,
+        "id": str(id),
+        "before": before,
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, key_type: Callable[[str | None], type] | None = None) -> Dict:
+    """
+    Decodes an opaque cursor created by `encode_cursor`. An empty cursor
+    means the first page and decodes to an empty dict. `key_type` gives the
+    type of the sort column of an order, a key of another type would only
+    fail in the database.
+
+    Raises:
+        ValueError: the cursor was not created by `encode_cursor`
+    """
+    if not cursor:
+        return {}
+
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"invalid cursor: {e}")
+
+    if not isinstance(payload, dict) or any(field not in payload for field in CURSOR_FIELDS):
+        raise ValueError("invalid cursor: missing fields")
+
+    for field in ("order", "direction", "search"):
+        if not isinstance(payload[field], (str, type(None))):
+            raise ValueError(f"invalid cursor: {field}")
+
+    if not isinstance(payload["key"], (str, bool, int, float)):
+        raise ValueError("invalid cursor: key")
+
+    # exact types, a bool is an int too
+    if key_type is not None and type(payload["key"]) is not key_type(payload["order"]):
+        raise ValueError("invalid cursor: key does not match the order")
+
+    if not isinstance(payload["before"], bool):
+        raise ValueError("invalid cursor: before")
+
+    payload["id"] = UUID(str(payload["id"]))
+    return payload
+
+
+def keyset_pagination(
+    data_list: List,
+    page_size: int,
+    next_cursor: str | None,
+    previous_cursor: str | None,
+    route: str,
+) -> Dict:
+    response = {
+        "data": data_list,
+        "count": page_size,
+        "pagination": {"next": None, "previous": None},
+    }
+
+    if next_cursor:
+        response["pagination"]["next"] = f"{route}?cursor={next_cursor}&page_size={page_size}"
+
+    if previous_cursor:
+        response["pagination"][
+            "previous"
+        ] = f"{route}?cursor={previous_cursor}&page_size={page_size}"
+
+    return response
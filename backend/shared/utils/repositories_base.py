@@ -1,16 +1,19 @@
 import abc
 import uuid
 from datetime import datetime
-from typing import Dict, List, Mapping
+from typing import Any, Dict, Iterable, List, Type, TypeVar, overload
 
 import pytz
 import sqlalchemy
 from databases import Database
 from fastapi import FastAPI
 from loguru import logger
+from pydantic import BaseModel
 from modules.users.users.user_schemas import UserInDB
 from shared.core.db.db_base import database
-from shared.utils.schemas_base import BaseSchema
+from shared.utils.schemas_base import BaseSchema, DateTimeModelMixin, default_datetime
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
 
 
 class BaseRepository(abc.ABC):
@@ -28,6 +31,45 @@ class BaseRepository(abc.ABC):
     def _schema_in(self):
         pass
 
+    @overload
+    def _from_record(self, record: Any) -> Any:
+        ...
+
+    @overload
+    def _from_record(self, record: Any, schema: Type[ModelT]) -> ModelT:
+        ...
+
+    def _from_record(self, record: Any, schema: Type[BaseModel] | None = None) -> Any:
+        """
+        Builds `schema` (the repository output schema by default) from a row
+        without validating it, the values come from our own tables and are
+        already of the declared types. Columns the schema does not declare are
+        left out. The only validator that changes a value, the current date of
+        a NULL created_at / updated_at, is applied here.
+        """
+        schema = schema or self._schema_out
+        values = dict(record)
+        fields = {name: values[name] for name in schema.__fields__ if name in values}
+        if issubclass(schema, DateTimeModelMixin):
+            for name in ("created_at", "updated_at"):
+                if name in fields:
+                    fields[name] = default_datetime(fields[name])
+        return schema.construct(**fields)
+
+    @overload
+    def _from_records(self, records: Iterable[Any]) -> List[Any]:
+        ...
+
+    @overload
+    def _from_records(self, records: Iterable[Any], schema: Type[ModelT]) -> List[ModelT]:
+        ...
+
+    def _from_records(
+        self, records: Iterable[Any], schema: Type[BaseModel] | None = None
+    ) -> List[Any]:
+        schema = schema or self._schema_out
+        return [self._from_record(record, schema) for record in records]
+
     @staticmethod
     def generate_uuid() -> uuid.UUID:
         return uuid.uuid4()
@@ -11,6 +11,11 @@ class BaseSchema(BaseModel):
         orm_mode = True
 
 
+def default_datetime(value: datetime | None) -> datetime:
+    # the date of a row that has none, NULL timestamps are returned as the current one
+    return value or datetime.now(pytz.timezone("America/Caracas"))
+
+
 # for locale see: https://www.geeksforgeeks.org/how-to-make-a-timezone-aware-datetime-object-in-python/
 class DateTimeModelMixin(BaseModel):
     created_at: None | datetime
@@ -18,7 +23,7 @@ class DateTimeModelMixin(BaseModel):
 
     @validator("created_at", "updated_at", pre=True)
     def default_datetime(cls, value: datetime) -> datetime:
-        return value or datetime.now(pytz.timezone("America/Caracas"))
+        return default_datetime(value)
 
 
 class IDModelMixin(BaseModel):
@@ -1,4 +1,4 @@
-import inspect
+import sys
 from loguru import logger
 
 from shared.utils.app_exceptions import AppExceptionCase
@@ -33,15 +33,20 @@ class ServiceResult(object):
         pass
 
 
-def caller_info() -> str:
-    info = inspect.getframeinfo(inspect.stack()[2][0])
-    return f"{info.filename}:{info.function}:{info.lineno}"
+def caller_info(depth: int = 2) -> str:
+    # only the frame asked for is read, inspect.stack() would read the source of every frame
+    frame = sys._getframe(depth)
+    return f"{frame.f_code.co_filename}:{frame.f_code.co_name}:{frame.f_lineno}"
 
 
 def handle_result(result: ServiceResult):
     if not result.success:
         with result as exception:
-            logger.error(f"{exception} | caller={caller_info()}")
+            # client errors repeat under attack (invalid logins, ...) and are sampled by case
+            sample = exception.exception_case if exception.status_code < 500 else None
+            logger.bind(sample=sample).opt(depth=1).error(
+                "{} | caller={}", exception, caller_info()
+            )
             raise exception
     with result as result:
         return result
@@ -40,37 +40,28 @@ def short_pagination(page_num: int, page_size: int, data_list: List, route: str)
 
 
 def short_pagination_aps(
-    page_num: int, page_size: int, data_list: List, total_pages: List, route: str
+    page_num: int, page_size: int, data_list: List, total: int, route: str
 ) -> Dict:
-    start = (page_num - 1) * page_size
-    end = start + page_size
-    total = str(total_pages[0]).split(sep="=")
-    total = total[1]
-    pages = math.ceil(int(total) / page_size)
+    """
+    Builds the paginated response for a page that was already sliced by the
+    database, `total` being the number of rows matching the whole query
+    """
+    end = page_num * page_size
+    pages = math.ceil(total / page_size)
     response = {
         "data": data_list,
-        "total": int(total),
+        "total": total,
         "count": page_size,
         "pages": pages,
-        "pagination": {},
+        "pagination": {"next": None, "previous": None},
     }
 
-    if end >= pages:
-        response["pagination"]["next"] = None
-        if page_num > 1:
-            response["pagination"][
-                "previous"
-            ] = f"{route}?page_number={page_num-1}&page_size{page_size}"
-        else:
-            response["pagination"]["previous"] = None
-    else:
-        if page_num > 1:
-            response["pagination"][
-                "previous"
-            ] = f"{route}?page_number={page_num-1}&page_size{page_size}"
-        else:
-            response["pagination"]["previous"] = None
+    if end < total:
+        response["pagination"]["next"] = f"{route}?page_number={page_num+1}&page_size={page_size}"
 
-        response["pagination"]["next"] = f"{route}?page_number={page_num+1}&page_size{page_size}"
+    if page_num > 1:
+        response["pagination"][
+            "previous"
+        ] = f"{route}?page_number={page_num-1}&page_size={page_size}"
 
     return response
@@ -0,0 +1,59 @@
+import csv
+import io
+import json
+from typing import Dict, List, Tuple
+
+CSV_CONTENT_TYPES = ("text/csv", "application/csv")
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+def read_rows(
+    content: bytes, filename: str | None, content_type: str | None
+) -> List[Tuple[int, Dict]]:
+    """
+    Returns the (row number, values) pairs of an uploaded CSV (with a header
+    line) or NDJSON file, empty CSV values are left out so defaults apply.
+    Raises ValueError when the file can not be read.
+    """
+    filename = (filename or "").lower()
+    content_type = (content_type or "").split(";")[0].strip().lower()
+
+    try:
+        text = content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise ValueError("el archivo debe estar codificado en UTF-8")
+
+    if filename.endswith((".ndjson", ".jsonl")) or content_type in NDJSON_CONTENT_TYPES:
+        return _read_ndjson(text)
+    if filename.endswith(".csv") or content_type in CSV_CONTENT_TYPES:
+        return _read_csv(text)
+
+    raise ValueError("el archivo debe ser CSV o NDJSON")
+
+
+def _read_csv(text: str) -> List[Tuple[int, Dict]]:
+    reader = csv.DictReader(io.StringIO(text))
+    if not reader.fieldnames:
+        return []
+
+    # the header is line 1, rows are numbered as they appear in the file
+    return [
+        (row_number, {key: value for key, value in row.items() if key and value != ""})
+        for row_number, row in enumerate(reader, start=2)
+    ]
+
+
+def _read_ndjson(text: str) -> List[Tuple[int, Dict]]:
+    rows = []
+    for row_number, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            raise ValueError(f"JSON inválido en la línea {row_number}")
+        if not isinstance(row, dict):
+            raise ValueError(f"la línea {row_number} no es un objeto JSON")
+        rows.append((row_number, row))
+
+    return rows
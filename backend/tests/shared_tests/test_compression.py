@@ -0,0 +1,115 @@
+import gzip
+
+import pytest
+from httpx import AsyncClient
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from shared.core.middlewares.compression import CompressionMiddleware, accepted_encodings
+
+ROWS = [{"id": n, "created_by": "Administrador del sistema"} for n in range(100)]
+
+
+async def rows(request):
+    return JSONResponse(ROWS)
+
+
+async def small(request):
+    return JSONResponse({"id": 1})
+
+
+async def image(request):
+    return Response(b"x" * 4096, media_type="image/png")
+
+
+async def encoded(request):
+    return Response(
+        gzip.compress(b"x" * 4096),
+        media_type="application/json",
+        headers={"Content-Encoding": "gzip"},
+    )
+
+
+async def stream(request):
+    async def lines():
+        for n in range(100):
+            yield f'{{"id": {n}, "created_by": "Administrador del sistema"}}\n'.encode()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@pytest.fixture
+def client() -> AsyncClient:
+    app = Starlette(
+        routes=[
+            Route("/rows", rows),
+            Route("/small", small),
+            Route("/image", image),
+            Route("/encoded", encoded),
+            Route("/stream", stream),
+        ]
+    )
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=500,
+        content_types=["application/json", "application/x-ndjson"],
+        brotli_enabled=False,
+    )
+    return AsyncClient(app=app, base_url="http://test", headers={"Accept-Encoding": "gzip"})
+
+
+@pytest.mark.asyncio
+class TestCompressionMiddleware:
+    async def test_large_json_is_gzipped(self, client: AsyncClient) -> None:
+        async with client:
+            res = await client.get("/rows")
+
+        assert res.headers["content-encoding"] == "gzip"
+        assert res.headers["vary"] == "Accept-Encoding"
+        assert int(res.headers["content-length"]) < len(res.content)
+        assert res.json() == ROWS
+
+    async def test_small_and_other_responses_are_not_compressed(self, client: AsyncClient) -> None:
+        async with client:
+            small = await client.get("/small")
+            image = await client.get("/image")
+            identity = await client.get("/rows", headers={"Accept-Encoding": "gzip;q=0"})
+
+        assert "content-encoding" not in small.headers
+        assert small.headers["vary"] == "Accept-Encoding"
+        assert "content-encoding" not in image.headers
+        assert "vary" not in image.headers
+        assert "content-encoding" not in identity.headers
+        assert identity.json() == ROWS
+
+    async def test_already_encoded_response_is_untouched(self, client: AsyncClient) -> None:
+        async with client:
+            res = await client.get("/encoded")
+
+        assert res.headers["content-encoding"] == "gzip"
+        assert res.content == b"x" * 4096
+
+    async def test_streamed_body_is_compressed_chunk_by_chunk(self, client: AsyncClient) -> None:
+        async with client:
+            res = await client.get("/stream")
+
+        assert res.headers["content-encoding"] == "gzip"
+        assert "content-length" not in res.headers
+        assert len(res.text.splitlines()) == 100
+
+
+def test_accepted_encodings_reads_qualities() -> None:
+    assert accepted_encodings("gzip;q=0.5, br, identity;q=0") == {
+        "gzip": 0.5,
+        "br": 1.0,
+        "identity": 0.0,
+    }
+
+
+def test_brotli_is_preferred_when_installed() -> None:
+    pytest.importorskip("brotli")
+    middleware = CompressionMiddleware(app=None)
+
+    assert middleware.select_encoding("gzip, br") == "br"
+    assert middleware.select_encoding("gzip, br;q=0") == "gzip"
@@ -0,0 +1,26 @@
+import json
+
+from shared.core.db.db_notifications import ORIGIN, InvalidationListener, dispatch, subscribe
+
+
+class TestInvalidationListener:
+    def test_notifications_from_other_workers_are_dispatched(self) -> None:
+        evicted = []
+        subscribe("test", evicted.append)
+        listener = InvalidationListener(channel="test", retry_interval=1)
+
+        for origin, key in ((ORIGIN, "own"), ("another-worker", "foreign")):
+            payload = json.dumps({"origin": origin, "kind": "test", "key": key})
+            listener._on_notification(None, 0, "test", payload)
+        listener._on_notification(None, 0, "test", "not json")
+
+        assert evicted == ["foreign"]
+
+    def test_failing_handler_does_not_stop_dispatch(self) -> None:
+        evicted = []
+        subscribe("failing", lambda key: 1 / 0)
+        subscribe("failing", evicted.append)
+
+        dispatch("failing", "key")
+
+        assert evicted == ["key"]
@@ -0,0 +1,99 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+from fastapi import Depends, FastAPI, Request
+from httpx import AsyncClient
+from loguru import logger
+
+from shared.core import config
+from shared.core.db.db_dependencies import get_database
+from shared.core.db.db_pool import DatabaseExceptions
+from shared.core.db.db_request import RequestDatabase, redact
+
+GET_ITEM = "SELECT id FROM items WHERE id = :id;"
+
+
+class FakeDatabase:
+    def __init__(self, delay: float = 0) -> None:
+        self.delay = delay
+
+    async def fetch_one(self, query: str, values: dict | None = None) -> dict:
+        await asyncio.sleep(self.delay)
+        return {"id": 1}
+
+    def transaction(self) -> str:
+        return "transaction"
+
+
+def test_redact_keeps_only_scalars() -> None:
+    id = uuid4()
+    values = {"limit": 10, "active": True, "password": "secreto", "id": id, "next": None}
+    assert redact(values) == {
+        "limit": 10,
+        "active": True,
+        "password": "<str>",
+        "id": "<UUID>",
+        "next": None,
+    }
+
+
+@pytest.mark.asyncio
+class TestRequestDatabase:
+    async def test_queries_are_counted_by_statement(self) -> None:
+        db = RequestDatabase(FakeDatabase(), "items:get-item")
+        await db.fetch_one(GET_ITEM, {"id": 1})
+        await db.fetch_one("UPDATE items SET name = :name;", {"name": "x"})
+
+        assert db.count == 2
+        assert db.duration > 0
+        assert sum(db.statements.values()) == 2
+        assert db.transaction() == "transaction"
+
+    async def test_slow_queries_are_logged_redacted(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(config, "DB_SLOW_QUERY_MS", 1)
+        messages = []
+        sink = logger.add(messages.append, level="WARNING")
+        try:
+            db = RequestDatabase(FakeDatabase(delay=0.005), "items:get-item")
+            await db.fetch_one(GET_ITEM, {"id": 1, "email": "pepe@prueba.com"})
+        finally:
+            logger.remove(sink)
+
+        assert len(messages) == 1
+        assert "items:get-item" in messages[0]
+        assert "'email': '<str>'" in messages[0]
+        assert "pepe@prueba.com" not in messages[0]
+
+    async def test_budget_fails_while_testing(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(config, "DB_QUERY_BUDGET", 2)
+        monkeypatch.setenv("TESTING", "1")
+        db = RequestDatabase(FakeDatabase(), "items:items-list")
+        await db.fetch_one(GET_ITEM)
+        await db.fetch_one(GET_ITEM)
+
+        with pytest.raises(DatabaseExceptions.QueryBudgetExceededException):
+            await db.fetch_one(GET_ITEM)
+
+        monkeypatch.delenv("TESTING")
+        db = RequestDatabase(FakeDatabase(), "items:items-list")
+        for _ in range(3):
+            await db.fetch_one(GET_ITEM)
+        assert db.count == 3
+
+    async def test_dependencies_of_a_request_share_it(self) -> None:
+        async def count_query(db=Depends(get_database)) -> None:
+            await db.fetch_one(GET_ITEM)
+
+        app = FastAPI()
+        app.state._db = FakeDatabase()
+
+        @app.get("/items", name="items:items-list", dependencies=[Depends(count_query)])
+        async def items_list(request: Request, db=Depends(get_database)):
+            await db.fetch_one(GET_ITEM)
+            return {"route": db.route, "count": request.state.db.count}
+
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            res = await client.get("/items")
+
+        assert res.json() == {"route": "items:items-list", "count": 2}
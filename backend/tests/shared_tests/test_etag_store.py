@@ -0,0 +1,80 @@
+import pytest
+from fastapi import Depends, FastAPI, Request
+from httpx import AsyncClient
+from starlette.responses import Response
+
+from shared.core.middlewares.conditional_get import (
+    ETagMiddleware,
+    NotModified,
+    not_modified_handler,
+)
+from shared.utils.etag_store import ETagStore, etag_matches
+
+
+class TestETagStore:
+    def test_tag_changes_only_for_invalidated_keys(self) -> None:
+        store = ETagStore(maxsize=10)
+        user, users = store.tag("user:1"), store.tag("users", "page_size=1")
+
+        store.invalidate("user:1")
+
+        assert store.tag("user:1") != user
+        assert store.tag("users", "page_size=1") == users
+        assert store.tag("users", "page_size=2") != users
+
+    def test_clear_and_overflow_change_every_tag(self) -> None:
+        store = ETagStore(maxsize=2)
+        tag = store.tag("role:1")
+
+        store.invalidate("user:1", "user:2")
+        assert store.tag("role:1") == tag
+        store.invalidate("user:3")
+        assert store.tag("role:1") != tag
+        assert len(store) == 0
+
+        tag = store.tag("role:1")
+        store.clear()
+        assert store.tag("role:1") != tag
+
+    def test_tags_of_another_process_never_match(self) -> None:
+        assert ETagStore(maxsize=10).tag("users") != ETagStore(maxsize=10).tag("users")
+
+    def test_etag_matches_weakly(self) -> None:
+        assert etag_matches('"a", W/"b"', 'W/"b"')
+        assert etag_matches('"b"', 'W/"b"')
+        assert etag_matches("*", 'W/"b"')
+        assert not etag_matches('W/"a"', 'W/"b"')
+        assert not etag_matches(None, 'W/"b"')
+
+
+@pytest.mark.asyncio
+class TestConditionalGet:
+    async def test_matching_request_gets_304_and_others_the_etag(self) -> None:
+        def etag(request: Request) -> str:
+            request.state.etag = 'W/"v1"'
+            if etag_matches(request.headers.get("if-none-match"), 'W/"v1"'):
+                raise NotModified('W/"v1"')
+
+        app = FastAPI()
+        app.add_middleware(ETagMiddleware)
+        app.add_exception_handler(NotModified, not_modified_handler)
+
+        @app.get("/json", dependencies=[Depends(etag)])
+        async def json_route():
+            return {"id": 1}
+
+        @app.get("/raw", dependencies=[Depends(etag)])
+        async def raw_route():
+            return Response(b'{"id": 1}', media_type="application/json")
+
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            for url in ("/json", "/raw"):
+                res = await client.get(url)
+                assert res.status_code == 200
+                assert res.headers["etag"] == 'W/"v1"'
+                assert res.headers["cache-control"] == "private, no-cache"
+
+                res = await client.get(url, headers={"If-None-Match": 'W/"v1"'})
+                assert res.status_code == 304
+                assert res.headers["etag"] == 'W/"v1"'
+                assert res.content == b""
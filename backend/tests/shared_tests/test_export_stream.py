@@ -0,0 +1,49 @@
+import json
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+
+from shared.utils.export_stream import export_response
+
+
+pytestmark = pytest.mark.asyncio
+
+ROWS = [
+    {"id": uuid4(), "role": "admin", "permissions": ["users:users_list"], "updated_at": None},
+    {"id": uuid4(), "role": "ventas", "permissions": [], "updated_at": datetime(2023, 1, 2, 3, 4)},
+    {"id": uuid4(), "role": "soporte", "permissions": None, "updated_at": None},
+]
+COLUMNS = ("id", "role", "permissions", "updated_at")
+
+
+async def records():
+    for row in ROWS:
+        yield {**row, "password": "never exported"}
+
+
+async def read_body(response) -> str:
+    return b"".join([chunk async for chunk in response.body_iterator]).decode()
+
+
+class TestExportResponse:
+    async def test_ndjson_export(self) -> None:
+        response = export_response(records(), COLUMNS, "ndjson", "roles", chunk_rows=2)
+        lines = (await read_body(response)).splitlines()
+
+        assert response.media_type == "application/x-ndjson"
+        assert 'filename="roles.ndjson"' in response.headers["content-disposition"]
+        assert [json.loads(line) for line in lines] == [
+            {**row, "id": str(row["id"]), "updated_at": row["updated_at"] and "2023-01-02T03:04:00"}
+            for row in ROWS
+        ]
+
+    async def test_csv_export(self) -> None:
+        response = export_response(records(), COLUMNS, "csv", "roles", chunk_rows=2)
+        lines = (await read_body(response)).splitlines()
+
+        assert lines[0] == "id,role,permissions,updated_at"
+        assert lines[1] == f'{ROWS[0]["id"]},admin,"[""users:users_list""]",'
+        assert lines[2] == f"{ROWS[1]['id']},ventas,[],2023-01-02T03:04:00"
+        assert lines[3] == f"{ROWS[2]['id']},soporte,,"
+        assert "never exported" not in "\n".join(lines)
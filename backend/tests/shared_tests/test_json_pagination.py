@@ -0,0 +1,44 @@
+import pytest
+
+from modules.users.roles.role_schemas import RoleOut
+from modules.users.roles.role_sqlsentences import (
+    COUNT_ROLES_LIST,
+    GET_ROLES_LIST_PAGE,
+    role_list_sort,
+)
+from modules.users.users.user_schemas import UserOut
+from modules.users.users.user_sqlstaments import (
+    COUNT_USERS_LIST,
+    GET_USERS_LIST,
+    user_list_complements,
+    user_list_pagination,
+)
+from shared.utils.json_pagination import paginated_json_query
+
+
+def test_rows_are_aggregated_in_the_order_of_the_page() -> None:
+    sort = user_list_complements("rol", "DESC")
+    query = paginated_json_query(
+        GET_USERS_LIST + sort + user_list_pagination(), COUNT_USERS_LIST, UserOut, sort
+    )
+
+    assert "ORDER BY page.role DESC, page.id DESC, page.id)" in query
+
+
+@pytest.mark.parametrize(
+    "order, direction, page_sort, aggregate_sort",
+    (
+        ("role", "DESC", "ro.role DESC, ro.id DESC", "page.role DESC, page.id DESC, page.id"),
+        ("unknown", None, "ro.id ASC", "page.id ASC, page.id"),
+        (None, "DESC", "ro.id ASC", "page.id ASC, page.id"),
+    ),
+)
+def test_roles_pages_are_sorted_by_id_whatever_the_order(
+    order: str | None, direction: str | None, page_sort: str, aggregate_sort: str
+) -> None:
+    sort = role_list_sort(order, direction).rstrip(";")
+    page = GET_ROLES_LIST_PAGE + sort + " LIMIT :limit OFFSET :offset"
+    query = paginated_json_query(page, COUNT_ROLES_LIST, RoleOut, sort)
+
+    assert f"ORDER BY {page_sort} LIMIT :limit OFFSET :offset" in query
+    assert f"ORDER BY {aggregate_sort})" in query
@@ -0,0 +1,39 @@
+import json
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import JSONResponse
+
+from modules.users.roles.role_schemas import RoleOut
+from shared.utils import json_response
+from shared.utils.json_response import FastJSONResponse
+
+
+@pytest.fixture
+def payload() -> dict:
+    role = RoleOut(
+        id=uuid4(),
+        role="ádmin",
+        permissions=["users:users_list"],
+        is_active=True,
+        created_at=datetime(2023, 2, 1, 10, 30, 15, 120, tzinfo=timezone.utc),
+        updated_at=datetime(2023, 2, 1, 10, 30, tzinfo=timezone.utc),
+    )
+    return {"data": [role], "total": 1, "pagination": {"next": None}}
+
+
+class TestFastJSONResponse:
+    def test_renders_like_json_response(self, payload: dict) -> None:
+        expected = JSONResponse(jsonable_encoder(payload)).body
+
+        assert json.loads(FastJSONResponse(payload).body) == json.loads(expected)
+        assert FastJSONResponse(jsonable_encoder(payload)).body == expected
+
+    def test_falls_back_to_the_json_module(
+        self, payload: dict, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(json_response, "orjson", None)
+
+        assert FastJSONResponse(payload).body == JSONResponse(jsonable_encoder(payload)).body
@@ -0,0 +1,79 @@
+import base64
+import json
+import pytest
+from uuid import uuid4
+
+from modules.users.users.user_sqlstaments import user_list_sort_type
+from shared.utils.keyset_pagination import decode_cursor, encode_cursor, keyset_pagination
+
+
+class TestCursor:
+    @pytest.mark.parametrize("key", ("pepeboveda", True, False))
+    def test_cursor_round_trip(self, key) -> None:
+        id = uuid4()
+        cursor = encode_cursor("username", "DESC", "pepe", key, id, before=True)
+
+        assert "=" not in cursor
+        assert decode_cursor(cursor) == {
+            "order": "username",
+            "direction": "DESC",
+            "search": "pepe",
+            "key": key,
+            "id": id,
+            "before": True,
+        }
+
+    def test_empty_cursor_is_first_page(self) -> None:
+        assert decode_cursor("") == {}
+
+    @pytest.mark.parametrize(
+        "cursor",
+        ("abc", "e30", "%%%", encode_cursor(None, None, None, "a", uuid4())[:-4]),
+    )
+    def test_invalid_cursor_raises_value_error(self, cursor: str) -> None:
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
+
+    @pytest.mark.parametrize(
+        "order, search, key",
+        (("status", None, "pepeboveda"), ("username", None, True), ("email", None, 3)),
+    )
+    def test_key_of_another_type_than_its_column_is_invalid(self, order, search, key) -> None:
+        cursor = encode_cursor(order, "ASC", search, key, uuid4())
+
+        with pytest.raises(ValueError):
+            decode_cursor(cursor, user_list_sort_type)
+
+    def test_forged_fields_are_invalid(self) -> None:
+        payload = {
+            "order": "username",
+            "direction": "ASC",
+            "search": ["pepe"],
+            "key": "pepe",
+            "id": str(uuid4()),
+            "before": False,
+        }
+        cursor = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+        with pytest.raises(ValueError):
+            decode_cursor(cursor, user_list_sort_type)
+
+    def test_key_of_the_type_of_its_column_is_valid(self) -> None:
+        cursor = encode_cursor("status", "ASC", None, False, uuid4())
+
+        assert decode_cursor(cursor, user_list_sort_type)["key"] is False
+
+
+class TestKeysetPagination:
+    def test_links_carry_cursor_and_page_size(self) -> None:
+        response = keyset_pagination(
+            data_list=[1, 2],
+            page_size=2,
+            next_cursor="abc",
+            previous_cursor=None,
+            route="/api/v1/users",
+        )
+
+        assert response["data"] == [1, 2]
+        assert response["pagination"]["next"] == "/api/v1/users?cursor=abc&page_size=2"
+        assert response["pagination"]["previous"] is None
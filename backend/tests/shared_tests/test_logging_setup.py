@@ -0,0 +1,57 @@
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from loguru import logger
+
+from shared.core.logging_setup import LogSampler
+from shared.core.middlewares.request_id import RequestIdMiddleware
+
+
+def record(sample: str | None = None) -> dict:
+    return {"extra": {"sample": sample} if sample else {}}
+
+
+def test_sampler_lets_a_burst_per_key_and_window_through(monkeypatch) -> None:
+    now = [100.0]
+    monkeypatch.setattr("shared.core.logging_setup.time.monotonic", lambda: now[0])
+    sampler = LogSampler(burst=2, window=60)
+
+    assert [sampler(record("invalid_login")) for _ in range(5)] == [True, True, False, False, False]
+    assert sampler(record("UserNotFoundException"))
+    assert all(sampler(record()) for _ in range(5))
+
+    now[0] += 60
+    first = record("invalid_login")
+    assert sampler(first)
+    assert first["extra"]["dropped"] == 3
+
+
+@pytest.mark.asyncio
+class TestRequestIdMiddleware:
+    async def test_logs_of_a_request_carry_its_id(self) -> None:
+        app = FastAPI()
+        app.add_middleware(RequestIdMiddleware)
+
+        @app.get("/")
+        async def home():
+            logger.info("home")
+            return {}
+
+        request_ids = []
+        sink = logger.add(lambda message: request_ids.append(message.record["extra"]["request_id"]))
+        try:
+            async with AsyncClient(app=app, base_url="http://test") as client:
+                given = await client.get("/", headers={"X-Request-ID": "proxy-id.1"})
+                generated = await client.get("/")
+                invalid = await client.get("/", headers={"X-Request-ID": "a b\nc"})
+        finally:
+            logger.remove(sink)
+
+        assert given.headers["x-request-id"] == "proxy-id.1"
+        assert len(generated.headers["x-request-id"]) == 32
+        assert invalid.headers["x-request-id"] != "a b\nc"
+        assert request_ids == [
+            "proxy-id.1",
+            generated.headers["x-request-id"],
+            invalid.headers["x-request-id"],
+        ]
@@ -0,0 +1,94 @@
+import types
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from shared.core.db.db_metrics import StatementNames
+from shared.core.metrics import MetricsRegistry, authorized
+from shared.core.middlewares.metrics import MetricsMiddleware
+
+
+class TestMetricsRegistry:
+    def test_histogram_buckets_are_cumulative(self) -> None:
+        registry = MetricsRegistry()
+        latency = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1))
+        for value in (0.05, 0.5, 0.5, 3):
+            latency.observe(value, "users:users_list")
+
+        lines = registry.render().splitlines()
+        assert lines[:2] == ["# HELP latency_seconds Latency", "# TYPE latency_seconds histogram"]
+        assert lines[2:] == [
+            'latency_seconds_bucket{route="users:users_list",le="0.1"} 1',
+            'latency_seconds_bucket{route="users:users_list",le="1"} 3',
+            'latency_seconds_bucket{route="users:users_list",le="+Inf"} 4',
+            'latency_seconds_sum{route="users:users_list"} 4.05',
+            'latency_seconds_count{route="users:users_list"} 4',
+        ]
+
+    def test_collectors_run_on_render(self) -> None:
+        registry = MetricsRegistry()
+        pending = registry.gauge("pending", "Pending")
+        registry.collector("pending", lambda: pending.set(3))
+        registry.collector("broken", lambda: 1 / 0)
+
+        assert "pending 3" in registry.render().splitlines()
+
+    def test_a_name_keeps_its_type(self) -> None:
+        registry = MetricsRegistry()
+        assert registry.counter("hits_total", "Hits") is registry.counter("hits_total", "Hits")
+        with pytest.raises(ValueError):
+            registry.gauge("hits_total", "Hits")
+
+
+class TestStatementNames:
+    def test_queries_are_named_after_their_constant(self) -> None:
+        statements = types.SimpleNamespace(
+            GET_ITEMS="SELECT id FROM items",
+            GET_ITEMS_PAGE="SELECT id, count(*) OVER() FROM items",
+            ITEMS_SEARCH=" WHERE name ILIKE :search",
+        )
+        names = StatementNames()
+        names.register(statements)
+
+        assert names.name(statements.GET_ITEMS + statements.ITEMS_SEARCH) == "GET_ITEMS"
+        assert names.name(f"WITH page AS ({statements.GET_ITEMS_PAGE})") == "GET_ITEMS_PAGE"
+        assert names.name("UPDATE items SET name = :name") == "UPDATE_ITEMS"
+
+
+@pytest.mark.asyncio
+class TestMetricsMiddleware:
+    async def test_latency_is_labelled_by_route_name(self) -> None:
+        registry = MetricsRegistry()
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware, registry=registry)
+
+        @app.get("/users", name="users:users_list")
+        async def users_list():
+            return []
+
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            await client.get("/users")
+            await client.get("/missing")
+
+        lines = registry.render().splitlines()
+        count = "http_request_duration_seconds_count"
+        assert f'{count}{{route="users:users_list",method="GET",status="200"}} 1' in lines
+        assert f'{count}{{route="unmatched",method="GET",status="404"}} 1' in lines
+
+
+@pytest.mark.parametrize(
+    "authorization, token, expected",
+    (
+        ("Bearer s3cr3t", "s3cr3t", True),
+        ("bearer s3cr3t", "s3cr3t", True),
+        ("Bearer otro", "s3cr3t", False),
+        ("Basic s3cr3t", "s3cr3t", False),
+        (None, "s3cr3t", False),
+        ("Bearer ", "", False),
+    ),
+)
+def test_metrics_need_the_bearer_token(
+    authorization: str | None, token: str, expected: bool
+) -> None:
+    assert authorized(authorization, token) is expected
@@ -0,0 +1,53 @@
+from datetime import datetime
+from uuid import uuid4
+
+from modules.users.roles.role_repositories import RoleRepository
+from modules.users.users.user_repositories import UserRepository
+from modules.users.users.user_schemas import UserInDB, UserOut
+
+
+class TestFromRecord:
+    def test_builds_the_schema_without_extra_columns(self) -> None:
+        record = {
+            "id": uuid4(),
+            "fullname": "Pepe Perez",
+            "username": "pepe",
+            "email": "pepe@mail.com",
+            "is_active": True,
+            "role_id": uuid4(),
+            "role": "admin",
+            "total_count": 3,
+        }
+
+        user = UserRepository(db=None)._from_record(record, UserOut)
+
+        assert isinstance(user, UserOut)
+        assert user.dict() == {
+            **{key: value for key, value in record.items() if key != "total_count"},
+            "created_by": None,
+            "updated_by": None,
+        }
+
+    def test_defaults_to_the_repository_output_schema(self) -> None:
+        records = [{"id": uuid4(), "role": "admin", "permissions": [], "is_active": True}]
+
+        roles = RoleRepository(db=None)._from_records(records)
+
+        assert [role.role for role in roles] == ["admin"]
+        assert roles[0].created_at is None
+
+    def test_constructed_user_has_granted_permissions(self) -> None:
+        record = {"id": uuid4(), "username": "pepe", "permissions": ["users:users_list"]}
+
+        user = UserRepository(db=None)._from_record(record, UserInDB)
+
+        assert user.granted_permissions == frozenset({"users:users_list"})
+
+    def test_null_timestamps_keep_the_current_date(self) -> None:
+        created_at = datetime(2023, 1, 2, 3, 4, 5)
+        record = {"id": uuid4(), "role": "admin", "created_at": created_at, "updated_at": None}
+
+        role = RoleRepository(db=None)._from_record(record)
+
+        assert role.created_at == created_at
+        assert isinstance(role.updated_at, datetime)
@@ -0,0 +1,36 @@
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from shared.core.middlewares.server_timing import (
+    ServerTimingMiddleware,
+    _timings,
+    record_timing,
+)
+from shared.utils.json_response import FastJSONResponse
+
+
+def test_record_timing_outside_a_request_does_nothing() -> None:
+    record_timing("db", 1.0)
+    assert _timings.get() is None
+
+
+@pytest.mark.asyncio
+class TestServerTimingMiddleware:
+    async def test_phases_of_the_request_are_in_the_header(self) -> None:
+        app = FastAPI(default_response_class=FastJSONResponse)
+        app.add_middleware(ServerTimingMiddleware)
+
+        @app.get("/users")
+        async def users_list():
+            record_timing("db", 0.004)
+            record_timing("db", 0.006)
+            return [{"id": n} for n in range(10)]
+
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            res = await client.get("/users")
+
+        phases = dict(phase.split(";dur=") for phase in res.headers["server-timing"].split(", "))
+        assert phases["db"] == "10.0"
+        assert list(phases) == ["db", "render", "total"]
+        assert float(phases["total"]) > 0
@@ -0,0 +1,31 @@
+import pytest
+from loguru import logger
+
+from modules.users.auths.auth_exceptions import AuthExceptions
+from shared.utils.service_result import ServiceResult, caller_info, handle_result
+
+
+def test_caller_info_names_the_caller_of_the_caller() -> None:
+    def handler() -> str:
+        return caller_info()
+
+    assert handler().split(":")[-2] == "test_caller_info_names_the_caller_of_the_caller"
+
+
+def test_failed_result_is_logged_with_the_route_that_got_it() -> None:
+    records = []
+    sink = logger.add(lambda message: records.append(message.record), level="ERROR")
+    try:
+        with pytest.raises(AuthExceptions.AuthNoValidCredencialsException):
+            handle_result(ServiceResult(AuthExceptions.AuthNoValidCredencialsException()))
+    finally:
+        logger.remove(sink)
+
+    route = "test_failed_result_is_logged_with_the_route_that_got_it"
+    assert records[0]["function"] == route
+    assert records[0]["message"].endswith(f":{route}:{records[0]['line']}")
+    assert "AuthNoValidCredencialsException" in records[0]["message"]
+
+
+def test_successful_result_returns_its_value() -> None:
+    assert handle_result(ServiceResult({"id": 1})) == {"id": 1}
@@ -0,0 +1,34 @@
+import pytest
+
+from shared.utils.tabular_file import read_rows
+
+
+class TestReadRows:
+    def test_csv_rows_are_numbered_by_line(self) -> None:
+        content = "fullname,username,is_superadmin\nPepe Boveda,pepeboveda,\nDiego,delavegad,true\n"
+
+        assert read_rows(content.encode(), "users.csv", None) == [
+            (2, {"fullname": "Pepe Boveda", "username": "pepeboveda"}),
+            (3, {"fullname": "Diego", "username": "delavegad", "is_superadmin": "true"}),
+        ]
+
+    def test_ndjson_skips_blank_lines(self) -> None:
+        content = b'{"username": "pepeboveda"}\n\n{"username": "delavegad"}\n'
+
+        assert read_rows(content, None, "application/x-ndjson") == [
+            (1, {"username": "pepeboveda"}),
+            (3, {"username": "delavegad"}),
+        ]
+
+    @pytest.mark.parametrize(
+        "content, filename",
+        (
+            (b"{}", "users.xlsx"),
+            (b'{"username": "pepe"}\n{nope', "users.ndjson"),
+            (b"[1, 2]", "users.jsonl"),
+            ("ñ".encode("latin-1"), "users.csv"),
+        ),
+    )
+    def test_unreadable_files_raise_value_error(self, content: bytes, filename: str) -> None:
+        with pytest.raises(ValueError):
+            read_rows(content, filename, None)
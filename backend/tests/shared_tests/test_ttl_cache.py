@@ -0,0 +1,61 @@
+from types import SimpleNamespace
+from uuid import uuid4
+
+from modules.users.auths.auth_cache import PrincipalCache
+from shared.utils.ttl_cache import TTLCache
+
+
+class TestTTLCache:
+    def test_least_recently_used_entry_is_evicted(self) -> None:
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_expired_entry_is_a_miss(self) -> None:
+        cache = TTLCache(maxsize=2, ttl=-1)
+        cache.set("a", 1)
+
+        assert cache.get("a") is None
+        assert cache.stats() == {"size": 0, "hits": 0, "misses": 1}
+
+    def test_zero_size_cache_stores_nothing(self) -> None:
+        cache = TTLCache(maxsize=0, ttl=60)
+        cache.set("a", 1)
+
+        assert len(cache) == 0
+
+
+class TestPrincipalCache:
+    def make_user(self, role_id=None) -> SimpleNamespace:
+        return SimpleNamespace(id=uuid4(), username=str(uuid4()), role_id=role_id or uuid4())
+
+    def test_invalidate_user_and_role(self) -> None:
+        cache = PrincipalCache(maxsize=10, ttl=60)
+        role_id = uuid4()
+        pepe, carlos, admin = self.make_user(role_id), self.make_user(role_id), self.make_user()
+        for user in (pepe, carlos, admin):
+            cache.set(user, cache.generation)
+
+        cache.invalidate_user(admin.id)
+        assert cache.get(admin.username) is None
+        assert cache.get(pepe.username) is pepe
+
+        cache.invalidate_role(role_id)
+        assert cache.get(pepe.username) is None
+        assert cache.get(carlos.username) is None
+
+    def test_lookup_started_before_invalidation_is_not_stored(self) -> None:
+        cache = PrincipalCache(maxsize=10, ttl=60)
+        user = self.make_user()
+        generation = cache.generation
+
+        cache.invalidate_user(user.id)
+        cache.set(user, generation)
+
+        assert cache.get(user.username) is None
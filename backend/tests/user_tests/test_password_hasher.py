@@ -0,0 +1,114 @@
+import asyncio
+import time
+
+import pytest
+
+from modules.users.auths.auth_exceptions import AuthExceptions
+from modules.users.auths.auth_hasher import PasswordHasher
+
+
+pytestmark = pytest.mark.asyncio
+
+
+def _slow_hash(secret: str, submitted_at: float):
+    time.sleep(0.3)
+    return secret, 0.0, 0.3
+
+
+class TestPasswordHasher:
+    @pytest.mark.parametrize("workers", (0, 1))
+    async def test_hash_and_verify_round_trip(self, workers: int) -> None:
+        hasher = PasswordHasher(workers=workers, queue_depth=4, timeout=30)
+        try:
+            hashed = await hasher.hash("psw_super_secreto")
+
+            assert await hasher.verify("psw_super_secreto", hashed)
+            assert not await hasher.verify("wrongpassword", hashed)
+
+            stats = hasher.stats()
+            assert stats["hash"]["count"] == 1
+            assert stats["verify"]["count"] == 2
+            assert stats["hash"]["hash_time"] > 0
+            assert stats["pending"] == 0
+        finally:
+            hasher.shutdown()
+
+    async def test_rejects_when_queue_is_full(self) -> None:
+        hasher = PasswordHasher(workers=0, queue_depth=1, timeout=30)
+
+        results = await asyncio.gather(
+            hasher.hash("psw_super_secreto"),
+            hasher.hash("psw_super_secreto"),
+            return_exceptions=True,
+        )
+
+        assert isinstance(results[0], str)
+        assert isinstance(results[1], AuthExceptions.AuthPasswordHasherBusyException)
+        assert hasher.stats()["rejected"] == 1
+
+    async def test_timed_out_job_holds_its_slot_until_the_worker_is_free(self) -> None:
+        hasher = PasswordHasher(workers=0, queue_depth=1, timeout=30)
+
+        with pytest.raises(AuthExceptions.AuthPasswordHasherBusyException):
+            await hasher._run("hash", _slow_hash, "psw_super_secreto", timeout=0.05)
+        assert hasher.pending == 1
+        with pytest.raises(AuthExceptions.AuthPasswordHasherBusyException):
+            await hasher.hash("psw_super_secreto")
+        assert hasher.stats()["rejected"] == 1
+
+        await asyncio.sleep(0.4)
+        assert hasher.pending == 0
+
+    @pytest.mark.parametrize("workers", (0, 2))
+    async def test_hash_many_keeps_order_and_leaves_a_worker_free(self, workers: int) -> None:
+        hasher = PasswordHasher(workers=workers, queue_depth=2, timeout=30)
+        secrets = [f"psw_super_secreto_{n}" for n in range(5)]
+        run, running = hasher._run, []
+
+        async def counting_run(*args, **kwargs):
+            running.append(hasher.pending + 1)
+            return await run(*args, **kwargs)
+
+        hasher._run = counting_run
+        try:
+            hashed = await hasher.hash_many(secrets)
+
+            assert len(hashed) == len(secrets)
+            for secret, hashed_secret in zip(secrets, hashed):
+                assert await hasher.verify(secret, hashed_secret)
+            assert max(running) == 1
+            assert hasher.stats()["hash_many"]["count"] == 5
+            assert hasher.stats()["rejected"] == 0
+        finally:
+            hasher.shutdown()
+
+    async def test_concurrent_imports_leave_a_worker_to_logins(self) -> None:
+        hasher = PasswordHasher(workers=2, queue_depth=4, timeout=30)
+        run, bulk, running = hasher._run, [0], []
+
+        async def counting_run(operation: str, *args, **kwargs):
+            if operation != "hash_many":
+                return await run(operation, *args, **kwargs)
+            bulk[0] += 1
+            running.append(bulk[0])
+            try:
+                return await run(operation, *args, **kwargs)
+            finally:
+                bulk[0] -= 1
+
+        hasher._run = counting_run
+        try:
+            imports = asyncio.gather(
+                hasher.hash_many([f"psw_super_secreto_{n}" for n in range(4)]),
+                hasher.hash_many([f"otro_psw_secreto_{n}" for n in range(4)]),
+            )
+            await asyncio.sleep(0)
+
+            assert await hasher.hash("psw_super_secreto")
+            assert not imports.done()
+
+            assert [len(hashed) for hashed in await imports] == [4, 4]
+            assert max(running) == 1
+            assert hasher.stats()["rejected"] == 0
+        finally:
+            hasher.shutdown()
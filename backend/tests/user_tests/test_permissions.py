@@ -1,10 +1,20 @@
 import pytest
 from typing import List
+from uuid import uuid4
 
 from fastapi import FastAPI, status
 from httpx import AsyncClient
 from loguru import logger
 
+from modules.users.auths.auth_dependencies import get_current_active_user
+from modules.users.permissions import (
+    find_functionality,
+    get_functionality_permissions,
+    get_permissions,
+    verify_permissions,
+)
+from modules.users.users.user_schemas import UserInDB
+
 
 pytestmark = pytest.mark.asyncio
 
@@ -26,3 +36,78 @@ class TestGetPermissions:
         assert res.status_code == status.HTTP_200_OK
         assert isinstance(res.json(), list)
         assert len(res.json()) > 0
+
+    async def test_list_permissions_has_a_static_etag(
+        self, app: FastAPI, authorized_client: AsyncClient
+    ) -> None:
+        client = await authorized_client
+        res = await client.get(app.url_path_for("permissions:list-permissions"))
+        etag = res.headers["etag"]
+
+        res = await client.get(
+            app.url_path_for("permissions:list-permissions"), headers={"If-None-Match": etag}
+        )
+        assert res.status_code == status.HTTP_304_NOT_MODIFIED
+        assert res.headers["etag"] == etag
+
+
+class TestPermissionIndex:
+    async def test_verify_permissions(self) -> None:
+        assert verify_permissions("users:create-user")
+        assert not verify_permissions("users:fly")
+
+    @pytest.mark.parametrize("search", ("USUARIOS", "USU", "SUARIO"))
+    async def test_find_functionality(self, search: str) -> None:
+        assert find_functionality(search) == "USUARIOS"
+        assert "roles:create-role" in get_functionality_permissions("USUARIOS")
+
+    async def test_unknown_functionality(self) -> None:
+        assert find_functionality("VENTAS") == ""
+        assert get_functionality_permissions("VENTAS") == frozenset()
+
+    async def test_catalog_is_read_only(self) -> None:
+        functionality = get_permissions()[0]
+        with pytest.raises(TypeError):
+            functionality["functionality"] = "VENTAS"
+        with pytest.raises(TypeError):
+            functionality["routes"][0]["users:fly"] = "Volar"
+        with pytest.raises(AttributeError):
+            functionality["routes"].append({"users:fly": "Volar"})
+
+
+class TestRouteAuthorization:
+    def make_user(self, permissions: List[str]) -> UserInDB:
+        return UserInDB(
+            id=uuid4(),
+            fullname="Pepe Boveda",
+            username="pepeboveda",
+            email="pepeboveda@prueba.com",
+            is_active=True,
+            is_superadmin=False,
+            password="psw_super_secreto",
+            salt="salt",
+            role_id=uuid4(),
+            permissions=permissions,
+        )
+
+    @pytest.mark.parametrize(
+        "permissions, status_code",
+        (
+            (["permissions:list-permissions"], status.HTTP_200_OK),
+            (["roles:create-role"], status.HTTP_401_UNAUTHORIZED),
+        ),
+    )
+    async def test_route_name_is_the_required_permission(
+        self, permissions: List[str], status_code: int
+    ) -> None:
+        from shared.core.server import get_application
+
+        app = get_application()
+        user = self.make_user(permissions)
+        app.dependency_overrides[get_current_active_user] = lambda: user
+
+        async with AsyncClient(app=app, base_url="http://testserver") as client:
+            res = await client.get(app.url_path_for("permissions:list-permissions"))
+
+        assert user.granted_permissions == frozenset(permissions)
+        assert res.status_code == status_code
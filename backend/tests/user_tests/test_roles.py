@@ -8,6 +8,7 @@ from httpx import AsyncClient
 from icecream import ic
 from loguru import logger
 
+from modules.users.roles import role_services
 from modules.users.roles.role_repositories import RoleRepository
 from modules.users.roles.role_schemas import RoleCreate, RoleIn, RoleOut
 
@@ -116,6 +117,38 @@ class TestGetRolesList:
         data = result.get("data")
         assert len(data) > 0
 
+    @pytest.mark.parametrize(
+        "params",
+        (
+            {},
+            {"page_size": 1},
+            {"page_number": 2, "page_size": 1},
+            {"page_number": 1000},
+            {"search": "usuarios"},
+            {"search": "fake", "order": "role", "direction": "desc"},
+            {"search": "nobody-matches-this"},
+        ),
+    )
+    async def test_roles_list_json_fast_path_matches_the_python_response(
+        self,
+        app: FastAPI,
+        authorized_client: AsyncClient,
+        test_role: RoleOut,
+        monkeypatch: pytest.MonkeyPatch,
+        params: dict,
+    ) -> None:
+        client = await authorized_client
+        await test_role
+
+        monkeypatch.setattr(role_services, "LIST_JSON_FAST_PATH", False)
+        expected = await client.get(app.url_path_for("roles:roles_list"), params=params)
+        monkeypatch.setattr(role_services, "LIST_JSON_FAST_PATH", True)
+        res = await client.get(app.url_path_for("roles:roles_list"), params=params)
+
+        assert res.status_code == expected.status_code == status.HTTP_200_OK
+        assert res.headers["content-type"] == "application/json"
+        assert res.json() == expected.json()
+
     # ["search", "page_number", "page_size", "order", "direction"]
     @pytest.mark.parametrize(
         "attrs, status",
@@ -175,6 +208,36 @@ class TestGetRolesList:
 
         assert res.status_code == status
 
+    @pytest.mark.parametrize("search", (None, "usuarios", "role"))
+    async def test_get_roles_list_by_cursor_walks_every_role(
+        self,
+        app: FastAPI,
+        authorized_client: AsyncClient,
+        test_role: RoleOut,
+        search: str | None,
+    ) -> None:
+        client = await authorized_client
+        await test_role
+        params = {"search": search} if search else {}
+
+        res = await client.get(
+            app.url_path_for("roles:roles_list"), params={**params, "page_size": 100}
+        )
+        expected = [role["id"] for role in res.json()["data"]]
+
+        res = await client.get(
+            app.url_path_for("roles:roles_list"),
+            params={**params, "cursor": "", "page_size": 1},
+        )
+        assert res.status_code == status.HTTP_200_OK
+
+        seen = [role["id"] for role in res.json()["data"]]
+        while res.json()["pagination"]["next"]:
+            res = await client.get(res.json()["pagination"]["next"])
+            seen.extend(role["id"] for role in res.json()["data"])
+
+        assert seen == expected
+
 
 class TestGetRoleById:
     async def test_get_role_by_id(
@@ -189,6 +252,36 @@ class TestGetRoleById:
         assert res.status_code == status.HTTP_200_OK
         assert (res.json()).get("id") == str(role_in_db.id)
 
+    async def test_role_and_roles_list_are_not_modified_until_a_role_changes(
+        self, app: FastAPI, authorized_client: AsyncClient, test_role: RoleOut
+    ) -> None:
+        client = await authorized_client
+        role_in_db = await test_role
+        url = app.url_path_for("roles:get-role-by-id", id=role_in_db.id)
+        list_url = app.url_path_for("roles:roles_list")
+
+        etag = (await client.get(url)).headers["etag"]
+        list_etag = (await client.get(list_url)).headers["etag"]
+        other_page = await client.get(list_url, params={"page_size": 1})
+        assert other_page.headers["etag"] != list_etag
+
+        res = await client.get(url, headers={"If-None-Match": etag})
+        assert res.status_code == status.HTTP_304_NOT_MODIFIED
+        res = await client.get(list_url, headers={"If-None-Match": list_etag})
+        assert res.status_code == status.HTTP_304_NOT_MODIFIED
+
+        res = await client.put(
+            app.url_path_for("roles:update-activate-role-by-id", id=role_in_db.id),
+            json={"role_update": {"is_active": False}},
+        )
+        assert res.status_code == status.HTTP_200_OK
+
+        res = await client.get(url, headers={"If-None-Match": etag})
+        assert res.status_code == status.HTTP_200_OK
+        assert res.json()["is_active"] is False
+        res = await client.get(list_url, headers={"If-None-Match": list_etag})
+        assert res.status_code == status.HTTP_200_OK
+
     @pytest.mark.parametrize(
         "id, status_code",
         (
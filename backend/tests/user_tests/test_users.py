@@ -1,3 +1,5 @@
+import asyncio
+import json
 import pytest
 import jwt
 from typing import List, Type
@@ -15,6 +17,7 @@ from starlette.datastructures import Secret
 from modules.users.roles.role_repositories import RoleRepository
 from modules.users.roles.role_schemas import RoleIn
 from modules.users.auths.auth_exceptions import AuthExceptions
+from modules.users.auths.auth_hasher import password_hasher
 from modules.users.auths.auth_schemas import JWTCreds, JWTMeta, JWTPayload
 from modules.users.auths.auth_services import AuthService
 from modules.users.permissions.permissions_schemas import PermissionsOut
@@ -25,7 +28,9 @@ from modules.users.users.user_schemas import (
     UserOut,
     UserInDB,
     UserPublic,
+    UserToSave,
 )
+from modules.users.users import user_services
 from modules.users.users.user_services import UserService
 from modules.users.users.user_repositories import UserRepository
 from shared.core.config import (
@@ -144,7 +149,7 @@ class TestCreateUser:
         assert user_in_db.salt is not None and user_in_db.salt is not None
         assert user_in_db.username == user_test.get("username")
         assert user_in_db.email == user_test.get("email")
-        assert AuthService().verify_password(
+        assert await AuthService().verify_password(
             password=user_test["password"],
             salt=user_in_db.salt,
             hashed_pw=user_in_db.password,
@@ -191,6 +196,130 @@ class TestCreateUser:
         )
         assert res.status_code == status_code
 
+    async def test_concurrent_duplicate_creates_only_one_user(
+        self, db: Database, test_user: UserInDB
+    ) -> None:
+        user_in_db = await test_user
+        new_user = UserToSave(
+            fullname="Bernardo Vega",
+            username="bernardovega",
+            email="bernardovega@prueba.com",
+            password="psw_super_secreto",
+            role_id=user_in_db.role_id,
+        )
+
+        results = await asyncio.gather(
+            UserService(db).create_user(new_user.copy()),
+            UserService(db).create_user(new_user.copy()),
+        )
+
+        assert sorted(result.success for result in results) == [False, True]
+        created = next(result.value for result in results if result.success)
+        assert created.role == user_in_db.role
+        await UserRepository(db).delete_user(id=created.id)
+
+
+class TestImportUsers:
+    async def test_import_reports_every_row_that_was_not_created(
+        self,
+        app: FastAPI,
+        authorized_client: AsyncClient,
+        test_user: UserInDB,
+        db: Database,
+    ) -> None:
+        client = await authorized_client
+        user_in_db = await test_user
+        role_id = user_in_db.role_id
+        content = "\n".join(
+            (
+                "fullname,username,email,password,role_id,is_active",
+                f"Import Uno,importuno,importuno@prueba.com,psw_super_secreto,{role_id},",
+                f"Import Dos,ImportDos,importdos@prueba.com,psw_super_secreto,{role_id},false",
+                f"Import Tres,importuno,importtres@prueba.com,psw_super_secreto,{role_id},",
+                f"Import Cuatro,importcuatro,importcuatro@prueba.com,corto,{role_id},",
+                f"Import Cinco,importcinco,importcinco@prueba.com,psw_super_secreto,{uuid4()},",
+            )
+        )
+
+        # the client's default JSON content type would replace the multipart one
+        request = client.build_request(
+            "POST",
+            app.url_path_for("users:import-users"),
+            files={"file": ("users.csv", content.encode(), "text/csv")},
+            headers={"Authorization": client.headers["Authorization"]},
+        )
+        request.headers["Content-Type"] = request.stream.content_type
+        res = await client.send(request)
+
+        assert res.status_code == status.HTTP_200_OK
+        report = res.json()
+        assert report["total"] == 5
+        assert report["created"] == 2
+        assert [error["row"] for error in report["errors"]] == [4, 5, 6]
+        assert report["ignored"] == [{"row": 3, "fields": ["is_active"]}]
+
+        user_repo = UserRepository(db)
+        for username in ("importuno", "importdos"):
+            user = await user_repo.get_user_by_username(username=username)
+            assert user.role == user_in_db.role
+            assert user.is_active
+            assert await AuthService().verify_password(
+                password="psw_super_secreto", salt=user.salt, hashed_pw=user.password
+            )
+            await user_repo.delete_user(id=user.id)
+
+    async def test_import_rejects_files_over_the_row_limit(
+        self, app: FastAPI, authorized_client: AsyncClient, monkeypatch
+    ) -> None:
+        client = await authorized_client
+        monkeypatch.setattr(user_services, "USERS_IMPORT_MAX_ROWS", 2)
+        content = "\n".join(
+            json.dumps({"fullname": f"Import {n}", "username": f"import{n}"}) for n in range(3)
+        )
+
+        request = client.build_request(
+            "POST",
+            app.url_path_for("users:import-users"),
+            files={"file": ("users.ndjson", content.encode(), "application/x-ndjson")},
+            headers={"Authorization": client.headers["Authorization"]},
+        )
+        request.headers["Content-Type"] = request.stream.content_type
+        res = await client.send(request)
+
+        assert res.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert "más de 2 filas" in res.json()["msg"]
+
+
+class TestExportUsers:
+    @pytest.mark.parametrize("format", ("ndjson", "csv"))
+    async def test_export_streams_users_without_credentials(
+        self, app: FastAPI, authorized_client: AsyncClient, test_user: UserInDB, format: str
+    ) -> None:
+        client = await authorized_client
+        user_in_db = await test_user
+
+        res = await client.get(
+            app.url_path_for("users:export-users"),
+            params={"format": format, "search": user_in_db.username},
+        )
+
+        assert res.status_code == status.HTTP_200_OK
+        assert user_in_db.username in res.text
+        assert user_in_db.password not in res.text
+        assert "salt" not in res.text
+
+        if format == "ndjson":
+            rows = [json.loads(line) for line in res.text.splitlines()]
+            assert user_in_db.username in [row["username"] for row in rows]
+
+    async def test_export_rejects_unknown_format(
+        self, app: FastAPI, authorized_client: AsyncClient
+    ) -> None:
+        client = await authorized_client
+
+        res = await client.get(app.url_path_for("users:export-users"), params={"format": "xml"})
+        assert res.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
 
 class TestAuthTokens:
     async def test_can_create_access_token_successfully(
@@ -402,6 +531,98 @@ class TestGetUsers:
         result = res.json()
         assert len(result) > 0
 
+    async def test_get_users_list_returns_only_requested_page(
+        self, app: FastAPI, authorized_client: AsyncClient, otro_test_user: UserInDB
+    ) -> None:
+        client = await authorized_client
+        await otro_test_user
+
+        res = await client.get(
+            app.url_path_for("users:users_list"), params={"page_size": 1}
+        )
+        assert res.status_code == status.HTTP_200_OK
+
+        result = res.json()
+        assert len(result["data"]) == 1
+        assert result["total"] >= 2
+        assert result["pages"] == result["total"]
+        assert result["pagination"]["previous"] is None
+        assert result["pagination"]["next"].endswith("page_number=2&page_size=1")
+
+        res = await client.get(
+            app.url_path_for("users:users_list"),
+            params={"page_number": result["total"] + 1, "page_size": 1},
+        )
+        assert res.status_code == status.HTTP_200_OK
+        assert res.json()["data"] == []
+        assert res.json()["total"] == result["total"]
+
+    @pytest.mark.parametrize(
+        "params",
+        (
+            {},
+            {"page_size": 1},
+            {"page_number": 2, "page_size": 1},
+            {"page_number": 1000},
+            {"search": "test", "order": "email", "direction": "desc"},
+            {"search": "nobody-matches-this"},
+        ),
+    )
+    async def test_users_list_json_fast_path_matches_the_python_response(
+        self,
+        app: FastAPI,
+        authorized_client: AsyncClient,
+        otro_test_user: UserInDB,
+        monkeypatch: pytest.MonkeyPatch,
+        params: dict,
+    ) -> None:
+        client = await authorized_client
+        await otro_test_user
+
+        monkeypatch.setattr(user_services, "LIST_JSON_FAST_PATH", False)
+        expected = await client.get(app.url_path_for("users:users_list"), params=params)
+        monkeypatch.setattr(user_services, "LIST_JSON_FAST_PATH", True)
+        res = await client.get(app.url_path_for("users:users_list"), params=params)
+
+        assert res.status_code == expected.status_code == status.HTTP_200_OK
+        assert res.headers["content-type"] == "application/json"
+        assert res.json() == expected.json()
+
+    async def test_get_users_list_by_cursor_walks_every_user(
+        self, app: FastAPI, authorized_client: AsyncClient, otro_test_user: UserInDB
+    ) -> None:
+        client = await authorized_client
+        await otro_test_user
+
+        res = await client.get(app.url_path_for("users:users_list"), params={"page_size": 100})
+        expected = [user["id"] for user in res.json()["data"]]
+
+        res = await client.get(
+            app.url_path_for("users:users_list"), params={"cursor": "", "page_size": 1}
+        )
+        assert res.status_code == status.HTTP_200_OK
+        assert res.json()["pagination"]["previous"] is None
+
+        seen = [user["id"] for user in res.json()["data"]]
+        while res.json()["pagination"]["next"]:
+            res = await client.get(res.json()["pagination"]["next"])
+            assert res.status_code == status.HTTP_200_OK
+            seen.extend(user["id"] for user in res.json()["data"])
+
+        assert seen == expected
+
+        res = await client.get(res.json()["pagination"]["previous"])
+        assert res.status_code == status.HTTP_200_OK
+        assert [user["id"] for user in res.json()["data"]] == expected[-2:-1]
+
+    async def test_get_users_list_with_invalid_cursor_returns_error(
+        self, app: FastAPI, authorized_client: AsyncClient
+    ) -> None:
+        client = await authorized_client
+
+        res = await client.get(app.url_path_for("users:users_list"), params={"cursor": "abc"})
+        assert res.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
     # @pytest.mark.parametrize(
     #     "search,page_number, page_size, order, direction, status_code",
     #     (
@@ -461,6 +682,58 @@ class TestGetUsers:
         assert user.email == user_test.email
         assert user.username == user_test.username
 
+    async def test_user_by_id_is_not_modified_until_it_is_updated(
+        self, app: FastAPI, authorized_client: AsyncClient, otro_test_user: UserInDB
+    ) -> None:
+        client = await authorized_client
+        user_test = await otro_test_user
+        url = app.url_path_for("users:get-user-by-id", id=user_test.id)
+        list_url = app.url_path_for("users:users_list")
+
+        res = await client.get(url)
+        users = await client.get(list_url)
+        etag, list_etag = res.headers["etag"], users.headers["etag"]
+        assert etag.startswith('W/"')
+
+        res = await client.get(url, headers={"If-None-Match": etag})
+        assert res.status_code == status.HTTP_304_NOT_MODIFIED
+        assert res.headers["etag"] == etag
+        assert res.content == b""
+        res = await client.get(list_url, headers={"If-None-Match": list_etag})
+        assert res.status_code == status.HTTP_304_NOT_MODIFIED
+
+        res = await client.put(
+            app.url_path_for("users:update-user-by-id", id=user_test.id),
+            json={"user_update": {"fullname": "Nombre cambiado"}},
+        )
+        assert res.status_code == status.HTTP_200_OK
+
+        res = await client.get(url, headers={"If-None-Match": etag})
+        assert res.status_code == status.HTTP_200_OK
+        assert res.json()["fullname"] == "Nombre cambiado"
+        assert res.headers["etag"] != etag
+        res = await client.get(list_url, headers={"If-None-Match": list_etag})
+        assert res.status_code == status.HTTP_200_OK
+
+    async def test_read_paths_do_not_load_credentials(
+        self, db: Database, test_user: UserInDB
+    ) -> None:
+        user_test = await test_user
+        user_repo = UserRepository(db)
+
+        users, _ = await user_repo.get_users_list(user_test.username, None, None)
+        for user in [
+            await user_repo.get_user_by_id(id=user_test.id),
+            await user_repo.get_user_by_email(email=user_test.email),
+            *users,
+            *await user_repo.get_users_by_role_id(role_id=user_test.role_id),
+        ]:
+            assert "password" not in user.dict()
+            assert "salt" not in user.dict()
+
+        user = await user_repo.get_user_by_username(username=user_test.username)
+        assert user.password and user.salt
+
     @pytest.mark.parametrize(
         "id, status_code",
         ((uuid4(), 404), (None, 422), ("abc123", 422)),
@@ -569,6 +842,55 @@ class TestUpdateUser:
         )
         assert res.status_code == status.HTTP_200_OK
 
+    async def test_update_returns_the_updated_user(
+        self,
+        app: FastAPI,
+        authorized_client: AsyncClient,
+        otro_test_user: UserInDB,
+    ) -> None:
+        client = await authorized_client
+        user_in_db = await otro_test_user
+
+        user_update = {"user_update": {"fullname": "Diego Vega"}}
+        res = await client.put(
+            app.url_path_for("users:update-user-by-id", id=user_in_db.id), json=user_update
+        )
+        assert res.status_code == status.HTTP_200_OK
+        assert res.json()["fullname"] == "Diego Vega"
+        assert res.json()["username"] == user_in_db.username
+
+    async def test_update_unknown_user_returns_not_found(
+        self, app: FastAPI, authorized_client: AsyncClient
+    ) -> None:
+        client = await authorized_client
+
+        user_update = {"user_update": {"fullname": "Nadie"}}
+        res = await client.put(
+            app.url_path_for("users:update-user-by-id", id=uuid4()), json=user_update
+        )
+        assert res.status_code == status.HTTP_404_NOT_FOUND
+
+    async def test_update_password_with_busy_hasher_returns_503(
+        self,
+        app: FastAPI,
+        authorized_client: AsyncClient,
+        otro_test_user: UserInDB,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        client = await authorized_client
+        user_in_db = await otro_test_user
+
+        async def busy_hash(secret: str) -> str:
+            raise AuthExceptions.AuthPasswordHasherBusyException()
+
+        monkeypatch.setattr(password_hasher, "hash", busy_hash)
+        user_update = {"user_update": {"password": "strange$$psw"}}
+        res = await client.put(
+            app.url_path_for("users:update-user-by-id", id=user_in_db.id), json=user_update
+        )
+        assert res.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert res.json()["app_exception"] == "AuthPasswordHasherBusyException"
+
 
 class TestDeleteUser:
     async def test_can_delete_user_successfully(